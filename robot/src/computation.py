@@ -80,14 +80,46 @@ def _find_valid_hover(checker, tcp_offset, run_surface, surface_joints,
             return used_tcp, joint, trim
     return None, None, n
 
+# Binary trace files (tracing.trace_file) are zip archives, unlike JSON exports
+TRACE_FILE_MAGIC = b"PK\x03\x04"
+TRACE_FILE_VERSION = 1
+
+
+def load_trace_file(path):
+    """Load a binary trace file into the v2 JSON structure.
+
+    Points of all traces are stored as whole arrays, split with the
+    trace offsets, so only the final conversion to lists is per point
+    """
+    with np.load(path) as archive:
+        data = json.loads(archive["header"].tobytes().decode("utf-8"))
+        version = data.pop("version", None)
+        if version != TRACE_FILE_VERSION:
+            raise ValueError(f"Unsupported trace file version {version} in {path}")
+
+        offsets = archive["offsets"][1:-1]
+        waypoints = np.stack([archive["pos"], archive["normal"]], axis=1).astype(np.float64)
+        data["traces"] = [
+            {"color": int(color), "path": path.tolist()}
+            for color, path in zip(archive["colors"], np.split(waypoints, offsets))
+        ]
+    return data
+
+
 def load_traces(json_path):
-    """Load trace JSON and normalize v1 → v2 format.
+    """Load trace JSON (or binary trace file) and normalize v1 → v2 format.
 
     Returns (traces, data) where traces is the normalized list
     and data is the full parsed dict
     """
-    with open(json_path, "r", encoding="utf-8") as f:
-        data = json.load(f)
+    with open(json_path, "rb") as f:
+        is_binary = f.read(len(TRACE_FILE_MAGIC)) == TRACE_FILE_MAGIC
+
+    if is_binary:
+        data = load_trace_file(json_path)
+    else:
+        with open(json_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
 
     traces = data["traces"]
 
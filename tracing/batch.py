@@ -0,0 +1,334 @@
+"""Headless batch tracing of the jobs listed in a manifest
+
+Each job runs in its own process, at most `--workers` at once, and is stopped after `--timeout` seconds.
+A job is skipped when its summary records a successful run on the same inputs and configuration.
+
+Manifest (paths are relative to the manifest, job entries override the defaults, `config` holds `TracerConfig` fields):
+    {
+        "defaults": {
+            "model": "models/duck_uv_v2.obj",
+            "mask": "textures/masks/drawable_mask_v2.png",
+            "palette": ["d9d566", "0a7a28", [0, 0, 255]],
+            "color_not_to_draw": ["d9d566"],
+            "format": "json",
+            "config": {"fill_slice_spacing": 0.02, "mesh_cache_dir": "cache"}
+        },
+        "jobs": [
+            {"texture": "textures/clown_triste.png"},
+            {"name": "clown-hatched", "texture": "textures/clown_triste.png", "config": {"enable_fill_slicing": true}}
+        ]
+    }
+
+Usage:
+    python -m tracing.batch manifest.json --output-dir output --workers 4 --timeout 900
+"""
+import argparse
+import dataclasses
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import time
+import traceback
+from logging import Logger
+from multiprocessing.connection import wait
+from multiprocessing.process import BaseProcess
+from pathlib import Path
+from typing import Any, Optional, Union
+
+from tracing.batch_job import BatchJob
+from tracing.color import Color
+from tracing.config import TracerConfig
+from tracing.stats import TracingStats
+from tracing.tracer import Tracer
+
+logger: Logger = logging.getLogger("Batch")
+
+# Configuration fields holding paths
+PATH_CONFIG_FIELDS: tuple[str, ...] = ("mesh_cache_dir", "layer_cache_dir")
+
+# Configuration forced on batch jobs, which must never block on a window
+HEADLESS_CONFIG: dict[str, Any] = {
+    "debug": False,
+    "enable_reduction_visualisation": False,
+    "enable_inputs_visualisation": False,
+    "enable_texture_transformation_visualisation": False,
+    "enable_island_selection_visualisation": False,
+}
+
+TRACES_FORMATS: tuple[str, ...] = ("json", "npz")
+
+
+def parse_color(value: Union[str, list[int]]) -> Color:
+    """Parses a color of the manifest
+
+    Args:
+        value (Union[str, list[int]]): either a hexadecimal "rrggbb" string, or [r, g, b]
+
+    Returns:
+        Color: the color
+    """
+    if isinstance(value, str):
+        hex_value: str = value.removeprefix("#")
+        if len(hex_value) != 6:
+            raise ValueError(f"Invalid color {value!r}, expected \"rrggbb\"")
+        return int(hex_value[0:2], 16), int(hex_value[2:4], 16), int(hex_value[4:6], 16)
+    if len(value) != 3:
+        raise ValueError(f"Invalid color {value!r}, expected [r, g, b]")
+    r, g, b = value
+    return int(r), int(g), int(b)
+
+
+def parse_config(values: dict[str, Any], directory: Path) -> TracerConfig:
+    """Builds the tracer configuration of a job, forced headless
+
+    Args:
+        values (dict[str, Any]): the `TracerConfig` fields set by the manifest
+        directory (Path): the directory of the manifest, relative paths being resolved from it
+
+    Returns:
+        TracerConfig: the configuration
+    """
+    names: set[str] = {field.name for field in dataclasses.fields(TracerConfig)}
+    unknown: set[str] = set(values) - names
+    if unknown:
+        raise ValueError(f"Unknown configuration fields {sorted(unknown)}")
+
+    fields: dict[str, Any] = dict(values)
+    for name in PATH_CONFIG_FIELDS:
+        if fields.get(name) is not None:
+            fields[name] = directory / fields[name]
+    if "image_size" in fields:
+        fields["image_size"] = tuple(fields["image_size"])
+    fields.update(HEADLESS_CONFIG)
+    return TracerConfig(**fields)
+
+
+def load_manifest(path: Path) -> list[BatchJob]:
+    """Reads the jobs of a manifest
+
+    Args:
+        path (Path): path of the JSON manifest
+
+    Returns:
+        list[BatchJob]: the jobs, in order
+    """
+    with open(path) as f:
+        manifest: dict[str, Any] = json.load(f)
+    directory: Path = path.parent
+    defaults: dict[str, Any] = manifest.get("defaults", {})
+
+    jobs: list[BatchJob] = []
+    for i, entry in enumerate(manifest.get("jobs", [])):
+        values: dict[str, Any] = {**defaults, **entry, "config": {**defaults.get("config", {}), **entry.get("config", {})}}
+        missing: list[str] = [key for key in ("model", "texture", "mask", "palette") if key not in values]
+        if missing:
+            raise ValueError(f"Job {i} of {path} has no {', '.join(missing)}")
+        traces_format: str = values.get("format", "json")
+        if traces_format not in TRACES_FORMATS:
+            raise ValueError(f"Job {i} of {path} has an unknown format {traces_format!r}, expected one of {TRACES_FORMATS}")
+
+        texture_path: Path = directory / values["texture"]
+        jobs.append(BatchJob(
+            name=values.get("name", texture_path.stem),
+            model_path=directory / values["model"],
+            texture_path=texture_path,
+            mask_path=directory / values["mask"],
+            palette=tuple(parse_color(color) for color in values["palette"]),
+            color_not_to_draw=tuple(parse_color(color) for color in values.get("color_not_to_draw", [])),
+            config=parse_config(values["config"], directory),
+            traces_format=traces_format
+        ))
+
+    names: list[str] = [job.name for job in jobs]
+    duplicates: set[str] = {name for name in names if names.count(name) > 1}
+    if duplicates:
+        raise ValueError(f"Several jobs of {path} are named {sorted(duplicates)}, their outputs would collide")
+    return jobs
+
+
+def read_summary(path: Path) -> Optional[dict[str, Any]]:
+    if not path.exists():
+        return None
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def write_summary(path: Path, summary: dict[str, Any]):
+    """Writes a JSON summary, replacing the previous one at once so that an interrupted write is never read back
+
+    Args:
+        path (Path): path of the summary
+        summary (dict[str, Any]): the summary
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial: Path = path.with_suffix(".json.partial")
+    with open(partial, "w") as f:
+        json.dump(summary, f, indent=4)
+    os.replace(partial, path)
+
+
+def job_summary(job: BatchJob, fingerprint: str, status: str, duration: float, **details: Any) -> dict[str, Any]:
+    return {
+        "name": job.name,
+        "status": status,
+        "fingerprint": fingerprint,
+        "model": str(job.model_path),
+        "texture": str(job.texture_path),
+        "mask": str(job.mask_path),
+        "duration": duration,
+        **details
+    }
+
+
+def is_up_to_date(job: BatchJob, output_dir: Path, fingerprint: str) -> bool:
+    """Checks whether the outputs of a job come from a successful run on its current inputs
+
+    Args:
+        job (BatchJob): the job
+        output_dir (Path): directory of the outputs
+        fingerprint (str): the current fingerprint of the job (see `BatchJob.fingerprint`)
+
+    Returns:
+        bool: whether the job can be skipped
+    """
+    summary: Optional[dict[str, Any]] = read_summary(job.summary_path(output_dir))
+    return (
+        summary is not None
+        and summary.get("status") == "done"
+        and summary.get("fingerprint") == fingerprint
+        and job.traces_path(output_dir).exists()
+    )
+
+
+def run_job(job: BatchJob, output_dir: Path, fingerprint: str):
+    """Traces a job and writes its traces and summary, in the worker process
+
+    Args:
+        job (BatchJob): the job
+        output_dir (Path): directory of the outputs
+        fingerprint (str): the fingerprint of the job, recorded in its summary
+    """
+    start: float = time.perf_counter()
+    try:
+        tracer: Tracer = Tracer(job.config, job.texture_path, job.model_path, job.mask_path, job.palette, job.color_not_to_draw)
+        stats: TracingStats = tracer.compute_traces()
+        if stats.n_3d_traces == 0:
+            raise ValueError("No trace was produced, check the model's UV map, the palette and the colors not to draw")
+        tracer.export_traces(job.traces_path(output_dir), force=True)
+        summary: dict[str, Any] = job_summary(
+            job, fingerprint, "done", time.perf_counter() - start,
+            traces=str(job.traces_path(output_dir)),
+            stats=dataclasses.asdict(stats)
+        )
+    except Exception as e:
+        logger.error(f"Job {job.name} failed:\n{traceback.format_exc()}")
+        summary = job_summary(job, fingerprint, "failed", time.perf_counter() - start, error=f"{type(e).__name__}: {e}")
+    write_summary(job.summary_path(output_dir), summary)
+
+
+def run_batch(
+        jobs: list[BatchJob],
+        output_dir: Path,
+        workers: int = 1,
+        timeout: Optional[float] = None,
+        force: bool = False
+) -> list[dict[str, Any]]:
+    """Runs jobs on a pool of worker processes, each job in a fresh process
+
+    Args:
+        jobs (list[BatchJob]): the jobs
+        output_dir (Path): directory of the outputs
+        workers (int, optional): number of jobs run at once (0 for one per CPU). Defaults to 1.
+        timeout (Optional[float], optional): seconds after which a job is stopped (None for no limit). Defaults to None.
+        force (bool, optional): whether up to date jobs are run again. Defaults to False.
+
+    Returns:
+        list[dict[str, Any]]: the summary of each job, in order, with the "skipped" status for up to date jobs
+    """
+    n_workers: int = workers if workers > 0 else (os.cpu_count() or 1)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    summaries: dict[str, dict[str, Any]] = {}
+    pending: list[tuple[BatchJob, str]] = []
+    for job in jobs:
+        try:
+            fingerprint: str = job.fingerprint()
+        except OSError as e:
+            summaries[job.name] = job_summary(job, "", "failed", 0.0, error=f"{type(e).__name__}: {e}")
+            write_summary(job.summary_path(output_dir), summaries[job.name])
+            continue
+        if not force and is_up_to_date(job, output_dir, fingerprint):
+            logger.info(f"Skipping {job.name}, its outputs are up to date")
+            summaries[job.name] = {**read_summary(job.summary_path(output_dir)), "status": "skipped"}  # type: ignore
+        else:
+            pending.append((job, fingerprint))
+
+    context = multiprocessing.get_context("spawn")
+    running: dict[BaseProcess, tuple[BatchJob, str, float]] = {}
+    pending.reverse()
+    while pending or running:
+        while pending and len(running) < n_workers:
+            job, fingerprint = pending.pop()
+            job.summary_path(output_dir).unlink(missing_ok=True)
+            process: BaseProcess = context.Process(target=run_job, args=(job, output_dir, fingerprint), name=f"batch-{job.name}")
+            process.start()
+            running[process] = (job, fingerprint, time.perf_counter())
+            logger.info(f"Started {job.name}")
+
+        now: float = time.perf_counter()
+        deadline: Optional[float] = None if timeout is None else min(start + timeout for _, _, start in running.values())
+        wait([process.sentinel for process in running], timeout=None if deadline is None else max(deadline - now, 0))
+
+        now = time.perf_counter()
+        for process, (job, fingerprint, start) in list(running.items()):
+            if process.is_alive():
+                if timeout is None or now - start < timeout:
+                    continue
+                process.terminate()
+                process.join()
+                summaries[job.name] = job_summary(job, fingerprint, "timeout", now - start, error=f"Stopped after {timeout}s")
+                write_summary(job.summary_path(output_dir), summaries[job.name])
+            else:
+                process.join()
+                summary: Optional[dict[str, Any]] = read_summary(job.summary_path(output_dir))
+                if summary is None:
+                    summary = job_summary(job, fingerprint, "failed", now - start, error=f"Worker exited with code {process.exitcode}")
+                    write_summary(job.summary_path(output_dir), summary)
+                summaries[job.name] = summary
+            del running[process]
+            logger.info(f"Finished {job.name}: {summaries[job.name]['status']} in {now - start:.1f}s")
+
+    results: list[dict[str, Any]] = [summaries[job.name] for job in jobs]
+    write_summary(output_dir / "batch-summary.json", {"jobs": results})
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Trace the textures listed in a manifest, without any window")
+    parser.add_argument("manifest", type=Path, help="JSON manifest of the jobs")
+    parser.add_argument("--output-dir", type=Path, default=Path("output"), help="directory of the traces and summaries")
+    parser.add_argument("--workers", type=int, default=1, help="number of jobs run at once (0 for one per CPU)")
+    parser.add_argument("--timeout", type=float, help="seconds after which a job is stopped")
+    parser.add_argument("--force", action="store_true", help="run the jobs whose outputs are up to date too")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
+
+    results: list[dict[str, Any]] = run_batch(
+        load_manifest(args.manifest),
+        args.output_dir,
+        workers=args.workers,
+        timeout=args.timeout,
+        force=args.force
+    )
+    for result in results:
+        print(f"{result['name']:<32} {result['status']:<8} {result['duration']:8.1f}s {result.get('error', '')}")
+    if any(result["status"] in ("failed", "timeout") for result in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+import dataclasses
+import hashlib
+from dataclasses import dataclass
+from pathlib import Path
+
+from tracing.color import Color
+from tracing.config import TracerConfig
+from tracing.layer_cache import IGNORED_CONFIG_FIELDS
+from tracing.mesh_cache import file_hash
+
+
+@dataclass
+class BatchJob:
+    """A texture to trace on a model, as listed in a batch manifest"""
+
+    # Name of the job, prefixing its output files
+    name: str
+
+    model_path: Path
+    texture_path: Path
+    mask_path: Path
+
+    # Palette the texture is quantized to
+    palette: tuple[Color, ...]
+
+    # Colors of the palette that are not traced
+    color_not_to_draw: tuple[Color, ...]
+
+    config: TracerConfig
+
+    # Extension of the traces file: "json" or "npz" (see `Tracer.export_traces`)
+    traces_format: str = "json"
+
+    def traces_path(self, output_dir: Path) -> Path:
+        return output_dir / f"{self.name}-traces.{self.traces_format}"
+
+    def summary_path(self, output_dir: Path) -> Path:
+        return output_dir / f"{self.name}-summary.json"
+
+    def fingerprint(self) -> str:
+        """Computes a hash of everything the traces of the job depend on
+
+        Returns:
+            str: the hexadecimal digest of the input files' contents, the palettes and the configuration
+        """
+        params: str = repr(sorted(
+            (field.name, repr(getattr(self.config, field.name)))
+            for field in dataclasses.fields(self.config)
+            if field.name not in IGNORED_CONFIG_FIELDS
+        ))
+        digest = hashlib.sha256()
+        for path in (self.model_path, self.texture_path, self.mask_path):
+            digest.update(file_hash(path).encode())
+        digest.update(f"{self.palette}-{self.color_not_to_draw}-{self.traces_format}-{params}".encode())
+        return digest.hexdigest()
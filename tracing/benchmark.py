@@ -0,0 +1,363 @@
+"""Tracing benchmark on procedural meshes and synthetic textures
+
+Each case generates a UV-mapped mesh and a texture with a controlled number of islands, then times
+every stage of the tracing pipeline in a fresh process, so that peak memory and caches are per case.
+
+Usage:
+    python -m tracing.benchmark --faces 2000 20000 --output results.json
+    python -m tracing.benchmark --compare results.json
+"""
+import argparse
+import dataclasses
+import json
+import multiprocessing
+import platform
+import sys
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Optional
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from tracing.color import Color
+from tracing.config import TracerConfig
+from tracing.stats import TracingStats
+from tracing.tracer import Tracer
+
+# Bump when the content of the results changes
+RESULTS_VERSION: int = 1
+
+MESH_KINDS: tuple[str, ...] = ("sphere", "blob", "seams")
+
+BACKGROUND: Color = (217, 213, 102)
+PALETTE: tuple[Color, ...] = (BACKGROUND, (10, 122, 40), (0, 0, 255), (255, 0, 0))
+
+STAGES: tuple[str, ...] = ("preparation", "layer_cache", "island_detection", "border_sharing", "segmentation", "projection", "stitching", "simplification", "merge")
+
+
+@dataclass
+class BenchmarkCase:
+    """Parameters of a benchmark case"""
+
+    # Kind of mesh, one of `MESH_KINDS`
+    mesh: str
+
+    # Approximate number of faces of the mesh
+    faces: int
+
+    # Number of color islands drawn on the texture
+    islands: int
+
+    # Fraction of the texture covered by islands
+    fill: float
+
+    # Whether islands are filled with slices
+    fill_slicing: bool = True
+
+    # Seed of the texture generator
+    seed: int = 0
+
+    @property
+    def name(self) -> str:
+        return f"{self.mesh}-{self.faces}f-{self.islands}i-{self.fill:g}{'-fill' if self.fill_slicing else ''}"
+
+
+def sphere_grid(n_faces: int, radius: float = 50.0) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Builds the angles and faces of a latitude/longitude grid
+
+    Args:
+        n_faces (int): approximate number of faces
+        radius (float, optional): radius of the sphere. Defaults to 50.0.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray, np.ndarray]: the (u,v) grid coordinates in [0,1] (Nx2), the positions (Nx3) and the faces (Fx3)
+    """
+    nv: int = max(int(round(np.sqrt(n_faces / 4))), 2)
+    nu: int = 2 * nv
+    u, v = np.meshgrid(np.linspace(0, 1, nu + 1), np.linspace(0, 1, nv + 1), indexing="xy")
+    theta: np.ndarray = u * 2 * np.pi
+    phi: np.ndarray = v * np.pi
+    pos: np.ndarray = np.stack([
+        radius * np.sin(phi) * np.cos(theta),
+        radius * np.sin(phi) * np.sin(theta),
+        -radius * np.cos(phi)
+    ], axis=-1).reshape(-1, 3)
+
+    idx: np.ndarray = np.arange((nu + 1) * (nv + 1)).reshape(nv + 1, nu + 1)
+    a, b, c, d = idx[:-1, :-1], idx[:-1, 1:], idx[1:, 1:], idx[1:, :-1]
+    faces: np.ndarray = np.concatenate([
+        np.stack([a, b, c], axis=-1).reshape(-1, 3),
+        np.stack([a, c, d], axis=-1).reshape(-1, 3)
+    ])
+    return np.stack([u, v], axis=-1).reshape(-1, 2), pos, faces
+
+
+def make_mesh(kind: str, n_faces: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Generates a UV-mapped mesh
+
+    Args:
+        kind (str): "sphere" (single chart), "blob" (duck-like deformed sphere) or "seams" (sphere split into two UV charts)
+        n_faces (int): approximate number of faces
+
+    Returns:
+        tuple[np.ndarray, np.ndarray, np.ndarray]: the vertices (Nx3), the UV coordinates (Nx2) and the faces (Fx3)
+    """
+    grid, pos, faces = sphere_grid(n_faces)
+    uv: np.ndarray = 0.05 + 0.9 * grid
+
+    if kind == "sphere":
+        return pos, uv, faces
+
+    if kind == "blob":
+        # Elongated body with a head bump and a few low frequency ripples
+        directions: np.ndarray = pos / np.linalg.norm(pos, axis=1, keepdims=True)
+        head: np.ndarray = np.array([0.6, 0.0, 0.8])
+        bump: np.ndarray = 0.45 * np.exp(-np.sum((directions - head) ** 2, axis=1) / 0.15)
+        ripples: np.ndarray = 0.05 * np.sin(5 * grid[:, 0] * 2 * np.pi) * np.sin(3 * grid[:, 1] * np.pi)
+        return pos * (1 + bump + ripples)[:, None] * np.array([1.4, 1.0, 1.0]), uv, faces
+
+    if kind == "seams":
+        # Each half of the sphere gets its own chart, vertices being duplicated along the seams
+        centers: np.ndarray = grid[faces].mean(axis=1)
+        halves: list[np.ndarray] = [faces[centers[:, 0] < 0.5], faces[centers[:, 0] >= 0.5]]
+        vertices: list[np.ndarray] = []
+        uvs: list[np.ndarray] = []
+        new_faces: list[np.ndarray] = []
+        n_vertices: int = 0
+        for h, half in enumerate(halves):
+            used, inverse = np.unique(half, return_inverse=True)
+            chart: np.ndarray = grid[used] * np.array([2.0, 1.0]) - np.array([h, 0.0])
+            vertices.append(pos[used])
+            uvs.append(np.column_stack([0.5 * h + 0.05 + 0.4 * chart[:, 0], 0.05 + 0.9 * chart[:, 1]]))
+            new_faces.append(inverse.reshape(-1, 3) + n_vertices)
+            n_vertices += len(used)
+        return np.concatenate(vertices), np.concatenate(uvs), np.concatenate(new_faces)
+
+    raise ValueError(f"Unknown mesh kind {kind!r}, expected one of {MESH_KINDS}")
+
+
+def write_obj(path: Path, vertices: np.ndarray, uv: np.ndarray, faces: np.ndarray):
+    """Writes a mesh with per-vertex UV coordinates as a Wavefront OBJ file
+
+    Args:
+        path (Path): path of the file
+        vertices (np.ndarray): the vertices (Nx3)
+        uv (np.ndarray): the UV coordinates of each vertex (Nx2)
+        faces (np.ndarray): the faces (Fx3)
+    """
+    with open(path, "w") as f:
+        f.writelines(f"v {x:.6f} {y:.6f} {z:.6f}\n" for x, y, z in vertices)
+        f.writelines(f"vt {u:.6f} {v:.6f}\n" for u, v in uv)
+        f.writelines(f"f {a}/{a} {b}/{b} {c}/{c}\n" for a, b, c in faces + 1)
+
+
+def make_texture(size: tuple[int, int], n_islands: int, fill: float, seed: int) -> np.ndarray:
+    """Generates a texture with `n_islands` ellipses of palette colors covering about `fill` of its area
+
+    Args:
+        size (tuple[int, int]): size of the texture (w,h)
+        n_islands (int): number of islands
+        fill (float): fraction of the texture covered by the islands
+        seed (int): seed of the generator
+
+    Returns:
+        np.ndarray: the RGB texture (hxwx3)
+    """
+    rng: np.random.Generator = np.random.default_rng(seed)
+    w, h = size
+    img: np.ndarray = np.full((h, w, 3), BACKGROUND, dtype=np.uint8)
+    radius: float = np.sqrt(fill * w * h / (max(n_islands, 1) * np.pi))
+    for k in range(n_islands):
+        color: Color = PALETTE[1 + k % (len(PALETTE) - 1)]
+        axes: tuple[int, int] = (
+            max(int(radius * rng.uniform(0.7, 1.3)), 2),
+            max(int(radius * rng.uniform(0.7, 1.3)), 2)
+        )
+        center: tuple[int, int] = (int(rng.integers(0, w)), int(rng.integers(0, h)))
+        cv2.ellipse(img, center, axes, float(rng.uniform(0, 180)), 0, 360, color, -1)
+    return img
+
+
+def run_case(case: BenchmarkCase, config: TracerConfig, directory: Path) -> dict[str, Any]:
+    """Generates the assets of a case and traces them, timing each stage
+
+    Args:
+        case (BenchmarkCase): the case
+        config (TracerConfig): the tracer configuration
+        directory (Path): directory in which assets are generated
+
+    Returns:
+        dict[str, Any]: the measurements
+    """
+    model_path: Path = directory / f"{case.name}.obj"
+    texture_path: Path = directory / f"{case.name}.png"
+    mask_path: Path = directory / f"{case.name}-mask.png"
+    vertices, uv, faces = make_mesh(case.mesh, case.faces)
+    write_obj(model_path, vertices, uv, faces)
+    Image.fromarray(make_texture(config.image_size, case.islands, case.fill, case.seed)).save(texture_path)
+    Image.fromarray(np.full(config.image_size[::-1], 255, dtype=np.uint8)).save(mask_path)
+
+    config = dataclasses.replace(config, enable_fill_slicing=case.fill_slicing)
+    tracer: Tracer = Tracer(config, texture_path, model_path, mask_path, PALETTE, (BACKGROUND,))
+    stats: TracingStats = tracer.compute_traces()
+    if not stats.stages:
+        raise ValueError(f"Generated mesh {model_path} has no UV map")
+
+    total: float = sum(profile.wall_time for profile in stats.stages.values())
+    return {
+        "case": dataclasses.asdict(case),
+        "name": case.name,
+        "n_faces": int(len(faces)),
+        "n_islands": stats.n_islands,
+        "n_2d_traces": stats.n_2d_traces,
+        "n_3d_traces": stats.n_3d_traces,
+        "n_points": stats.n_points,
+        "n_removed_points": stats.n_removed_points,
+        "n_stitches": stats.n_stitches,
+        "wall_time": {stage: stats.stages[stage].wall_time for stage in STAGES if stage in stats.stages},
+        "cpu_time": {stage: stats.stages[stage].cpu_time for stage in STAGES if stage in stats.stages},
+        "total_time": total,
+        "points_per_second": stats.n_points / total if total > 0 else None,
+        "peak_rss_mb": stats.peak_rss_mb,
+        "counters": stats.counters
+    }
+
+
+def run_case_isolated(case: BenchmarkCase, config: TracerConfig, directory: Path) -> dict[str, Any]:
+    """Runs a case in a fresh process, so that its peak memory and caches do not leak into other cases
+
+    Args:
+        case (BenchmarkCase): the case
+        config (TracerConfig): the tracer configuration
+        directory (Path): directory in which assets are generated
+
+    Returns:
+        dict[str, Any]: the measurements
+    """
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(1) as pool:
+        return pool.apply(run_case, (case, config, directory))
+
+
+def best_of(runs: list[dict[str, Any]]) -> dict[str, Any]:
+    """Merges repeated runs of a case, keeping the fastest time of each stage and the highest memory peak
+
+    Args:
+        runs (list[dict[str, Any]]): the measurements of each run
+
+    Returns:
+        dict[str, Any]: the merged measurements
+    """
+    result: dict[str, Any] = dict(runs[0])
+    result["wall_time"] = {stage: min(run["wall_time"][stage] for run in runs) for stage in runs[0]["wall_time"]}
+    result["cpu_time"] = {stage: min(run["cpu_time"][stage] for run in runs) for stage in runs[0]["cpu_time"]}
+    result["total_time"] = min(run["total_time"] for run in runs)
+    result["points_per_second"] = max(run["points_per_second"] or 0 for run in runs) or None
+    peaks: list[float] = [run["peak_rss_mb"] for run in runs if run["peak_rss_mb"] is not None]
+    result["peak_rss_mb"] = max(peaks) if peaks else None
+    result["repeat"] = len(runs)
+    return result
+
+
+def compare(results: dict[str, Any], baseline: dict[str, Any], tolerance: float) -> list[str]:
+    """Lists the stages of each case that got slower than the baseline by more than `tolerance`
+
+    Args:
+        results (dict[str, Any]): the new results
+        baseline (dict[str, Any]): the baseline results
+        tolerance (float): accepted relative slowdown
+
+    Returns:
+        list[str]: a description of each regression
+    """
+    baseline_cases: dict[str, dict[str, Any]] = {case["name"]: case for case in baseline["cases"]}
+    regressions: list[str] = []
+    for case in results["cases"]:
+        reference: Optional[dict[str, Any]] = baseline_cases.get(case["name"])
+        if reference is None:
+            continue
+        for stage in (*STAGES, "total"):
+            new: Optional[float] = case["total_time"] if stage == "total" else case["wall_time"].get(stage)
+            old: Optional[float] = reference["total_time"] if stage == "total" else reference["wall_time"].get(stage)
+            if new is None or old is None:
+                continue
+            if old > 0 and new > old * (1 + tolerance):
+                regressions.append(f"{case['name']} {stage}: {old:.3f}s -> {new:.3f}s (+{(new / old - 1) * 100:.0f}%)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the tracing pipeline on procedural meshes and textures")
+    parser.add_argument("--meshes", nargs="+", choices=MESH_KINDS, default=list(MESH_KINDS), help="kinds of meshes")
+    parser.add_argument("--faces", nargs="+", type=int, default=[2_000, 20_000], help="face counts of the meshes")
+    parser.add_argument("--islands", nargs="+", type=int, default=[10, 50], help="numbers of islands on the textures")
+    parser.add_argument("--fill", nargs="+", type=float, default=[0.3], help="fractions of the textures covered by islands")
+    parser.add_argument("--no-fill-slicing", action="store_true", help="only trace island borders")
+    parser.add_argument("--spacing", type=float, default=0.01, help="gap between fill slices (in UV coordinates)")
+    parser.add_argument("--link-fill-slices", action="store_true", help="join consecutive fill slices into strokes")
+    parser.add_argument("--surface-spacing", type=float, help="gap between fill slices on the surface (in model units), instead of --spacing")
+    parser.add_argument("--simplification", type=float, default=0.0, help="simplification tolerance (in model units, 0 to disable)")
+    parser.add_argument("--jit", action="store_true", help="run the Numba-compiled geometry kernels")
+    parser.add_argument("--counters", action="store_true", help="record work counters, at the cost of some overhead")
+    parser.add_argument("--repeat", type=int, default=1, help="number of runs of each case, the fastest one being kept")
+    parser.add_argument("--output", type=Path, help="JSON file in which results are written")
+    parser.add_argument("--compare", type=Path, help="JSON results to compare with, exiting with an error on regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="accepted relative slowdown when comparing")
+    args = parser.parse_args()
+
+    config: TracerConfig = TracerConfig(
+        fill_slice_spacing=args.spacing,
+        link_fill_slices=args.link_fill_slices,
+        fill_spacing_mode="uv" if args.surface_spacing is None else "surface",
+        fill_surface_spacing=args.surface_spacing or 1.0,
+        simplification_tolerance=args.simplification,
+        jit_kernels=args.jit,
+        enable_profiling=args.counters
+    )
+    cases: list[BenchmarkCase] = [
+        BenchmarkCase(mesh, faces, islands, fill, not args.no_fill_slicing)
+        for mesh in args.meshes
+        for faces in args.faces
+        for islands in args.islands
+        for fill in args.fill
+    ]
+
+    measurements: list[dict[str, Any]] = []
+    with tempfile.TemporaryDirectory(prefix="tracing-benchmark-") as tmp:
+        for case in cases:
+            runs: list[dict[str, Any]] = [run_case_isolated(case, config, Path(tmp)) for _ in range(max(args.repeat, 1))]
+            result: dict[str, Any] = best_of(runs)
+            measurements.append(result)
+            stages: str = " ".join(f"{stage}={time:.3f}s" for stage, time in result["wall_time"].items())
+            print(
+                f"{case.name:<32} {result['n_points']:>8} pts {result['total_time']:8.3f}s "
+                f"{result['points_per_second'] or 0:>10.0f} pts/s {result['peak_rss_mb'] or 0:8.1f} MB  {stages}"
+            )
+
+    results: dict[str, Any] = {
+        "version": RESULTS_VERSION,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "config": {key: repr(value) for key, value in dataclasses.asdict(config).items()},
+        "cases": measurements
+    }
+    if args.output is not None:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=4)
+
+    if args.compare is not None:
+        with open(args.compare) as f:
+            regressions: list[str] = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"Regression: {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+from typing import Callable, Optional
+
+import numpy as np
+
+# Offsets of the 3x3 neighbourhood of a grid cell
+NEIGHBOURS: np.ndarray = np.array([(di, dj) for di in (-1, 0, 1) for dj in (-1, 0, 1)])
+
+
+def sample_ring(ring: np.ndarray, step: float) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Samples a closed polygon at regular intervals along its perimeter
+
+    Args:
+        ring (np.ndarray): the vertices of the polygon, without repeating the first one (Nx2)
+        step (float): maximum distance between two samples
+
+    Returns:
+        tuple[np.ndarray, np.ndarray, np.ndarray]: the samples (Mx2), their position along the perimeter (M)
+            and the position of each vertex along the perimeter (N+1, ending with the perimeter)
+    """
+    closed: np.ndarray = np.vstack([ring, ring[:1]])
+    lengths: np.ndarray = np.linalg.norm(np.diff(closed, axis=0), axis=1)
+    offsets: np.ndarray = np.concatenate([[0], np.cumsum(lengths)])
+    counts: np.ndarray = np.maximum(np.ceil(lengths / step).astype(int), 1)
+    segment: np.ndarray = np.repeat(np.arange(len(lengths)), counts)
+    fraction: np.ndarray = (np.arange(len(segment)) - np.repeat(np.cumsum(counts) - counts, counts)) / counts[segment]
+    samples: np.ndarray = closed[segment] + fraction[:, None] * (closed[segment + 1] - closed[segment])
+    return samples, offsets[segment] + fraction * lengths[segment], offsets
+
+
+def cell_keys(points: np.ndarray, cell_size: np.ndarray) -> np.ndarray:
+    """Hashes points to the cells of a regular grid
+
+    Args:
+        points (np.ndarray): the points (...x2)
+        cell_size (np.ndarray): size of the cells along each axis (2)
+
+    Returns:
+        np.ndarray: the key of the cell of each point (...)
+    """
+    cells: np.ndarray = np.floor(points / cell_size).astype(np.int64)
+    return cells[..., 0] * (1 << 32) + cells[..., 1]
+
+
+def point_at(ring: np.ndarray, offsets: np.ndarray, t: float) -> np.ndarray:
+    """Finds the point at a given position along the perimeter of a closed polygon
+
+    Args:
+        ring (np.ndarray): the vertices of the polygon (Nx2)
+        offsets (np.ndarray): the position of each vertex along the perimeter (N+1, see `sample_ring`)
+        t (float): the position along the perimeter
+
+    Returns:
+        np.ndarray: the point (2)
+    """
+    i: int = int(np.clip(np.searchsorted(offsets, t, side="right") - 1, 0, len(ring) - 1))
+    length: float = offsets[i + 1] - offsets[i]
+    fraction: float = (t - offsets[i]) / length if length > 0 else 0.0
+    return ring[i] + fraction * (ring[(i + 1) % len(ring)] - ring[i])
+
+
+def kept_sections(
+        ring: np.ndarray,
+        offsets: np.ndarray,
+        t: np.ndarray,
+        dropped: np.ndarray,
+        min_length: float
+) -> list[np.ndarray]:
+    """Cuts the dropped samples out of a closed polygon
+
+    Args:
+        ring (np.ndarray): the vertices of the polygon (Nx2)
+        offsets (np.ndarray): the position of each vertex along the perimeter (N+1, see `sample_ring`)
+        t (np.ndarray): the position of each sample along the perimeter (M)
+        dropped (np.ndarray): True for each dropped sample (M)
+        min_length (float): sections shorter than this are dropped too
+
+    Returns:
+        list[np.ndarray]: the open paths left (Kx2)
+    """
+    perimeter: float = offsets[-1]
+    kept: np.ndarray = np.flatnonzero(~dropped)
+    # Runs of consecutive kept samples, as [start, end] positions along the perimeter
+    breaks: np.ndarray = np.flatnonzero(np.diff(kept) > 1)
+    runs: list[list[float]] = [
+        [t[kept[start]], t[kept[end]]]
+        for start, end in zip(np.concatenate([[0], breaks + 1]), np.concatenate([breaks, [len(kept) - 1]]))
+    ]
+    # The last run continues with the first one through the start of the polygon
+    if len(runs) > 1 and not dropped[0] and not dropped[-1]:
+        runs[0][0] = runs.pop()[0] - perimeter
+
+    sections: list[np.ndarray] = []
+    for start, end in runs:
+        if end - start < min_length:
+            continue
+        inner: np.ndarray = np.concatenate([offsets[:-1] - perimeter, offsets[:-1]])
+        vertices: np.ndarray = np.concatenate([ring, ring])[(inner > start) & (inner < end)]
+        sections.append(np.vstack([
+            point_at(ring, offsets, start % perimeter),
+            vertices,
+            point_at(ring, offsets, end % perimeter)
+        ]))
+    return sections
+
+
+def share_borders(
+        rings: list[list[np.ndarray]],
+        colors: list[int],
+        cell_size: np.ndarray,
+        wins: Callable[[int, int], bool]
+) -> list[Optional[list[np.ndarray]]]:
+    """Removes the border sections shared with an island of another color that wins them
+
+    Borders are sampled, hashed to a grid, and a sample is shared with a color when one of its neighbouring cells
+    holds a border of that color. Shared samples are dropped unless their color wins against all the others
+
+    Args:
+        rings (list[list[np.ndarray]]): the closed borders of each island (Nx2, without repeating the first vertex)
+        colors (list[int]): the color of each island
+        cell_size (np.ndarray): size of the grid cells along each axis (2)
+        wins (Callable[[int, int], bool]): whether the first color keeps a border it shares with the second one
+
+    Returns:
+        list[Optional[list[np.ndarray]]]: for each island, the paths left of its borders (Kx2): whole closed
+            borders and open sections, or None if none of its borders is shared with a winning color
+    """
+    step: float = float(np.min(cell_size)) / 2
+    sampled: list[list[tuple[np.ndarray, np.ndarray, np.ndarray]]] = [
+        [sample_ring(ring, step) for ring in island_rings]
+        for island_rings in rings
+    ]
+    occupied: dict[int, np.ndarray] = {
+        color: np.unique(np.concatenate([
+            cell_keys(samples, cell_size)
+            for island_samples, island_color in zip(sampled, colors) if island_color == color
+            for samples, _, _ in island_samples
+        ] or [np.zeros(0, dtype=np.int64)]))
+        for color in set(colors)
+    }
+
+    result: list[Optional[list[np.ndarray]]] = []
+    for island_rings, island_samples, color in zip(rings, sampled, colors):
+        paths: list[np.ndarray] = []
+        any_dropped: bool = False
+        for ring, (samples, t, offsets) in zip(island_rings, island_samples):
+            neighbours: np.ndarray = cell_keys(samples[:, None, :] + NEIGHBOURS * cell_size, cell_size)
+            dropped: np.ndarray = np.zeros(len(samples), dtype=bool)
+            for other, keys in occupied.items():
+                if other != color and not wins(color, other):
+                    dropped |= np.isin(neighbours, keys).any(axis=1)
+            any_dropped |= bool(np.any(dropped))
+            if not np.any(dropped):
+                paths.append(np.vstack([ring, ring[:1]]))
+            elif not np.all(dropped):
+                paths.extend(kept_sections(ring, offsets, t, dropped, float(np.min(cell_size))))
+        result.append(paths if any_dropped else None)
+    return result
@@ -1,4 +1,6 @@
 from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
 
 import numpy as np
 
@@ -8,17 +10,53 @@ class TracerConfig:
     debug: bool = False
     """Enable debug visualizations"""
 
+    enable_profiling: bool = False
+    """Whether work counters (points projected, edge walks, bisections...) are recorded in the stats"""
+
     barycentric_epsilon: float = 1e-8
     """A small epsilon to account for floating-point error in barycentric tests"""
 
+    jit_kernels: bool = False
+    """Whether UV lookups, boundary crossings, mesh edge walks and contour cleaning run Numba-compiled kernels (ignored, with a warning, when Numba is not installed)"""
+
+    uv_grid_resolution: Optional[int] = None
+    """Number of cells along each axis of the UV lookup grid (None to derive it from the face count)"""
+
+    mesh_cache_dir: Optional[Path] = None
+    """Directory of the persistent mesh preprocessing cache (None to disable it)"""
+
+    layer_cache_dir: Optional[Path] = None
+    """Directory of the persistent cache of each color layer's islands and traces (None to disable it)"""
+
+    island_workers: int = 1
+    """Number of workers detecting islands and computing their 2D traces (1 to run serially, 0 for one per CPU)"""
+
+    island_executor: str = "thread"
+    """Kind of island workers: either "thread" (OpenCV and shapely release the GIL) or "process" """
+
+    projection_workers: int = 1
+    """Number of processes projecting traces in 3D (1 to project in the current process, 0 for one per CPU)"""
+
+    projection_chunk_size: int = 16
+    """Number of traces sent at once to a projection process"""
+
     fill_slice_spacing: float = 0.05
     """Gap between filling lines (in UV coordinates)"""
 
-    min_segment_length: float = 1
-    """Minimum segment length at which recursive edge detection stops (in 3D units)"""
+    fill_strategy: str = "hatching"
+    """How islands are filled: "hatching" with horizontal slices, or "contour" with rings inset from the island's borders by `fill_slice_spacing` (UV spacing mode only)"""
+
+    link_fill_slices: bool = False
+    """Whether consecutive fill slices are joined into back and forth strokes (or nested contour rings into spirals) when the move between them stays inside the island (off by default, keeping one trace per slice)"""
 
-    max_edge_recursion_depth: int = 100
-    """Maximum edge detection recursion depth"""
+    fill_link_max_ratio: float = 3.0
+    """Maximum length of a move joining two fill slices, relative to the gap between fill slices"""
+
+    fill_spacing_mode: str = "uv"
+    """How fill slices are spaced: "uv" for a constant `fill_slice_spacing` in UV space, "surface" for a constant `fill_surface_spacing` on the model's surface"""
+
+    fill_surface_spacing: float = 1.0
+    """Gap (in model units) between two fill slices on the model's surface, in the "surface" spacing mode"""
 
     sharp_edge_threshold: float = np.cos(np.radians(30))
     """Dot-product threshold when considering sharp edges"""
@@ -26,12 +64,27 @@ class TracerConfig:
     enable_fill_slicing: bool = True
     """Whether islands filling segments should be computed"""
 
+    border_sharing: Optional[str] = None
+    """Which color draws a border shared by islands of two colors: "darker", "lighter", "first" or "last" in the palette (None to draw it in both colors)"""
+
+    border_sharing_distance: float = 3.0
+    """Distance (in texture pixels) within which the borders of two islands are considered shared"""
+
     image_size: tuple[int,int] = (800,800)
     """Size format for the loaded texture image"""
 
+    tile_size: Optional[int] = None
+    """Side (in pixels) of the tiles the texture is masked, quantized and split into islands by, bounding the memory used for large textures (None to process the whole texture at once)"""
+
+    palette_lut_bits: Optional[int] = None
+    """Bits per channel of an RGB to palette lookup table quantizing the texture, a few colors being sent to a close but not the nearest palette color below 8 (None for an exact nearest color search)"""
+
     min_island_surface: int = 100
     """Island's surface as treshold to block too small one's"""
 
+    prefilter_small_islands: bool = False
+    """Whether connected components too small to hold an island are removed before contour extraction"""
+
     contour_epsilon: float = 1e-8
     """A small epsilon to account for colinearity check in island contour cleaning"""
 
@@ -41,6 +94,15 @@ class TracerConfig:
     parallel_angle: float = np.radians(1)
     """Angle radius threshold when considering too parallel faces"""
 
+    stitch_tolerance: float = 0.0
+    """Maximum distance (in model units) between the ends of 3D traces split on a UV seam for them to be stitched back into one trace (0 to disable stitching)"""
+
+    simplification_tolerance: float = 0.0
+    """Distance (in model units) within which 3D trace points are considered redundant and removed (0 to disable simplification)"""
+
+    simplification_max_angle: float = np.radians(5)
+    """Maximum normal deviation (in radians) of a point removed by simplification"""
+
     enable_reduction_visualisation: bool = False
     """Whether reduction's visualisations should be displayed"""
 
@@ -0,0 +1,228 @@
+import numpy as np
+import shapely
+from shapely.geometry import Polygon
+from shapely.geometry.base import BaseGeometry
+from shapely.geometry.polygon import orient
+
+
+def hatch_lines(bounds: tuple[float, float, float, float], spacing: float) -> np.ndarray:
+    """Builds the horizontal hatch lines crossing a bounding box
+
+    Args:
+        bounds (tuple[float, float, float, float]): the bounding box (minx, miny, maxx, maxy)
+        spacing (float): gap between two lines
+
+    Returns:
+        np.ndarray: the hatch lines as a shapely geometry array (N)
+    """
+    minx, miny, maxx, maxy = bounds
+    if spacing <= 0:
+        raise ValueError(f"Fill spacing must be positive, got {spacing}")
+
+    ys: np.ndarray = miny + spacing * np.arange(1, int(np.ceil((maxy - miny) / spacing)) + 1)
+    return row_lines(bounds, ys[ys < maxy])
+
+
+def row_lines(bounds: tuple[float, float, float, float], ys: np.ndarray) -> np.ndarray:
+    """Builds horizontal lines crossing a bounding box at the given heights
+
+    Args:
+        bounds (tuple[float, float, float, float]): the bounding box (minx, miny, maxx, maxy)
+        ys (np.ndarray): the height of each line (N)
+
+    Returns:
+        np.ndarray: the lines as a shapely geometry array (N)
+    """
+    minx, _, maxx, _ = bounds
+    coords: np.ndarray = np.empty((len(ys), 2, 2))
+    coords[:, 0, 0] = minx
+    coords[:, 1, 0] = maxx
+    coords[:, :, 1] = ys[:, None]
+    return shapely.linestrings(coords)
+
+
+def fill_paths(polygon: BaseGeometry, spacing: float) -> list[np.ndarray]:
+    """Computes the scanlines filling a polygon, evenly spaced in UV space
+
+    Args:
+        polygon (BaseGeometry): the (valid) area to fill
+        spacing (float): gap between two scanlines
+
+    Returns:
+        list[np.ndarray]: the scanlines (Nx2), from bottom to top and from left to right
+    """
+    if polygon.is_empty:
+        return []
+    return clip_lines(polygon, hatch_lines(polygon.bounds, spacing))
+
+
+def fill_rows(polygon: BaseGeometry, ys: np.ndarray) -> list[np.ndarray]:
+    """Computes the scanlines filling a polygon at the given heights
+
+    Args:
+        polygon (BaseGeometry): the (valid) area to fill
+        ys (np.ndarray): the height of each scanline, increasing (N)
+
+    Returns:
+        list[np.ndarray]: the scanlines (Nx2), from bottom to top and from left to right
+    """
+    if polygon.is_empty:
+        return []
+    return clip_lines(polygon, row_lines(polygon.bounds, ys))
+
+
+def clip_lines(polygon: BaseGeometry, lines: np.ndarray) -> list[np.ndarray]:
+    """Keeps the parts of horizontal lines inside a polygon
+
+    All lines are intersected with the polygon at once, and only the line parts are kept
+
+    Args:
+        polygon (BaseGeometry): the (valid) area to fill
+        lines (np.ndarray): the lines as a shapely geometry array, from bottom to top (N)
+
+    Returns:
+        list[np.ndarray]: the line parts (Nx2), from bottom to top and from left to right
+    """
+    shapely.prepare(polygon)
+    lines = lines[shapely.intersects(lines, polygon)]
+    parts: np.ndarray = shapely.get_parts(shapely.intersection(lines, polygon))
+    parts = parts[shapely.get_type_id(parts) == shapely.GeometryType.LINESTRING]
+    # A line running through a vertex of the polygon touches it in a single point, returned as a zero-length line
+    parts = parts[shapely.length(parts) > 0]
+    if len(parts) == 0:
+        return []
+
+    coords, index = shapely.get_coordinates(parts, return_index=True)
+    splits: np.ndarray = np.flatnonzero(np.diff(index)) + 1
+    return np.split(coords, splits)
+
+
+def link_scanlines(paths: list[np.ndarray], polygon: BaseGeometry, max_link_length: float) -> list[np.ndarray]:
+    """Links consecutive scanlines into boustrophedon strokes
+
+    Scanlines are visited row by row, each one being appended to a stroke ending on the previous row when the
+    connecting move from the stroke end to the nearest scanline end stays inside the polygon. The scanline is then
+    drawn away from the connection, so the scan direction alternates between rows
+
+    Args:
+        paths (list[np.ndarray]): the scanlines (Nx2), as returned by `fill_paths`
+        polygon (BaseGeometry): the filled area, which connecting moves must stay inside of
+        max_link_length (float): maximum length of a connecting move
+
+    Returns:
+        list[np.ndarray]: the strokes (Nx2)
+    """
+    if not paths:
+        return []
+
+    # Connections run along the border, which must count as inside despite floating-point error
+    tolerance: float = max_link_length * 1e-6
+    area: BaseGeometry = polygon.buffer(tolerance)
+    shapely.prepare(area)
+
+    strokes: list[list[np.ndarray]] = []
+    open_strokes: list[int] = []  # Strokes ending on the previous row
+    row: float = paths[0][0, 1]
+    row_strokes: list[int] = []
+    for path in paths:
+        if path[0, 1] != row:
+            row = path[0, 1]
+            open_strokes, row_strokes = row_strokes, []
+
+        best: tuple[float, int, int] = (np.inf, -1, 0)
+        for o, s in enumerate(open_strokes):
+            end: np.ndarray = strokes[s][-1][-1]
+            for side in (0, -1):
+                length: float = float(np.linalg.norm(path[side] - end))
+                if length < best[0] and length <= max_link_length and area.covers(shapely.linestrings([end, path[side]])):
+                    best = (length, o, side)
+
+        oriented: np.ndarray = path if best[2] == 0 else path[::-1]
+        if best[1] < 0:
+            strokes.append([oriented])
+            row_strokes.append(len(strokes) - 1)
+        else:
+            s = open_strokes.pop(best[1])
+            strokes[s].append(oriented)
+            row_strokes.append(s)
+
+    return [np.concatenate(stroke) for stroke in strokes]
+
+
+def contour_rings(polygon: BaseGeometry, spacing: float) -> list[list[np.ndarray]]:
+    """Computes the rings filling a polygon by repeatedly insetting it
+
+    Each level insets the polygon `spacing` further than the previous one, until nothing is left.
+    Outer rings run counterclockwise and rings around holes clockwise, keeping the filled area on their left
+
+    Args:
+        polygon (BaseGeometry): the (valid) area to fill
+        spacing (float): gap between two rings, and between the first rings and the polygon's borders
+
+    Returns:
+        list[list[np.ndarray]]: the closed rings (Nx2, repeating the first point) of each level, from the outside in
+    """
+    if spacing <= 0:
+        raise ValueError(f"Fill spacing must be positive, got {spacing}")
+
+    levels: list[list[np.ndarray]] = []
+    while True:
+        # Insetting the polygon itself, rather than the previous level, keeps rounding errors from accumulating
+        inset: BaseGeometry = polygon.buffer(-spacing * (len(levels) + 1))
+        rings: list[np.ndarray] = []
+        for part in shapely.get_parts(inset):
+            if not isinstance(part, Polygon) or part.is_empty:
+                continue
+            oriented: Polygon = orient(part)
+            rings.append(np.asarray(oriented.exterior.coords)[:, :2])
+            rings.extend(np.asarray(interior.coords)[:, :2] for interior in oriented.interiors)
+        if not rings:
+            break
+        levels.append(rings)
+    return levels
+
+
+def link_rings(levels: list[list[np.ndarray]], polygon: BaseGeometry, max_link_length: float) -> list[np.ndarray]:
+    """Links nested rings into spiralling strokes
+
+    Rings are visited level by level, each one being appended to a stroke ending on the previous level when the
+    connecting move from the stroke end to the nearest vertex of the ring stays inside the polygon.
+    The ring then starts and ends at this vertex
+
+    Args:
+        levels (list[list[np.ndarray]]): the closed rings of each level, as returned by `contour_rings`
+        polygon (BaseGeometry): the filled area, which connecting moves must stay inside of
+        max_link_length (float): maximum length of a connecting move
+
+    Returns:
+        list[np.ndarray]: the strokes (Nx2)
+    """
+    # Connections may run along the border, which must count as inside despite floating-point error
+    tolerance: float = max_link_length * 1e-6
+    area: BaseGeometry = polygon.buffer(tolerance)
+    shapely.prepare(area)
+
+    strokes: list[list[np.ndarray]] = []
+    open_strokes: list[int] = []  # Strokes ending on the previous level
+    for rings in levels:
+        level_strokes: list[int] = []
+        for ring in rings:
+            best: tuple[float, int, int] = (np.inf, -1, 0)
+            for o, s in enumerate(open_strokes):
+                end: np.ndarray = strokes[s][-1][-1]
+                nearest: int = int(np.argmin(np.linalg.norm(ring[:-1] - end, axis=1)))
+                length: float = float(np.linalg.norm(ring[nearest] - end))
+                if length < best[0] and length <= max_link_length and area.covers(shapely.linestrings([end, ring[nearest]])):
+                    best = (length, o, nearest)
+
+            if best[1] < 0:
+                strokes.append([ring])
+                level_strokes.append(len(strokes) - 1)
+            else:
+                start: int = best[2]
+                s = open_strokes.pop(best[1])
+                strokes[s].append(np.vstack([ring[start:-1], ring[:start + 1]]))
+                level_strokes.append(s)
+        open_strokes = level_strokes
+
+    return [np.concatenate(stroke) for stroke in strokes]
@@ -1,4 +1,5 @@
 from dataclasses import dataclass, field
+from typing import Optional
 
 import numpy as np
 
@@ -12,3 +13,5 @@ class Island:
     outer_border: np.ndarray  # Nx2
     # List of inner(s) border(s)
     inner_borders: list[np.ndarray] = field(default_factory=list)  # Nx2
+    # Paths drawing the borders once the sections shared with other islands are removed (None to draw them whole)
+    border_paths: Optional[list[np.ndarray]] = None  # Nx2
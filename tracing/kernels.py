@@ -0,0 +1,292 @@
+"""Scalar geometry kernels for the tracer hot loops, compiled with Numba when it is installed
+
+Without Numba the kernels are plain Python functions: callers should then keep to their numpy code path
+(see `NUMBA_AVAILABLE`), the kernels being only run directly to check that both paths agree.
+"""
+import math
+from typing import Callable
+
+import numpy as np
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+# Whether the kernels are compiled
+NUMBA_AVAILABLE: bool = numba is not None
+
+
+def jit(function: Callable) -> Callable:
+    """Compiles a kernel with Numba when it is installed
+
+    Args:
+        function (Callable): the kernel
+
+    Returns:
+        Callable: the compiled kernel, or the kernel itself without Numba
+    """
+    if numba is None:
+        return function
+    return numba.njit(cache=True, nogil=True, error_model="numpy")(function)
+
+
+@jit
+def locate_point(
+        u: float,
+        v: float,
+        bounds_min: np.ndarray,
+        bounds_max: np.ndarray,
+        cell_size: np.ndarray,
+        resolution: int,
+        cell_faces: np.ndarray,
+        cell_start: np.ndarray,
+        v0: np.ndarray,
+        v1: np.ndarray,
+        v2: np.ndarray,
+        denom: np.ndarray,
+        epsilon: float
+) -> tuple[int, float, float, float]:
+    """Finds the first face of a UV grid cell whose triangle contains a position, see `UVIndex.locate`
+
+    Args:
+        u (float): the u coordinate of the position
+        v (float): the v coordinate of the position
+        bounds_min, bounds_max, cell_size, resolution, cell_faces, cell_start: the grid of the `UVIndex`
+        v0, v1, v2, denom: the UV triangles of the `UVIndex`
+        epsilon (float): barycentric tolerance
+
+    Returns:
+        tuple[int, float, float, float]: the face index and barycentric coordinates, -1 and NaN outside the UV map
+    """
+    if u < bounds_min[0] or v < bounds_min[1] or u > bounds_max[0] or v > bounds_max[1]:
+        return -1, math.nan, math.nan, math.nan
+    cx: int = min(max(int(math.floor((u - bounds_min[0]) / cell_size[0])), 0), resolution - 1)
+    cy: int = min(max(int(math.floor((v - bounds_min[1]) / cell_size[1])), 0), resolution - 1)
+    cell: int = cy * resolution + cx
+    for k in range(cell_start[cell], cell_start[cell + 1]):
+        f = cell_faces[k]
+        # Degenerate triangles contain no point
+        if denom[f] == 0:
+            continue
+        w0: float = ((v1[f, 1] - v2[f, 1]) * (u - v2[f, 0]) +
+                     (v2[f, 0] - v1[f, 0]) * (v - v2[f, 1])) / denom[f]
+        w1: float = ((v2[f, 1] - v0[f, 1]) * (u - v2[f, 0]) +
+                     (v0[f, 0] - v2[f, 0]) * (v - v2[f, 1])) / denom[f]
+        w2: float = 1.0 - w0 - w1
+        if w0 >= -epsilon and w1 >= -epsilon and w2 >= -epsilon:
+            return int(f), w0, w1, w2
+    return -1, math.nan, math.nan, math.nan
+
+
+@jit
+def crossing_parameter(
+        p1: np.ndarray,
+        p2: np.ndarray,
+        bounds_min: np.ndarray,
+        bounds_max: np.ndarray,
+        cell_size: np.ndarray,
+        resolution: int,
+        cell_edges: np.ndarray,
+        edge_cell_start: np.ndarray,
+        edges: np.ndarray
+) -> float:
+    """Finds the last crossing of the segment (p1,p2) with the boundary edges of a UV grid,
+    see `UVIndex.boundary_crossing`
+
+    Args:
+        p1 (np.ndarray): the start of the segment
+        p2 (np.ndarray): the end of the segment
+        bounds_min, bounds_max, cell_size, resolution: the grid of the `UVIndex`
+        cell_edges, edge_cell_start, edges: the boundary edges of the `UVIndex` and their grid cells
+
+    Returns:
+        float: the position of the crossing along the segment (0 at p1, 1 at p2), -1 if there is none
+    """
+    lower_x: float = max(min(p1[0], p2[0]), bounds_min[0])
+    lower_y: float = max(min(p1[1], p2[1]), bounds_min[1])
+    upper_x: float = min(max(p1[0], p2[0]), bounds_max[0])
+    upper_y: float = min(max(p1[1], p2[1]), bounds_max[1])
+    if lower_x > upper_x or lower_y > upper_y:
+        return -1.0
+
+    x0: int = min(max(int(math.floor((lower_x - bounds_min[0]) / cell_size[0])), 0), resolution - 1)
+    y0: int = min(max(int(math.floor((lower_y - bounds_min[1]) / cell_size[1])), 0), resolution - 1)
+    x1: int = min(max(int(math.floor((upper_x - bounds_min[0]) / cell_size[0])), 0), resolution - 1)
+    y1: int = min(max(int(math.floor((upper_y - bounds_min[1]) / cell_size[1])), 0), resolution - 1)
+
+    rx: float = p2[0] - p1[0]
+    ry: float = p2[1] - p1[1]
+    best: float = -1.0
+    for cy in range(y0, y1 + 1):
+        for cx in range(x0, x1 + 1):
+            cell: int = cy * resolution + cx
+            for k in range(edge_cell_start[cell], edge_cell_start[cell + 1]):
+                edge = cell_edges[k]
+                # Segment/segment intersection: p1 + t * r = a + s * e
+                ex: float = edges[edge, 1, 0] - edges[edge, 0, 0]
+                ey: float = edges[edge, 1, 1] - edges[edge, 0, 1]
+                apx: float = edges[edge, 0, 0] - p1[0]
+                apy: float = edges[edge, 0, 1] - p1[1]
+                d: float = rx * ey - ry * ex
+                if d == 0:
+                    continue
+                t: float = (apx * ey - apy * ex) / d
+                s: float = (apx * ry - apy * rx) / d
+                if 0 <= t <= 1 and 0 <= s <= 1 and t > best:
+                    best = t
+    return best
+
+
+@jit
+def non_collinear_points(points: np.ndarray, epsilon: float) -> np.ndarray:
+    """Finds the points of a closed polygon that are not aligned with their two neighbours, see `Tracer.clean_island`
+
+    Args:
+        points (np.ndarray): the vertices of the polygon (Nx2)
+        epsilon (float): tolerance on the cross product of the two edges around a point
+
+    Returns:
+        np.ndarray: the indices of the points to keep, starting from the second point
+    """
+    n: int = len(points)
+    keep: np.ndarray = np.empty(n, dtype=np.int64)
+    count: int = 0
+    for i in range(n):
+        a = points[i]
+        b = points[(i + 1) % n]
+        c = points[(i + 2) % n]
+        cross: float = (b[0] - a[0]) * (c[1] - a[1]) - (b[1] - a[1]) * (c[0] - a[0])
+        if not abs(cross) < epsilon:
+            keep[count] = (i + 1) % n
+            count += 1
+    return keep[:count]
+
+
+@jit
+def locate_points(
+        uv_pos: np.ndarray,
+        bounds_min: np.ndarray,
+        bounds_max: np.ndarray,
+        cell_size: np.ndarray,
+        resolution: int,
+        cell_faces: np.ndarray,
+        cell_start: np.ndarray,
+        v0: np.ndarray,
+        v1: np.ndarray,
+        v2: np.ndarray,
+        denom: np.ndarray,
+        epsilon: float
+) -> tuple[np.ndarray, np.ndarray]:
+    """Runs `locate_point` on each of the given positions, see `UVIndex.locate_many`
+
+    Args:
+        uv_pos (np.ndarray): the UV positions (Nx2)
+        bounds_min, bounds_max, cell_size, resolution, cell_faces, cell_start: the grid of the `UVIndex`
+        v0, v1, v2, denom: the UV triangles of the `UVIndex`
+        epsilon (float): barycentric tolerance
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: the face indices (N), -1 outside the UV map,
+            and barycentric coordinates (Nx3), NaN outside the UV map
+    """
+    n: int = len(uv_pos)
+    face_idx: np.ndarray = np.full(n, -1, dtype=np.intp)
+    bary: np.ndarray = np.full((n, 3), np.nan)
+    for i in range(n):
+        face, w0, w1, w2 = locate_point(
+            uv_pos[i, 0], uv_pos[i, 1], bounds_min, bounds_max, cell_size, resolution,
+            cell_faces, cell_start, v0, v1, v2, denom, epsilon
+        )
+        if face >= 0:
+            face_idx[i] = face
+            bary[i, 0] = w0
+            bary[i, 1] = w1
+            bary[i, 2] = w2
+    return face_idx, bary
+
+
+@jit
+def walk_faces(
+        face: int,
+        end_face: int,
+        p1: np.ndarray,
+        p2: np.ndarray,
+        neighbors: np.ndarray,
+        v0: np.ndarray,
+        v1: np.ndarray,
+        v2: np.ndarray,
+        denom: np.ndarray
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Follows the segment (p1,p2) across the UV triangles, from the face of p1 towards the face of p2,
+    see `UVIndex.walk`
+
+    Args:
+        face (int): the face containing p1
+        end_face (int): the face containing p2
+        p1 (np.ndarray): the start of the segment
+        p2 (np.ndarray): the end of the segment
+        neighbors (np.ndarray): the adjacency of the faces of the `UVIndex`
+        v0, v1, v2, denom: the UV triangles of the `UVIndex`
+
+    Returns:
+        tuple[np.ndarray, np.ndarray, np.ndarray]: the faces walked through (N), the position along the segment
+            where the walk leaves each of them (N) and the barycentric coordinates of these exit points (Nx3)
+    """
+    capacity: int = 16
+    faces: np.ndarray = np.empty(capacity, dtype=np.intp)
+    exits: np.ndarray = np.empty(capacity)
+    barys: np.ndarray = np.empty((capacity, 3))
+    w_start: np.ndarray = np.empty(3)
+    w_delta: np.ndarray = np.empty(3)
+    faces[0] = face
+    n: int = 1
+    t: float = 0.0
+    for _ in range(len(neighbors)):
+        if face == end_face:
+            break
+
+        w_start[0] = ((v1[face, 1] - v2[face, 1]) * (p1[0] - v2[face, 0]) +
+                      (v2[face, 0] - v1[face, 0]) * (p1[1] - v2[face, 1])) / denom[face]
+        w_start[1] = ((v2[face, 1] - v0[face, 1]) * (p1[0] - v2[face, 0]) +
+                      (v0[face, 0] - v2[face, 0]) * (p1[1] - v2[face, 1])) / denom[face]
+        w_start[2] = 1.0 - w_start[0] - w_start[1]
+        w_delta[0] = ((v1[face, 1] - v2[face, 1]) * (p2[0] - v2[face, 0]) +
+                      (v2[face, 0] - v1[face, 0]) * (p2[1] - v2[face, 1])) / denom[face]
+        w_delta[1] = ((v2[face, 1] - v0[face, 1]) * (p2[0] - v2[face, 0]) +
+                      (v0[face, 0] - v2[face, 0]) * (p2[1] - v2[face, 1])) / denom[face]
+        w_delta[2] = 1.0 - w_delta[0] - w_delta[1]
+        for j in range(3):
+            w_delta[j] -= w_start[j]
+
+        # The segment leaves the face where the first decreasing barycentric coordinate reaches 0
+        k: int = 0
+        t_min: float = math.inf
+        for j in range(3):
+            if w_delta[j] < 0 and -w_start[j] / w_delta[j] < t_min:
+                k = j
+                t_min = -w_start[j] / w_delta[j]
+        t_exit: float = max(t_min, t)
+        if not t_exit < 1:
+            break
+
+        for j in range(3):
+            barys[n - 1, j] = w_start[j] + t_exit * w_delta[j]
+        barys[n - 1, k] = 0.0
+        exits[n - 1] = t_exit
+        face = neighbors[face, k]
+        if face < 0:
+            return faces[:n], exits[:n], barys[:n]
+
+        if n == capacity:
+            capacity *= 2
+            faces = np.concatenate((faces, np.empty(n, dtype=np.intp)))
+            exits = np.concatenate((exits, np.empty(n)))
+            barys = np.concatenate((barys, np.empty((n, 3))))
+        faces[n] = face
+        n += 1
+        t = t_exit
+
+    exits[n - 1] = math.nan
+    barys[n - 1, :] = math.nan
+    return faces[:n], exits[:n], barys[:n]
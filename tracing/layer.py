@@ -0,0 +1,26 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass
+class Layer:
+    """Single color layer of the paletted texture, backed by the shared label image"""
+
+    # Color index
+    color: int
+
+    # Palette index of each pixel of the texture (HxW), shared by all layers
+    labels: np.ndarray
+
+    # Label of this layer's pixels
+    label: int
+
+    @property
+    def mask(self) -> np.ndarray:
+        """Binary mask of the layer, computed on demand
+
+        Returns:
+            np.ndarray: 1 where pixels belong to the layer, else 0 (HxW, uint8)
+        """
+        return (self.labels == self.label).view(np.uint8)
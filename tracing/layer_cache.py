@@ -0,0 +1,203 @@
+import dataclasses
+import hashlib
+import logging
+import os
+import zipfile
+from logging import Logger
+from pathlib import Path
+from typing import Optional, Sequence
+
+import numpy as np
+
+from tracing.config import TracerConfig
+from tracing.island import Island
+from tracing.layer import Layer
+from tracing.layer_result import LayerResult
+from tracing.mesh_cache import load_npz
+from tracing.trace import Trace3D
+
+# Bump when the content of the cached files or the tracing algorithms change
+CACHE_VERSION: int = 1
+
+# Configuration fields that do not change the traces of a layer
+IGNORED_CONFIG_FIELDS: tuple[str, ...] = (
+    "debug",
+    "enable_profiling",
+    "mesh_cache_dir",
+    "layer_cache_dir",
+    "island_workers",
+    "island_executor",
+    "tile_size",
+    "jit_kernels",
+    "projection_workers",
+    "projection_chunk_size",
+    "enable_reduction_visualisation",
+    "enable_inputs_visualisation",
+    "enable_texture_transformation_visualisation",
+    "enable_island_selection_visualisation",
+)
+
+
+def pack(arrays: Sequence[np.ndarray], width: int) -> tuple[np.ndarray, np.ndarray]:
+    """Concatenates arrays of rows
+
+    Args:
+        arrays (Sequence[np.ndarray]): the arrays (Nxwidth)
+        width (int): number of columns
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: the start of each array followed by the total number of rows, and the rows
+    """
+    offsets: np.ndarray = np.concatenate([[0], np.cumsum([len(a) for a in arrays])]).astype(np.int64)
+    rows: np.ndarray = np.concatenate([np.reshape(a, (-1, width)) for a in arrays] or [np.empty((0, width))])
+    return offsets, rows
+
+
+def unpack(offsets: np.ndarray, rows: np.ndarray) -> list[np.ndarray]:
+    """Splits rows concatenated by `pack`
+
+    Args:
+        offsets (np.ndarray): the start of each array followed by the total number of rows
+        rows (np.ndarray): the rows
+
+    Returns:
+        list[np.ndarray]: the arrays
+    """
+    return np.split(rows, offsets[1:-1]) if len(offsets) > 1 else []
+
+
+class LayerCache:
+    """Persistent cache of the islands and traces of each color layer
+
+    Entries are keyed by the layer's mask, the configuration and the mesh,
+    so re-tracing after a change only recomputes the layers it affected.
+    """
+
+    def __init__(self, directory: Path, mmap: bool = True):
+        """Initializes the cache
+
+        Args:
+            directory (Path): directory in which cache entries are stored
+            mmap (bool, optional): whether to memory-map cached arrays instead of reading them. Defaults to True.
+        """
+        self.logger: Logger = logging.getLogger("LayerCache")
+        self.directory: Path = directory
+        self.mmap: bool = mmap
+
+    def key(self, layer: Layer, config: TracerConfig, mesh_hash: str) -> str:
+        """Computes the cache key of a layer
+
+        Args:
+            layer (Layer): the color layer
+            config (TracerConfig): the tracer configuration
+            mesh_hash (str): the content hash of the mesh file
+
+        Returns:
+            str: the cache key
+        """
+        mask: np.ndarray = layer.mask
+        params: str = repr(sorted(
+            (field.name, repr(getattr(config, field.name)))
+            for field in dataclasses.fields(config)
+            if field.name not in IGNORED_CONFIG_FIELDS
+        ))
+
+        digest = hashlib.sha256()
+        digest.update(f"v{CACHE_VERSION}-{layer.color}-{mask.shape}-{mesh_hash}-{params}".encode())
+        digest.update(np.packbits(mask).tobytes())
+        return digest.hexdigest()
+
+    def entry_path(self, key: str) -> Path:
+        return self.directory / f"layer-{key}.npz"
+
+    def load(self, key: str) -> Optional[LayerResult]:
+        """Loads the cached result of a layer
+
+        Args:
+            key (str): the cache key
+
+        Returns:
+            Optional[LayerResult]: the result, or None if not cached
+        """
+        path: Path = self.entry_path(key)
+        if not path.exists():
+            return None
+
+        self.logger.info(f"Loading cached layer {path}")
+        try:
+            arrays: dict[str, np.ndarray] = load_npz(path, self.mmap)
+            color: int = int(arrays["color"])
+
+            rings: list[np.ndarray] = unpack(arrays["ring_offsets"], arrays["rings"])
+            ring_starts: np.ndarray = np.concatenate([[0], np.cumsum(arrays["island_ring_counts"])])
+            islands: list[Island] = [
+                Island(color=color, outer_border=rings[start], inner_borders=rings[start + 1:end])
+                for start, end in zip(ring_starts[:-1], ring_starts[1:])
+            ]
+
+            paths: list[np.ndarray] = unpack(arrays["path_offsets"], arrays["paths"])
+            offsets: np.ndarray = arrays["trace_offsets"]
+            traces_3d: list[Optional[list[Trace3D]]] = [
+                [] if projected else None
+                for projected in arrays["projected"]
+            ]
+            for t, parent in enumerate(arrays["trace_parents"]):
+                start, end = int(offsets[t]), int(offsets[t + 1])
+                traces_3d[parent].append(Trace3D(  # type: ignore
+                    parent_2d_trace=int(parent),
+                    color=color,
+                    pos=arrays["pos"][start:end],
+                    normal=arrays["normal"][start:end],
+                    face_idx=arrays["face_idx"][start:end],
+                    uv=arrays["uv"][start:end]
+                ))
+        except (OSError, KeyError, ValueError, IndexError, zipfile.BadZipFile) as e:
+            self.logger.warning(f"Ignoring invalid cache entry {path}: {e}")
+            return None
+
+        return LayerResult(color=color, islands=islands, paths=paths, traces_3d=traces_3d)
+
+    def store(self, key: str, result: LayerResult):
+        """Stores the result of a layer
+
+        Args:
+            key (str): the cache key
+            result (LayerResult): the result
+        """
+        path: Path = self.entry_path(key)
+        self.logger.info(f"Caching layer in {path}")
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        ring_offsets, rings = pack([
+            ring
+            for island in result.islands
+            for ring in [island.outer_border, *island.inner_borders]
+        ], 2)
+        path_offsets, paths = pack(result.paths, 2)
+        traces: list[Trace3D] = [
+            trace
+            for traces_3d in result.traces_3d
+            for trace in traces_3d or []
+        ]
+        trace_offsets, pos = pack([trace.pos for trace in traces], 3)
+
+        # Write to a temporary file first so that concurrent runs never read a partial entry
+        tmp_path: Path = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                color=np.array(result.color),
+                ring_offsets=ring_offsets,
+                rings=rings,
+                island_ring_counts=np.array([1 + len(island.inner_borders) for island in result.islands], dtype=np.int64),
+                path_offsets=path_offsets,
+                paths=paths,
+                projected=np.array([traces_3d is not None for traces_3d in result.traces_3d], dtype=bool),
+                trace_offsets=trace_offsets,
+                trace_parents=np.array([trace.parent_2d_trace for trace in traces], dtype=np.int64),
+                pos=pos,
+                normal=pack([trace.normal for trace in traces], 3)[1],
+                face_idx=np.concatenate([trace.face_idx for trace in traces] or [np.empty(0, dtype=np.intp)]),
+                uv=pack([trace.uv for trace in traces], 2)[1]
+            )
+        os.replace(tmp_path, path)
@@ -0,0 +1,25 @@
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from tracing.island import Island
+from tracing.trace import Trace3D
+
+
+@dataclass
+class LayerResult:
+    """Islands and traces computed for a single color layer"""
+
+    # Color index
+    color: int
+
+    # Detected islands
+    islands: list[Island]
+
+    # 2D paths in UV space (Nx2), in island order
+    paths: list[np.ndarray]
+
+    # 3D traces of each 2D path, or None if the path could not be projected.
+    # Their `parent_2d_trace` is the index of the path in `paths`
+    traces_3d: list[Optional[list[Trace3D]]]
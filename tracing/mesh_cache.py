@@ -0,0 +1,198 @@
+import hashlib
+import logging
+import os
+import zipfile
+from logging import Logger
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+from trimesh import Trimesh
+from trimesh.visual import TextureVisuals
+
+from tracing.uv_index import UVIndex
+
+# Bump when the content of the cached files changes
+CACHE_VERSION: int = 1
+
+
+def file_hash(path: Path) -> str:
+    """Computes the SHA-256 hash of a file's content
+
+    Args:
+        path (Path): path of the file
+
+    Returns:
+        str: the hexadecimal digest
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_npz(path: Path, mmap: bool = True) -> dict[str, np.ndarray]:
+    """Loads all arrays of an uncompressed `.npz` archive
+
+    `np.load` cannot memory-map the members of an archive, so their offsets are resolved manually
+
+    Args:
+        path (Path): path of the archive
+        mmap (bool, optional): whether to memory-map the arrays instead of reading them. Defaults to True.
+
+    Returns:
+        dict[str, np.ndarray]: the arrays, by name
+    """
+    if not mmap:
+        with np.load(path) as data:
+            return {name: data[name] for name in data.files}
+
+    arrays: dict[str, np.ndarray] = {}
+    with zipfile.ZipFile(path) as archive, open(path, "rb") as f:
+        for info in archive.infolist():
+            if info.compress_type != zipfile.ZIP_STORED:
+                raise ValueError(f"Cannot memory-map compressed member {info.filename} of {path}")
+
+            # Skip the local file header (30 bytes + name + extra field)
+            f.seek(info.header_offset + 26)
+            name_length: int = int.from_bytes(f.read(2), "little")
+            extra_length: int = int.from_bytes(f.read(2), "little")
+            f.seek(info.header_offset + 30 + name_length + extra_length)
+
+            major, _ = np.lib.format.read_magic(f)
+            if major == 1:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+            name: str = info.filename.removesuffix(".npy")
+            if dtype.hasobject or 0 in shape:
+                arrays[name] = np.zeros(shape, dtype=dtype)
+                continue
+            arrays[name] = np.memmap(
+                path,
+                dtype=dtype,
+                mode="r",
+                offset=f.tell(),
+                shape=shape,
+                order="F" if fortran_order else "C"
+            )
+    return arrays
+
+
+class MeshCache:
+    """Persistent cache of the mesh preprocessing (UV index, adjacency, UV coverage masks)
+
+    Entries are keyed by the content hash of the mesh file, so any run after the first one
+    skips loading the mesh file and rebuilding the derived arrays.
+    """
+
+    def __init__(self, directory: Path, mmap: bool = True):
+        """Initializes the cache
+
+        Args:
+            directory (Path): directory in which cache entries are stored
+            mmap (bool, optional): whether to memory-map cached arrays instead of reading them. Defaults to True.
+        """
+        self.logger: Logger = logging.getLogger("MeshCache")
+        self.directory: Path = directory
+        self.mmap: bool = mmap
+
+    def key(self, model_path: Path, resolution: Optional[int], epsilon: float) -> str:
+        """Computes the cache key of a mesh file with the given index parameters
+
+        Args:
+            model_path (Path): path of the mesh file
+            resolution (Optional[int]): resolution of the UV index
+            epsilon (float): barycentric tolerance of the UV index
+
+        Returns:
+            str: the cache key
+        """
+        params: str = f"v{CACHE_VERSION}-{resolution}-{epsilon!r}"
+        return f"{file_hash(model_path)}-{hashlib.sha256(params.encode()).hexdigest()[:12]}"
+
+    def entry_path(self, key: str) -> Path:
+        return self.directory / f"{key}.npz"
+
+    def coverage_path(self, key: str, size: tuple[int, int]) -> Path:
+        return self.directory / f"{key}-coverage-{size[0]}x{size[1]}.npy"
+
+    def load(self, key: str) -> Optional[tuple[Trimesh, UVIndex]]:
+        """Loads a cached mesh and its UV index
+
+        Args:
+            key (str): the cache key
+
+        Returns:
+            Optional[tuple[Trimesh, UVIndex]]: the mesh and its index, or None if not cached
+        """
+        path: Path = self.entry_path(key)
+        if not path.exists():
+            return None
+
+        self.logger.info(f"Loading cached mesh {path}")
+        try:
+            arrays: dict[str, np.ndarray] = load_npz(path, self.mmap)
+            index: UVIndex = UVIndex.from_arrays(arrays)
+        except (OSError, KeyError, ValueError, zipfile.BadZipFile) as e:
+            self.logger.warning(f"Ignoring invalid cache entry {path}: {e}")
+            return None
+
+        mesh: Trimesh = Trimesh(
+            vertices=arrays["vertices"],
+            faces=arrays["faces"],
+            face_normals=arrays["face_normals"],
+            visual=TextureVisuals(uv=arrays["uv"]),
+            process=False,
+            validate=False
+        )
+        return mesh, index
+
+    def store(self, key: str, mesh: Trimesh, index: UVIndex):
+        """Stores a mesh and its UV index
+
+        Args:
+            key (str): the cache key
+            mesh (Trimesh): the mesh, with UV coordinates
+            index (UVIndex): its UV index
+        """
+        path: Path = self.entry_path(key)
+        self.logger.info(f"Caching mesh preprocessing in {path}")
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        # Write to a temporary file first so that concurrent runs never read a partial entry
+        tmp_path: Path = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez(f, uv=np.asarray(mesh.visual.uv), **index.to_arrays())  # type: ignore
+        os.replace(tmp_path, path)
+
+    def load_coverage(self, key: str, size: tuple[int, int]) -> Optional[np.ndarray]:
+        """Loads a cached UV coverage mask
+
+        Args:
+            key (str): the cache key of the mesh
+            size (tuple[int, int]): size of the texture (w,h)
+
+        Returns:
+            Optional[np.ndarray]: the coverage mask (hxw), or None if not cached
+        """
+        path: Path = self.coverage_path(key, size)
+        if not path.exists():
+            return None
+        return np.load(path, mmap_mode="r" if self.mmap else None)
+
+    def store_coverage(self, key: str, size: tuple[int, int], coverage: np.ndarray):
+        """Stores a UV coverage mask
+
+        Args:
+            key (str): the cache key of the mesh
+            size (tuple[int, int]): size of the texture (w,h)
+            coverage (np.ndarray): the coverage mask (hxw)
+        """
+        path: Path = self.coverage_path(key, size)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp_path: Path = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            np.save(f, coverage)
+        os.replace(tmp_path, path)
@@ -0,0 +1,126 @@
+from functools import lru_cache
+from typing import Optional, Sequence
+
+import numpy as np
+
+from tracing.color import Color
+
+# Label of pixels that do not belong to any palette color
+NO_LABEL: int = 255
+
+
+def normalize_palette(palette: Sequence[Sequence[int]]) -> tuple[Color, ...]:
+    """Converts a palette to a hashable tuple of colors
+
+    Args:
+        palette (Sequence[Sequence[int]]): the palette, e.g. a list of lists
+
+    Returns:
+        tuple[Color, ...]: the palette as a tuple of (r,g,b) tuples
+    """
+    return tuple((int(r), int(g), int(b)) for r, g, b in palette)
+
+
+@lru_cache(maxsize=16)
+def palette_lut(palette: tuple[Color, ...], bits: int) -> np.ndarray:
+    """Builds the lookup table giving the index of the nearest palette color of each RGB color
+
+    Colors are quantized to `bits` bits per channel and compared through the center of their bin,
+    so `bits=8` gives the exact nearest color. Tables are cached per palette.
+
+    Args:
+        palette (tuple[Color, ...]): the palette (at most 255 colors)
+        bits (int): number of bits per channel, between 1 and 8
+
+    Returns:
+        np.ndarray: the read-only lookup table, indexed by quantized (r,g,b) (2^bits x 2^bits x 2^bits)
+    """
+    if not 1 <= bits <= 8:
+        raise ValueError(f"Lookup table bits must be between 1 and 8, got {bits}")
+    if not 0 < len(palette) < NO_LABEL:
+        raise ValueError(f"Palette must contain between 1 and {NO_LABEL - 1} colors, got {len(palette)}")
+
+    levels: int = 1 << bits
+    step: int = 256 // levels
+    centers: np.ndarray = np.arange(levels, dtype=np.float32) * step + (step - 1) / 2
+    colors: np.ndarray = np.asarray(palette, dtype=np.float32)
+
+    green, blue = np.meshgrid(centers, centers, indexing="ij")
+    slab: np.ndarray = np.column_stack([np.zeros(levels * levels, dtype=np.float32), green.ravel(), blue.ravel()])
+    lut: np.ndarray = np.empty((levels, levels * levels), dtype=np.uint8)
+
+    # One slab of red values at a time keeps the distance matrix small, even for 8 bits
+    for r in range(levels):
+        slab[:, 0] = centers[r]
+        distances: np.ndarray = ((slab[:, None, :] - colors[None, :, :]) ** 2).sum(axis=-1)
+        lut[r] = np.argmin(distances, axis=1)
+
+    lut = lut.reshape(levels, levels, levels)
+    lut.flags.writeable = False
+    return lut
+
+
+def nearest_labels(pixels: np.ndarray, palette: Sequence[Sequence[int]]) -> np.ndarray:
+    """Maps each pixel to the index of its exact nearest palette color
+
+    Distances are only computed for the distinct colors of the pixels, which textures have few of
+
+    Args:
+        pixels (np.ndarray): RGB pixels (...x3, uint8)
+        palette (Sequence[Sequence[int]]): the palette (at most 255 colors)
+
+    Returns:
+        np.ndarray: the palette index of each pixel (..., uint8), the first one of equally near colors
+    """
+    colors: tuple[Color, ...] = normalize_palette(palette)
+    if not 0 < len(colors) < NO_LABEL:
+        raise ValueError(f"Palette must contain between 1 and {NO_LABEL - 1} colors, got {len(colors)}")
+
+    rgb: np.ndarray = np.asarray(pixels, dtype=np.uint8)
+    keys: np.ndarray = (rgb[..., 0].astype(np.uint32) << 16) | (rgb[..., 1].astype(np.uint32) << 8) | rgb[..., 2]
+    unique, inverse = np.unique(keys.ravel(), return_inverse=True)
+    unique_rgb: np.ndarray = np.column_stack([unique >> 16, (unique >> 8) & 0xFF, unique & 0xFF]).astype(np.int32)
+
+    # Squared distances between 8-bit colors are exact in 32-bit integers
+    labels: np.ndarray = np.empty(len(unique), dtype=np.uint8)
+    chunk: int = 1 << 16
+    for start in range(0, len(unique), chunk):
+        differences: np.ndarray = unique_rgb[start:start + chunk, None, :] - np.asarray(colors, dtype=np.int32)[None, :, :]
+        labels[start:start + chunk] = np.argmin((differences * differences).sum(axis=-1), axis=1)
+    return labels[inverse].reshape(keys.shape)
+
+
+def quantize_labels(pixels: np.ndarray, palette: Sequence[Sequence[int]], bits: Optional[int] = None) -> np.ndarray:
+    """Maps each pixel to the index of its nearest palette color
+
+    Args:
+        pixels (np.ndarray): RGB pixels (...x3, uint8)
+        palette (Sequence[Sequence[int]]): the palette
+        bits (Optional[int], optional): number of bits per channel of the lookup table used to find approximate
+            nearest colors (see `palette_lut`). Defaults to None (exact nearest colors, see `nearest_labels`).
+
+    Returns:
+        np.ndarray: the palette index of each pixel (..., uint8)
+    """
+    if bits is None:
+        return nearest_labels(pixels, palette)
+    lut: np.ndarray = palette_lut(normalize_palette(palette), bits)
+    quantized: np.ndarray = np.asarray(pixels, dtype=np.uint8) >> (8 - bits)
+    return lut[quantized[..., 0], quantized[..., 1], quantized[..., 2]]
+
+
+def color_label(color: Sequence[int], palette: Sequence[Sequence[int]]) -> int:
+    """Finds the label given to pixels of the given color
+
+    Duplicated palette colors all share the label of their first occurrence
+
+    Args:
+        color (Sequence[int]): an RGB color
+        palette (Sequence[Sequence[int]]): the palette
+
+    Returns:
+        int: the index of the first palette entry equal to `color`, or `NO_LABEL`
+    """
+    normalized: tuple[Color, ...] = normalize_palette(palette)
+    target: Color = normalize_palette([color])[0]
+    return normalized.index(target) if target in normalized else NO_LABEL
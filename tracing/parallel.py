@@ -0,0 +1,280 @@
+from __future__ import annotations
+
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from multiprocessing.shared_memory import SharedMemory
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Optional, TypeVar
+
+import numpy as np
+from trimesh import Trimesh
+from trimesh.visual import TextureVisuals
+
+from tracing.config import TracerConfig
+from tracing.trace import Trace2D, Trace3D
+from tracing.uv_index import UVIndex
+
+if TYPE_CHECKING:
+    from tracing.tracer import Tracer
+
+# Name, shape and dtype of an array stored in shared memory
+SharedArraySpec = tuple[str, tuple[int, ...], str]
+
+T = TypeVar("T")
+
+# State of a worker process, set by `init_worker`
+worker_tracer: Optional[Tracer] = None
+worker_memory: list[SharedMemory] = []
+
+
+def share_arrays(arrays: dict[str, np.ndarray]) -> tuple[list[SharedMemory], dict[str, SharedArraySpec]]:
+    """Copies arrays into shared memory blocks
+
+    The caller owns the returned blocks and must close and unlink them once workers are done
+
+    Args:
+        arrays (dict[str, np.ndarray]): the arrays to share, by name
+
+    Returns:
+        tuple[list[SharedMemory], dict[str, SharedArraySpec]]: the shared memory blocks and the specs to attach them
+    """
+    blocks: list[SharedMemory] = []
+    specs: dict[str, SharedArraySpec] = {}
+    for name, array in arrays.items():
+        array = np.asarray(array, order="C")
+        block: SharedMemory = SharedMemory(create=True, size=max(array.nbytes, 1))
+        np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+        blocks.append(block)
+        specs[name] = (block.name, array.shape, array.dtype.str)
+    return blocks, specs
+
+
+def attach_arrays(specs: dict[str, SharedArraySpec]) -> tuple[list[SharedMemory], dict[str, np.ndarray]]:
+    """Maps arrays shared by `share_arrays` in the current process, without copying them
+
+    Worker processes share the resource tracker of their parent, which unlinks the blocks
+
+    Args:
+        specs (dict[str, SharedArraySpec]): the specs of the shared arrays
+
+    Returns:
+        tuple[list[SharedMemory], dict[str, np.ndarray]]: the attached blocks (to keep alive) and the read-only arrays
+    """
+    blocks: list[SharedMemory] = []
+    arrays: dict[str, np.ndarray] = {}
+    for name, (block_name, shape, dtype) in specs.items():
+        block: SharedMemory = SharedMemory(name=block_name)
+        array: np.ndarray = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+        array.flags.writeable = False
+        blocks.append(block)
+        arrays[name] = array
+    return blocks, arrays
+
+
+def init_worker(config: TracerConfig, specs: Optional[dict[str, SharedArraySpec]] = None):
+    """Initializes a worker process with its own tracer and, optionally, the shared mesh
+
+    Args:
+        config (TracerConfig): the tracer configuration
+        specs (Optional[dict[str, SharedArraySpec]], optional): the specs of the shared mesh arrays. Defaults to None.
+    """
+    from tracing.tracer import Tracer
+
+    global worker_tracer, worker_memory
+    worker_tracer = Tracer(config, Path(), Path(), Path(), (), ())
+    if specs is None:
+        return
+
+    worker_memory, arrays = attach_arrays(specs)
+    mesh: Trimesh = Trimesh(
+        vertices=arrays["vertices"],
+        faces=arrays["faces"],
+        face_normals=arrays["face_normals"],
+        visual=TextureVisuals(uv=arrays["uv"]),
+        process=False,
+        validate=False
+    )
+    worker_tracer.model = mesh
+    worker_tracer.uv_index = UVIndex.from_arrays(arrays)
+    worker_tracer.uv_index_mesh = mesh
+    if "v_gradients" in arrays:
+        worker_tracer.v_gradients = arrays["v_gradients"]
+        worker_tracer.v_gradients_mesh = mesh
+
+
+def mesh_arrays(tracer: Tracer, mesh: Trimesh, with_gradients: bool = False) -> dict[str, np.ndarray]:
+    """Gathers the arrays a worker process needs to rebuild the mesh and its UV index (see `init_worker`)
+
+    Args:
+        tracer (Tracer): the tracer, whose UV index is built if needed
+        mesh (Trimesh): the mesh
+        with_gradients (bool, optional): whether the surface gradients of v are shared too, for fill slices spaced
+            on the surface. Defaults to False.
+
+    Returns:
+        dict[str, np.ndarray]: the arrays, by name
+    """
+    arrays: dict[str, np.ndarray] = tracer.get_uv_index(mesh).to_arrays()
+    arrays["uv"] = np.asarray(mesh.visual.uv)  # type: ignore
+    if with_gradients:
+        arrays["v_gradients"] = tracer.get_v_gradients(mesh)
+    return arrays
+
+
+def call_worker(function: Callable[..., T], *args) -> T:
+    """Calls a `Tracer` method on the tracer of the current worker process
+
+    Args:
+        function (Callable[..., T]): the (unbound) method
+
+    Returns:
+        T: the result of the call
+    """
+    if worker_tracer is None:
+        raise RuntimeError("Worker is not initialized")
+    return function(worker_tracer, *args)
+
+
+def map_concurrently(
+        tracer: Tracer,
+        function: Callable[..., T],
+        args_list: list[tuple],
+        n_workers: int,
+        executor_kind: str,
+        progress_callback: Callable[[int, int], None],
+        shared_arrays: Optional[dict[str, np.ndarray]] = None
+) -> list[T]:
+    """Applies a `Tracer` method to each set of arguments with a pool of threads or processes
+
+    Threads call the method on `tracer` itself, processes on their own tracer built from its configuration
+    and, if given, the mesh arrays shared with them
+
+    Args:
+        tracer (Tracer): the tracer
+        function (Callable[..., T]): the (unbound) method
+        args_list (list[tuple]): the arguments of each call
+        n_workers (int): number of workers
+        executor_kind (str): "thread" or "process"
+        progress_callback (Callable[[int, int], None]): called with the number of completed calls and the total
+        shared_arrays (Optional[dict[str, np.ndarray]], optional): the mesh arrays process workers need
+            (see `mesh_arrays`). Defaults to None.
+
+    Returns:
+        list[T]: the results of each call, in the same order as `args_list`
+    """
+    blocks: list[SharedMemory] = []
+    executor: Executor
+    if executor_kind == "thread":
+        executor = ThreadPoolExecutor(max_workers=n_workers)
+    elif executor_kind == "process":
+        specs: Optional[dict[str, SharedArraySpec]] = None
+        if shared_arrays is not None:
+            blocks, specs = share_arrays(shared_arrays)
+        executor = ProcessPoolExecutor(max_workers=n_workers, initializer=init_worker, initargs=(tracer.config, specs))
+    else:
+        raise ValueError(f"Unknown executor kind {executor_kind!r}")
+
+    results: list[Optional[T]] = [None] * len(args_list)
+    try:
+        with executor:
+            futures: dict[Future, int] = {}
+            for i, args in enumerate(args_list):
+                if executor_kind == "thread":
+                    futures[executor.submit(function, tracer, *args)] = i
+                else:
+                    futures[executor.submit(call_worker, function, *args)] = i
+
+            for done, future in enumerate(as_completed(futures), start=1):
+                results[futures[future]] = future.result()
+                progress_callback(done, len(args_list))
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+    return results  # type: ignore
+
+
+def project_chunk(
+        traces: list[Trace2D]
+) -> tuple[list[Optional[list[Trace3D]]], dict[str, int], dict[str, int]]:
+    """Projects a chunk of traces in a worker process
+
+    Args:
+        traces (list[Trace2D]): the traces to project
+
+    Returns:
+        tuple[list[Optional[list[Trace3D]]], dict[str, int], dict[str, int]]: the 3D traces of each 2D trace,
+            and the profiling counters and maxima of the chunk
+    """
+    if worker_tracer is None or worker_tracer.model is None:
+        raise RuntimeError("Projection worker is not initialized")
+    worker_tracer.profiler.reset_counters()
+    results: list[Optional[list[Trace3D]]] = [
+        worker_tracer.project_trace_to_3d(trace, worker_tracer.model)
+        for trace in traces
+    ]
+    return results, worker_tracer.profiler.counters, worker_tracer.profiler.maxima
+
+
+def project_traces_parallel(
+        tracer: Tracer,
+        traces: list[Trace2D],
+        mesh: Trimesh,
+        n_workers: int,
+        chunk_size: int,
+        progress_callback: Callable[[int, int, str], None]
+) -> list[Optional[list[Trace3D]]]:
+    """Projects 2D traces on the mesh with a pool of worker processes
+
+    The mesh and its UV index are shared with the workers through shared memory, and their profiling counters
+    are merged into the tracer's. Results are returned in the same order as `traces`, whatever the order in which chunks complete
+
+    Args:
+        tracer (Tracer): the tracer, whose configuration is used by the workers
+        traces (list[Trace2D]): the traces to project
+        mesh (Trimesh): the mesh
+        n_workers (int): number of worker processes
+        chunk_size (int): number of traces sent to a worker at once
+        progress_callback (Callable[[int, int, str], None]): progress callback
+
+    Returns:
+        list[Optional[list[Trace3D]]]: the 3D traces of each 2D trace
+    """
+    blocks, specs = share_arrays(mesh_arrays(tracer, mesh))
+
+    chunk_size = max(chunk_size, 1)
+    chunks: list[list[Trace2D]] = [
+        [
+            Trace2D(i=trace.i, color=trace.color, path=np.asarray(trace.path))
+            for trace in traces[start:start + chunk_size]
+        ]
+        for start in range(0, len(traces), chunk_size)
+    ]
+    results: list[Optional[list[Optional[list[Trace3D]]]]] = [None] * len(chunks)
+
+    try:
+        with ProcessPoolExecutor(
+                max_workers=n_workers,
+                initializer=init_worker,
+                initargs=(tracer.config, specs)
+        ) as executor:
+            futures: dict[Future, int] = {
+                executor.submit(project_chunk, chunk): c
+                for c, chunk in enumerate(chunks)
+            }
+            done: int = 0
+            for future in as_completed(futures):
+                c: int = futures[future]
+                results[c], counters, maxima = future.result()
+                tracer.profiler.merge(counters, maxima)
+                done += len(chunks[c])
+                progress_callback(done, len(traces), "(3 / 3) 3D projection")
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+    return [
+        traces_3d
+        for chunk_results in results
+        for traces_3d in chunk_results or []
+    ]
@@ -0,0 +1,122 @@
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional
+
+from tracing.stage_profile import StageProfile
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of the current process
+
+    Returns:
+        Optional[float]: the peak RSS in MB, or None if unavailable on this platform
+    """
+    if resource is None:
+        return None
+    peak: int = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1 << 20) if sys.platform == "darwin" else peak / (1 << 10)
+
+
+class Profiler:
+    """Records the time spent in each tracing stage, and counters of the work done
+
+    Counters are only updated when enabled, as some of them are incremented in hot loops.
+    Updates are thread-safe, so that stages running on threads can share a profiler.
+    """
+
+    def __init__(self, enabled: bool = False, hook: Optional[Callable[[str, StageProfile], None]] = None):
+        """Initializes the profiler
+
+        Args:
+            enabled (bool, optional): whether counters are updated. Defaults to False.
+            hook (Optional[Callable[[str, StageProfile], None]], optional): called with the name and profile of each completed stage. Defaults to None.
+        """
+        self.enabled: bool = enabled
+        self.hook: Optional[Callable[[str, StageProfile], None]] = hook
+        self.stages: dict[str, StageProfile] = {}
+        self.counters: dict[str, int] = {}
+        self.maxima: dict[str, int] = {}
+        self.lock: threading.Lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name: str, n_items: int = 0) -> Iterator[StageProfile]:
+        """Times a stage, adding to the previous time of the stage with the same name
+
+        Args:
+            name (str): name of the stage
+            n_items (int, optional): number of items processed by the stage. Defaults to 0.
+
+        Yields:
+            StageProfile: the profile of the stage
+        """
+        profile: StageProfile = self.stages.setdefault(name, StageProfile())
+        wall_start: float = time.perf_counter()
+        cpu_start: float = time.process_time()
+        try:
+            yield profile
+        finally:
+            profile.wall_time += time.perf_counter() - wall_start
+            profile.cpu_time += time.process_time() - cpu_start
+            profile.n_items += n_items
+            if self.hook is not None:
+                self.hook(name, profile)
+
+    def count(self, name: str, n: int = 1):
+        """Increments a counter
+
+        Args:
+            name (str): name of the counter
+            n (int, optional): increment. Defaults to 1.
+        """
+        if not self.enabled:
+            return
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def maximum(self, name: str, value: int):
+        """Records the highest value reached by a quantity
+
+        Args:
+            name (str): name of the quantity
+            value (int): the current value
+        """
+        if not self.enabled:
+            return
+        with self.lock:
+            if value > self.maxima.get(name, value - 1):
+                self.maxima[name] = value
+
+    def merge(self, counters: dict[str, int], maxima: dict[str, int]):
+        """Adds the counters recorded by another profiler, e.g. in a worker process
+
+        Args:
+            counters (dict[str, int]): counters to add
+            maxima (dict[str, int]): maxima to merge
+        """
+        for name, n in counters.items():
+            self.count(name, n)
+        for name, value in maxima.items():
+            self.maximum(name, value)
+
+    def reset_counters(self):
+        """Clears counters and maxima"""
+        with self.lock:
+            self.counters = {}
+            self.maxima = {}
+
+    def get_counters(self) -> dict[str, int]:
+        """Gets all counters and maxima
+
+        Returns:
+            dict[str, int]: the counters and maxima, by name
+        """
+        with self.lock:
+            return {**self.counters, **self.maxima}
@@ -0,0 +1,44 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+from tracing.point_3d import Point3D
+
+
+@dataclass
+class ProjectedPoints:
+    """Batch of UV points projected on the model"""
+
+    # 3D positions (Nx3), NaN outside the UV map
+    pos: np.ndarray
+
+    # Face indices (N), -1 outside the UV map
+    face_idx: np.ndarray
+
+    # Face normals (Nx3), NaN outside the UV map
+    normal: np.ndarray
+
+    # UV coordinates (Nx2)
+    uv: np.ndarray
+
+    # Whether each point lies inside the UV map (N)
+    inside: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.uv)
+
+    def point(self, i: int) -> Point3D:
+        """Builds the 3D point at the given index
+
+        Args:
+            i (int): index of a point inside the UV map
+
+        Returns:
+            Point3D: the corresponding 3D point
+        """
+        return Point3D(
+            pos=self.pos[i],
+            face_idx=int(self.face_idx[i]),
+            normal=self.normal[i],
+            uv=self.uv[i]
+        )
@@ -0,0 +1,107 @@
+import logging
+from logging import Logger
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, Optional
+
+from tracing.color import Color
+from tracing.config import TracerConfig
+from tracing.stage_profile import StageProfile
+from tracing.tracer import Tracer
+from tracing.tracer_assets import TracerAssets
+
+
+class TracingSession:
+    """Traces many textures on the same model and mask
+
+    The mesh, the mask and the data derived from them (UV index, seam edges, UV coverage, mesh hash) are loaded
+    by the first run and reused by the following ones
+    """
+
+    def __init__(
+            self,
+            config: TracerConfig,
+            model_path: Path,
+            mask_path: Path,
+            color_not_to_draw: tuple[Color, ...]
+    ):
+        self.logger: Logger = logging.getLogger("TracingSession")
+        self.config: TracerConfig = config
+        self.model_path: Path = model_path
+        self.mask_path: Path = mask_path
+        self.color_not_to_draw: tuple[Color, ...] = color_not_to_draw
+        self.assets: Optional[TracerAssets] = None
+
+    def create_tracer(self, texture_path: Path, palette: tuple[Color, ...]) -> Tracer:
+        """Creates a tracer for a texture, reusing the assets loaded by the previous runs
+
+        Call `keep_assets` once it has run, so that the next tracers reuse what it loaded
+
+        Args:
+            texture_path (Path): path of the texture
+            palette (tuple[Color, ...]): the palette of the texture
+
+        Returns:
+            Tracer: the tracer
+        """
+        tracer: Tracer = Tracer(
+            self.config,
+            texture_path,
+            self.model_path,
+            self.mask_path,
+            palette,
+            self.color_not_to_draw
+        )
+        if self.assets is not None:
+            tracer.use_assets(self.assets)
+        return tracer
+
+    def keep_assets(self, tracer: Tracer):
+        """Keeps the assets loaded by a tracer of this session for the next runs
+
+        Args:
+            tracer (Tracer): a tracer created by `create_tracer`, after it has run
+        """
+        assets: Optional[TracerAssets] = tracer.get_assets()
+        if assets is not None:
+            self.assets = assets
+
+    def trace(
+            self,
+            texture_path: Path,
+            palette: tuple[Color, ...],
+            progress_callback: Optional[Callable[[int, int, str], None]] = None,
+            profiling_hook: Optional[Callable[[str, StageProfile], None]] = None
+    ) -> Tracer:
+        """Computes the traces of a texture
+
+        Args:
+            texture_path (Path): path of the texture
+            palette (tuple[Color, ...]): the palette of the texture
+            progress_callback (Optional[Callable[[int, int, str], None]], optional): progress callback. Defaults to None.
+            profiling_hook (Optional[Callable[[str, StageProfile], None]], optional): called with the name and profile of each completed stage. Defaults to None.
+
+        Returns:
+            Tracer: the tracer, holding the traces and their stats
+        """
+        tracer: Tracer = self.create_tracer(texture_path, palette)
+        tracer.compute_traces(progress_callback=progress_callback, profiling_hook=profiling_hook)
+        self.keep_assets(tracer)
+        return tracer
+
+    def trace_batch(
+            self,
+            jobs: Iterable[tuple[Path, tuple[Color, ...]]],
+            progress_callback: Optional[Callable[[int, int, str], None]] = None
+    ) -> Iterator[Tracer]:
+        """Computes the traces of several textures, one after the other
+
+        Args:
+            jobs (Iterable[tuple[Path, tuple[Color, ...]]]): the path and palette of each texture
+            progress_callback (Optional[Callable[[int, int, str], None]], optional): progress callback of each run. Defaults to None.
+
+        Yields:
+            Tracer: the tracer of each texture once it has run, in order
+        """
+        for texture_path, palette in jobs:
+            self.logger.info(f"Tracing {texture_path}")
+            yield self.trace(texture_path, palette, progress_callback)
@@ -0,0 +1,100 @@
+import numpy as np
+
+
+def fixed_points(pos: np.ndarray) -> np.ndarray:
+    """Finds the points that simplification must keep: the path's ends and points sharing their position
+    with a neighbour, such as the triplets inserted on sharp edges
+
+    Args:
+        pos (np.ndarray): the positions of the path (Nx3)
+
+    Returns:
+        np.ndarray: True for each point to keep (N)
+    """
+    fixed: np.ndarray = np.zeros(len(pos), dtype=bool)
+    if len(pos) == 0:
+        return fixed
+    fixed[[0, -1]] = True
+    duplicated: np.ndarray = np.all(pos[1:] == pos[:-1], axis=1)
+    fixed[1:] |= duplicated
+    fixed[:-1] |= duplicated
+    return fixed
+
+
+def simplification_errors(
+        pos: np.ndarray,
+        normal: np.ndarray,
+        start: int,
+        end: int,
+        tolerance: float,
+        max_angle: float
+) -> np.ndarray:
+    """Computes how much each point between `start` and `end` deviates from the segment joining them
+
+    Args:
+        pos (np.ndarray): the positions of the path (Nx3)
+        normal (np.ndarray): the normals of the path (Nx3)
+        start (int): index of the start of the segment
+        end (int): index of the end of the segment
+        tolerance (float): accepted distance to the segment
+        max_angle (float): accepted angle between a normal and the normal interpolated along the segment (radians)
+
+    Returns:
+        np.ndarray: the largest of the distance and the angle deviations of each inner point, relative to their tolerance
+    """
+    a: np.ndarray = pos[start]
+    ab: np.ndarray = pos[end] - a
+    points: np.ndarray = pos[start + 1:end]
+    length_sq: float = float(ab @ ab)
+    t: np.ndarray = np.zeros(len(points))
+    if length_sq > 0:
+        t = np.clip((points - a) @ ab / length_sq, 0, 1)
+    distances: np.ndarray = np.linalg.norm(points - (a + t[:, None] * ab), axis=1)
+
+    interpolated: np.ndarray = (1 - t[:, None]) * normal[start] + t[:, None] * normal[end]
+    norms: np.ndarray = np.linalg.norm(interpolated, axis=1) * np.linalg.norm(normal[start + 1:end], axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cosines: np.ndarray = np.einsum("ij,ij->i", interpolated, normal[start + 1:end]) / norms
+    angles: np.ndarray = np.arccos(np.clip(np.nan_to_num(cosines, nan=-1.0), -1, 1))
+
+    return np.maximum(
+        distances / tolerance if tolerance > 0 else np.where(distances > 0, np.inf, 0),
+        angles / max_angle if max_angle > 0 else np.where(angles > 0, np.inf, 0)
+    )
+
+
+def simplify_path(pos: np.ndarray, normal: np.ndarray, tolerance: float, max_angle: float) -> np.ndarray:
+    """Selects the points of a 3D path to keep with the Douglas-Peucker algorithm
+
+    A point is dropped when it lies within `tolerance` of the simplified path and its normal is within `max_angle`
+    of the normal interpolated there. Fixed points (see `fixed_points`) are always kept
+
+    Args:
+        pos (np.ndarray): the positions of the path (Nx3)
+        normal (np.ndarray): the normals of the path (Nx3)
+        tolerance (float): accepted distance to the simplified path
+        max_angle (float): accepted normal deviation (radians)
+
+    Returns:
+        np.ndarray: True for each point to keep (N)
+    """
+    keep: np.ndarray = fixed_points(pos)
+    anchors: np.ndarray = np.flatnonzero(keep)
+    stack: list[tuple[int, int]] = [
+        (int(start), int(end))
+        for start, end in zip(anchors[:-1], anchors[1:])
+        if end - start > 1
+    ]
+    while stack:
+        start, end = stack.pop()
+        errors: np.ndarray = simplification_errors(pos, normal, start, end, tolerance, max_angle)
+        k: int = int(np.argmax(errors))
+        if errors[k] <= 1:
+            continue
+        split: int = start + 1 + k
+        keep[split] = True
+        if split - start > 1:
+            stack.append((start, split))
+        if end - split > 1:
+            stack.append((split, end))
+    return keep
@@ -0,0 +1,15 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class StageProfile:
+    """Time spent in a stage of the tracing pipeline"""
+
+    # Elapsed time (s)
+    wall_time: float = 0.0
+
+    # CPU time of the current process (s), not including worker processes
+    cpu_time: float = 0.0
+
+    # Number of items processed by the stage
+    n_items: int = 0
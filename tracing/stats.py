@@ -1,4 +1,7 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import Optional
+
+from tracing.stage_profile import StageProfile
 
 
 @dataclass
@@ -8,3 +11,13 @@ class TracingStats:
     n_2d_traces: int
     n_3d_traces: int
     n_points: int
+    # Number of 3D points removed by simplification
+    n_removed_points: int = 0
+    # Number of junctions made by stitching 3D traces split on UV seams
+    n_stitches: int = 0
+    # Time spent in each stage, by name
+    stages: dict[str, StageProfile] = field(default_factory=dict)
+    # Work counters (only recorded when profiling is enabled), by name
+    counters: dict[str, int] = field(default_factory=dict)
+    # Peak resident set size of the process (MB), if available
+    peak_rss_mb: Optional[float] = None
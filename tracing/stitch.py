@@ -0,0 +1,197 @@
+from typing import Optional
+
+import numpy as np
+from scipy.spatial import cKDTree
+from trimesh import Trimesh
+
+from tracing.trace import Trace3D
+
+# Edges of a face, as pairs of corners
+FACE_EDGES: np.ndarray = np.array([[0, 1], [1, 2], [2, 0]])
+
+
+def seam_edges(mesh: Trimesh) -> np.ndarray:
+    """Finds the face edges lying on a UV seam
+
+    UV meshes duplicate the vertices along seams. An edge is on a seam when it borders a single face in the UV map,
+    but is shared by several faces once the duplicated vertices are merged by position
+
+    Args:
+        mesh (Trimesh): the mesh
+
+    Returns:
+        np.ndarray: True for each edge of each face on a seam (Fx3), edge i joining corners i and i+1
+    """
+    edges: np.ndarray = np.sort(mesh.faces[:, FACE_EDGES], axis=-1).reshape(-1, 2)
+    _, merged_vertex = np.unique(mesh.vertices, axis=0, return_inverse=True)
+    merged_edges: np.ndarray = np.sort(merged_vertex.reshape(-1)[edges], axis=-1)
+
+    _, edge_id, edge_count = np.unique(edges, axis=0, return_inverse=True, return_counts=True)
+    _, merged_id, merged_count = np.unique(merged_edges, axis=0, return_inverse=True, return_counts=True)
+    seams: np.ndarray = (edge_count[edge_id.reshape(-1)] == 1) & (merged_count[merged_id.reshape(-1)] > 1)
+    return seams.reshape(-1, 3)
+
+
+def on_seam(pos: np.ndarray, face_idx: np.ndarray, mesh: Trimesh, seams: np.ndarray, tolerance: float) -> np.ndarray:
+    """Checks which points lie on a seam edge of their face
+
+    Args:
+        pos (np.ndarray): the positions of the points (Nx3)
+        face_idx (np.ndarray): the face of each point (N)
+        mesh (Trimesh): the mesh
+        seams (np.ndarray): the seam edges of the mesh (see `seam_edges`)
+        tolerance (float): accepted distance to the edge
+
+    Returns:
+        np.ndarray: True for each point on a seam (N)
+    """
+    result: np.ndarray = np.zeros(len(pos), dtype=bool)
+    corners: np.ndarray = mesh.vertices[mesh.faces[face_idx]]
+    for e, (i, j) in enumerate(FACE_EDGES):
+        a: np.ndarray = corners[:, i]
+        ab: np.ndarray = corners[:, j] - a
+        length_sq: np.ndarray = np.einsum("ij,ij->i", ab, ab)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t: np.ndarray = np.clip(np.nan_to_num(np.einsum("ij,ij->i", pos - a, ab) / length_sq), 0, 1)
+        distances: np.ndarray = np.linalg.norm(pos - (a + t[:, None] * ab), axis=1)
+        result |= seams[face_idx, e] & (distances <= tolerance)
+    return result
+
+
+def reverse(trace: Trace3D) -> Trace3D:
+    """Reverses the direction of a trace
+
+    Args:
+        trace (Trace3D): the trace
+
+    Returns:
+        Trace3D: the reversed trace
+    """
+    return Trace3D(
+        parent_2d_trace=trace.parent_2d_trace,
+        color=trace.color,
+        pos=trace.pos[::-1],
+        normal=trace.normal[::-1],
+        face_idx=trace.face_idx[::-1],
+        uv=trace.uv[::-1]
+    )
+
+
+def join(traces: list[Trace3D]) -> Trace3D:
+    """Joins traces whose ends meet, keeping a single point at each junction
+
+    Args:
+        traces (list[Trace3D]): the traces, in order and oriented
+
+    Returns:
+        Trace3D: the joined trace, with the parent and color of the first trace
+    """
+    def joined(field: str) -> np.ndarray:
+        return np.concatenate([getattr(traces[0], field)] + [getattr(trace, field)[1:] for trace in traces[1:]])
+
+    return Trace3D(
+        parent_2d_trace=traces[0].parent_2d_trace,
+        color=traces[0].color,
+        pos=joined("pos"),
+        normal=joined("normal"),
+        face_idx=joined("face_idx"),
+        uv=joined("uv")
+    )
+
+
+def stitch_fragments(
+        results: list[Optional[list[Trace3D]]],
+        mesh: Trimesh,
+        seams: np.ndarray,
+        tolerance: float
+) -> tuple[list[Optional[list[Trace3D]]], int]:
+    """Stitches the 3D traces split on UV seams back into continuous traces
+
+    Trace ends lying on a seam edge are paired with the nearest end of another trace of the same color within
+    `tolerance`, closest pairs first. Traces may be reversed to be joined. A stitched trace replaces its first
+    fragment in the results, the other fragments are removed from theirs
+
+    Args:
+        results (list[Optional[list[Trace3D]]]): the 3D traces of each 2D trace
+        mesh (Trimesh): the mesh
+        seams (np.ndarray): the seam edges of the mesh (see `seam_edges`)
+        tolerance (float): maximum distance between stitched ends
+
+    Returns:
+        tuple[list[Optional[list[Trace3D]]], int]: the stitched results, and the number of junctions made
+    """
+    fragments: list[tuple[int, int]] = [
+        (r, k)
+        for r, traces in enumerate(results)
+        if traces is not None
+        for k, trace in enumerate(traces)
+        if len(trace) > 0
+    ]
+    if len(fragments) < 2:
+        return results, 0
+    traces: list[Trace3D] = [results[r][k] for r, k in fragments]  # type: ignore
+
+    # Ends of each fragment: 2f is the start of fragment f, 2f+1 its end
+    ends: np.ndarray = np.array([trace.pos[[0, -1]] for trace in traces]).reshape(-1, 3)
+    end_faces: np.ndarray = np.array([trace.face_idx[[0, -1]] for trace in traces]).reshape(-1)
+    colors: np.ndarray = np.repeat([trace.color for trace in traces], 2)
+    candidates: np.ndarray = np.flatnonzero(on_seam(ends, end_faces, mesh, seams, tolerance))
+    if len(candidates) < 2:
+        return results, 0
+
+    pairs: np.ndarray = candidates[cKDTree(ends[candidates]).query_pairs(tolerance, output_type="ndarray")]
+    pairs = pairs[(pairs[:, 0] // 2 != pairs[:, 1] // 2) & (colors[pairs[:, 0]] == colors[pairs[:, 1]])]
+    distances: np.ndarray = np.linalg.norm(ends[pairs[:, 0]] - ends[pairs[:, 1]], axis=1)
+    pairs = pairs[np.argsort(distances, kind="stable")]
+
+    # Link each end at most once, without closing chains into loops
+    link: np.ndarray = np.full(len(ends), -1)
+    chain: list[int] = list(range(len(traces)))
+
+    def root(f: int) -> int:
+        while chain[f] != f:
+            chain[f] = chain[chain[f]]
+            f = chain[f]
+        return f
+
+    n_junctions: int = 0
+    for a, b in pairs:
+        if link[a] != -1 or link[b] != -1 or root(a // 2) == root(b // 2):
+            continue
+        link[a], link[b] = b, a
+        chain[root(a // 2)] = root(b // 2)
+        n_junctions += 1
+    if n_junctions == 0:
+        return results, 0
+
+    # Walk each chain from its first fragment
+    stitched: dict[int, Trace3D] = {}
+    removed: set[int] = set()
+    visited: np.ndarray = np.zeros(len(traces), dtype=bool)
+    for f in range(len(traces)):
+        if visited[f] or (link[2 * f] != -1 and link[2 * f + 1] != -1):
+            continue
+        members: list[int] = []
+        parts: list[Trace3D] = []
+        entry: int = 2 * f if link[2 * f] == -1 else 2 * f + 1
+        while True:
+            g: int = entry // 2
+            visited[g] = True
+            members.append(g)
+            parts.append(traces[g] if entry % 2 == 0 else reverse(traces[g]))
+            exit_end: int = entry ^ 1
+            if link[exit_end] == -1:
+                break
+            entry = int(link[exit_end])
+        if len(parts) > 1:
+            stitched[f] = join(parts)
+            removed.update(members[1:])
+
+    output: list[Optional[list[Trace3D]]] = [None if traces is None else list(traces) for traces in results]
+    for f in sorted(removed | set(stitched), reverse=True):
+        r, k = fragments[f]
+        if f in stitched:
+            output[r][k] = stitched[f]  # type: ignore
+        else:
+            del output[r][k]  # type: ignore
+    return output, n_junctions
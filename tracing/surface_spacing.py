@@ -0,0 +1,92 @@
+import numpy as np
+import shapely
+from shapely.geometry.base import BaseGeometry
+from trimesh import Trimesh
+
+
+def v_gradients(mesh: Trimesh) -> np.ndarray:
+    """Computes the norm of the surface gradient of the v texture coordinate on each face
+
+    Two rows of a horizontal UV hatching `dv` apart are `dv / gradient` apart on the face, in model units.
+    The gradient solves `gradient . e = dv` for both edges `e` of the face, with `gradient` in the face's plane
+
+    Args:
+        mesh (Trimesh): the mesh, with a UV map
+
+    Returns:
+        np.ndarray: the gradient norm of each face, in UV units per model unit (F), 0 for degenerate faces
+    """
+    corners: np.ndarray = mesh.vertices[mesh.faces]
+    v: np.ndarray = mesh.visual.uv[mesh.faces][:, :, 1]
+    e1: np.ndarray = corners[:, 1] - corners[:, 0]
+    e2: np.ndarray = corners[:, 2] - corners[:, 0]
+    dv1: np.ndarray = v[:, 1] - v[:, 0]
+    dv2: np.ndarray = v[:, 2] - v[:, 0]
+
+    # |gradient|^2 = dv^T G^-1 dv, with G the Gram matrix of the edges
+    g11: np.ndarray = np.einsum("ij,ij->i", e1, e1)
+    g12: np.ndarray = np.einsum("ij,ij->i", e1, e2)
+    g22: np.ndarray = np.einsum("ij,ij->i", e2, e2)
+    det: np.ndarray = g11 * g22 - g12 * g12
+    with np.errstate(divide="ignore", invalid="ignore"):
+        squared: np.ndarray = (g22 * dv1 * dv1 - 2 * g12 * dv1 * dv2 + g11 * dv2 * dv2) / det
+    return np.sqrt(np.where(det > 0, np.maximum(np.nan_to_num(squared), 0), 0))
+
+
+def surface_rows(
+        polygon: BaseGeometry,
+        uv_faces: np.ndarray,
+        gradients: np.ndarray,
+        spacing: float
+) -> np.ndarray:
+    """Places horizontal scanlines over a polygon so that consecutive ones are `spacing` apart on the surface
+
+    Each gap is the largest one keeping every face crossed between the two rows within `spacing`,
+    so the pen covers the whole island with as few rows as possible
+
+    Args:
+        polygon (BaseGeometry): the area to fill, in UV space
+        uv_faces (np.ndarray): the UV coordinates of the corners of each face (Fx3x2)
+        gradients (np.ndarray): the norm of the surface gradient of v on each face (F, see `v_gradients`)
+        spacing (float): gap between two scanlines on the surface, in model units
+
+    Returns:
+        np.ndarray: the height of each scanline in UV space, increasing (N)
+    """
+    if spacing <= 0:
+        raise ValueError(f"Fill spacing must be positive, got {spacing}")
+    minx, miny, maxx, maxy = polygon.bounds
+
+    # Faces under the polygon, with a usable gradient
+    lower: np.ndarray = uv_faces.min(axis=1)
+    upper: np.ndarray = uv_faces.max(axis=1)
+    candidates: np.ndarray = np.flatnonzero(
+        (gradients > 0)
+        & (upper[:, 0] >= minx) & (lower[:, 0] <= maxx)
+        & (upper[:, 1] >= miny) & (lower[:, 1] <= maxy)
+    )
+    if len(candidates) > 0:
+        shapely.prepare(polygon)
+        candidates = candidates[shapely.intersects(shapely.polygons(uv_faces[candidates]), polygon)]
+    if len(candidates) == 0:
+        return np.zeros(0)
+
+    vmin: np.ndarray = lower[candidates, 1]
+    vmax: np.ndarray = upper[candidates, 1]
+    gaps: np.ndarray = spacing * gradients[candidates]
+    # Rows falling between faces (e.g. across a gap of the UV map) use the smallest gap of the island
+    smallest: float = float(gaps.min())
+
+    ys: list[float] = []
+    y: float = miny
+    while True:
+        crossed: np.ndarray = (vmin <= y) & (vmax >= y)
+        gap: float = float(gaps[crossed].min()) if np.any(crossed) else smallest
+        # The faces met before the next row must allow the gap too
+        crossed = (vmin <= y + gap) & (vmax >= y)
+        gap = float(gaps[crossed].min()) if np.any(crossed) else gap
+        y += gap
+        if y >= maxy:
+            break
+        ys.append(y)
+    return np.array(ys)
@@ -0,0 +1,48 @@
+"""Mesh edge crossings of segments walked across the UV triangles"""
+from pathlib import Path
+
+import numpy as np
+import pytest
+from trimesh import Trimesh
+from trimesh.visual import TextureVisuals
+
+from tracing.benchmark import make_mesh
+from tracing.config import TracerConfig
+from tracing.point_3d import Point3D
+from tracing.projected_points import ProjectedPoints
+from tracing.tracer import Tracer
+
+
+@pytest.fixture
+def seams() -> Trimesh:
+    # Two UV charts, u in [0.05, 0.45] and [0.55, 0.95]
+    vertices, uv, faces = make_mesh("seams", 2_000)
+    return Trimesh(vertices=vertices, faces=faces, visual=TextureVisuals(uv=uv), process=False)
+
+
+def test_chart_change(seams: Trimesh):
+    tracer: Tracer = Tracer(TracerConfig(), Path(), Path(), Path(), (), ())
+    # Both points are inside the UV map, on either side of the gap between the charts
+    p1, p2 = np.array([0.31, 0.31]), np.array([0.71, 0.37])
+    projected: ProjectedPoints = tracer.project_points(np.array([p1, p2]), seams)
+    assert projected.inside.all()
+    assert len(np.unique(projected.face_idx)) == 2
+    points: list[Point3D] = tracer.compute_edge_points(projected.point(0), projected.point(1), seams)
+
+    # Same as splitting the segment in the gap and walking each part from its end inside the UV map
+    gap: np.ndarray = (p1 + p2) / 2
+    assert tracer.interpolate_position(gap, seams) is None
+    exit_point: Point3D = tracer.project_uv_boundary(p1, gap, seams)
+    entry_point: Point3D = tracer.project_uv_boundary(gap, p2, seams)
+    expected: list[Point3D] = [
+        *tracer.compute_edge_points(projected.point(0), exit_point, seams),
+        exit_point,
+        entry_point,
+        *tracer.compute_edge_points(entry_point, projected.point(1), seams),
+    ]
+    assert len(points) == len(expected)
+    assert any(point.uv[0] > 0.55 for point in points)
+    for point, expected_point in zip(points, expected):
+        np.testing.assert_allclose(point.uv, expected_point.uv, atol=1e-9)
+        np.testing.assert_allclose(point.pos, expected_point.pos, atol=1e-9)
+        np.testing.assert_array_equal(point.normal, seams.face_normals[point.face_idx])
@@ -0,0 +1,157 @@
+"""Parity of the geometry kernels with the numpy code they replace
+
+Without Numba the kernels are the plain Python functions, so the parity tests run anyway, and
+`test_compiled` checks the compiled kernels against them.
+"""
+from pathlib import Path
+
+import numpy as np
+import pytest
+from trimesh import Trimesh
+from trimesh.visual import TextureVisuals
+
+from tracing import kernels
+from tracing.benchmark import make_mesh
+from tracing.config import TracerConfig
+from tracing.island import Island
+from tracing.trace import Trace2D
+from tracing.tracer import Tracer
+from tracing.uv_index import UVIndex
+
+MESH_KINDS: tuple[str, ...] = ("sphere", "seams")
+
+
+@pytest.fixture(params=MESH_KINDS)
+def mesh(request) -> Trimesh:
+    vertices, uv, faces = make_mesh(request.param, 2_000)
+    return Trimesh(vertices=vertices, faces=faces, visual=TextureVisuals(uv=uv), process=False)
+
+
+@pytest.fixture
+def points(mesh: Trimesh) -> np.ndarray:
+    rng: np.random.Generator = np.random.default_rng(0)
+    # Points around the UV map, some of them on the vertices of the triangles
+    uv: np.ndarray = np.asarray(mesh.visual.uv)  # type: ignore
+    return np.vstack([rng.uniform(-0.05, 1.05, (2_000, 2)), uv[rng.integers(len(uv), size=200)]])
+
+
+def tracers() -> tuple[Tracer, Tracer]:
+    numpy_tracer: Tracer = Tracer(TracerConfig(), Path(), Path(), Path(), (), ())
+    kernel_tracer: Tracer = Tracer(TracerConfig(jit_kernels=True), Path(), Path(), Path(), (), ())
+    # Runs the kernels even without Numba
+    kernel_tracer.use_kernels = True
+    return numpy_tracer, kernel_tracer
+
+
+def test_locate(mesh: Trimesh, points: np.ndarray):
+    index: UVIndex = UVIndex.from_mesh(mesh)
+    expected: list = [index.locate(point) for point in points]
+    expected_face_idx, expected_bary = index.locate_many(points)
+
+    index.use_kernels = True
+    for point, before in zip(points, expected):
+        after = index.locate(point)
+        assert (after is None) == (before is None)
+        if before is not None:
+            assert after[0] == before[0]  # type: ignore
+            np.testing.assert_array_equal(after[1], before[1])  # type: ignore
+    face_idx, bary = index.locate_many(points)
+    np.testing.assert_array_equal(face_idx, expected_face_idx)
+    np.testing.assert_array_equal(bary, expected_bary)
+
+
+def test_boundary_crossing(mesh: Trimesh, points: np.ndarray):
+    index: UVIndex = UVIndex.from_mesh(mesh)
+    segments: list[tuple[np.ndarray, np.ndarray]] = list(zip(points[:-1], points[1:]))
+    expected: list = [index.boundary_crossing(p1, p2) for p1, p2 in segments]
+    assert any(crossing is not None for crossing in expected)
+
+    index.use_kernels = True
+    for (p1, p2), before in zip(segments, expected):
+        after = index.boundary_crossing(p1, p2)
+        assert (after is None) == (before is None)
+        if before is not None:
+            np.testing.assert_array_equal(after, before)  # type: ignore
+
+
+def test_walk(mesh: Trimesh, points: np.ndarray):
+    index: UVIndex = UVIndex.from_mesh(mesh)
+    face_idx, _ = index.locate_many(points)
+    inside: np.ndarray = points[face_idx >= 0]
+    faces: np.ndarray = face_idx[face_idx >= 0]
+    # Segments between random points inside the UV map, leaving their chart before the end on the seams mesh
+    segments: list[tuple[int, int]] = list(zip(range(len(inside) - 1), range(1, len(inside))))
+    expected: list = [index.walk(faces[i], faces[j], inside[i], inside[j]) for i, j in segments]
+    assert any(len(walked[0]) > 10 for walked in expected)
+
+    index.use_kernels = True
+    for (i, j), before in zip(segments, expected):
+        after = index.walk(faces[i], faces[j], inside[i], inside[j])
+        for array_after, array_before in zip(after, before):
+            np.testing.assert_array_equal(array_after, array_before)
+
+
+def test_projection(mesh: Trimesh, points: np.ndarray):
+    numpy_tracer, kernel_tracer = tracers()
+    expected = numpy_tracer.project_points(points, mesh)
+    projected = kernel_tracer.project_points(points, mesh)
+    np.testing.assert_array_equal(projected.face_idx, expected.face_idx)
+    np.testing.assert_array_equal(projected.pos, expected.pos)
+    np.testing.assert_array_equal(projected.normal, expected.normal)
+
+    # Paths crossing the UV boundary and many edges, walked point by point
+    for i, path in enumerate(np.split(points[:400], 20)):
+        trace: Trace2D = Trace2D(i=i, color=1, path=path)
+        before = numpy_tracer.project_trace_to_3d(trace, mesh)
+        after = kernel_tracer.project_trace_to_3d(trace, mesh)
+        assert (after is None) == (before is None)
+        if before is None:
+            continue
+        assert len(after) == len(before)  # type: ignore
+        for trace_after, trace_before in zip(after, before):  # type: ignore
+            np.testing.assert_array_equal(trace_after.face_idx, trace_before.face_idx)
+            np.testing.assert_array_equal(trace_after.pos, trace_before.pos)
+            np.testing.assert_array_equal(trace_after.normal, trace_before.normal)
+
+
+def test_clean_island():
+    rng: np.random.Generator = np.random.default_rng(0)
+    # Polygon with a vertex in the middle of every other edge, as on pixel contours
+    corners: np.ndarray = np.round(rng.uniform(0, 20, (1_000, 2))).cumsum(axis=0) % 100
+    border: np.ndarray = np.stack([corners, (corners + np.roll(corners, -1, axis=0)) / 2], axis=1).reshape(-1, 2)
+
+    numpy_tracer, kernel_tracer = tracers()
+    expected: Island = numpy_tracer.clean_island(Island(color=1, outer_border=border.copy()))
+    cleaned: Island = kernel_tracer.clean_island(Island(color=1, outer_border=border.copy()))
+    assert len(expected.outer_border) < len(border)
+    np.testing.assert_array_equal(cleaned.outer_border, expected.outer_border)
+
+
+def test_compiled(mesh: Trimesh, points: np.ndarray):
+    pytest.importorskip("numba")
+    assert Tracer(TracerConfig(jit_kernels=True), Path(), Path(), Path(), (), ()).use_kernels
+
+    index: UVIndex = UVIndex.from_mesh(mesh)
+    grid: tuple = (index.bounds_min, index.bounds_max, index.cell_size, index.resolution)
+    triangles: tuple = (index.v0, index.v1, index.v2, index.denom)
+    located: tuple = kernels.locate_points(points, *grid, index.cell_faces, index.cell_start, *triangles, index.epsilon)
+    expected: tuple = kernels.locate_points.py_func(
+        points, *grid, index.cell_faces, index.cell_start, *triangles, index.epsilon
+    )
+    for array, expected_array in zip(located, expected):
+        np.testing.assert_array_equal(array, expected_array)
+
+    face_idx: np.ndarray = located[0]
+    for i in np.flatnonzero(face_idx[:-1] >= 0)[:100]:
+        p1, p2 = points[i], points[i + 1]
+        crossing: float = kernels.crossing_parameter(
+            p1, p2, *grid, index.cell_boundary_edges, index.boundary_cell_start, index.boundary_edges
+        )
+        assert crossing == kernels.crossing_parameter.py_func(
+            p1, p2, *grid, index.cell_boundary_edges, index.boundary_cell_start, index.boundary_edges
+        )
+        if face_idx[i + 1] >= 0:
+            walked: tuple = kernels.walk_faces(face_idx[i], face_idx[i + 1], p1, p2, index.neighbors, *triangles)
+            expected = kernels.walk_faces.py_func(face_idx[i], face_idx[i + 1], p1, p2, index.neighbors, *triangles)
+            for array, expected_array in zip(walked, expected):
+                np.testing.assert_array_equal(array, expected_array)
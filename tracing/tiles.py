@@ -0,0 +1,174 @@
+from typing import Iterator
+
+import cv2
+import numpy as np
+from PIL import Image
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+
+
+def tile_boxes(size: tuple[int, int], tile_size: int) -> Iterator[tuple[int, int, int, int]]:
+    """Splits an image into tiles, in raster order
+
+    Args:
+        size (tuple[int, int]): size of the image in pixels (w,h)
+        tile_size (int): side of the tiles in pixels
+
+    Yields:
+        tuple[int, int, int, int]: the box of each tile (x0, y0, x1, y1), end excluded
+    """
+    width, height = size
+    for y0 in range(0, height, tile_size):
+        for x0 in range(0, width, tile_size):
+            yield x0, y0, min(x0 + tile_size, width), min(y0 + tile_size, height)
+
+
+def resize_tile(image: Image.Image, size: tuple[int, int], box: tuple[int, int, int, int]) -> Image.Image:
+    """Resamples one tile of an image as if the whole image was resized to `size`
+
+    Args:
+        image (Image.Image): the image, at its original size
+        size (tuple[int, int]): size of the resized image in pixels (w,h)
+        box (tuple[int, int, int, int]): the tile in the resized image (x0, y0, x1, y1)
+
+    Returns:
+        Image.Image: the resized tile
+    """
+    x0, y0, x1, y1 = box
+    sx: float = image.width / size[0]
+    sy: float = image.height / size[1]
+    return image.resize((x1 - x0, y1 - y0), box=(x0 * sx, y0 * sy, x1 * sx, y1 * sy))
+
+
+def adjacent_pairs(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Pairs the components on each side of a tile border, with 8-connectivity
+
+    Args:
+        a (np.ndarray): component of each pixel along one side of the border, -1 for the background (N)
+        b (np.ndarray): component of each pixel along the other side of the border, -1 for the background (N)
+
+    Returns:
+        np.ndarray: the pairs of touching components (Mx2)
+    """
+    pairs: list[np.ndarray] = []
+    for shift in (-1, 0, 1):
+        left: np.ndarray = a[max(shift, 0):len(a) + min(shift, 0)]
+        right: np.ndarray = b[max(-shift, 0):len(b) + min(-shift, 0)]
+        touching: np.ndarray = (left >= 0) & (right >= 0)
+        pairs.append(np.stack([left[touching], right[touching]], axis=1))
+    return np.concatenate(pairs)
+
+
+def find_components(labels: np.ndarray, label: int, tile_size: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Finds the 8-connected components of a label, tile by tile
+
+    Components are labelled in each tile, then merged with the ones they touch across the tile borders.
+    Only one tile of component ids is held in memory at a time
+
+    Args:
+        labels (np.ndarray): the label image (HxW, uint8)
+        label (int): the label of the pixels to group
+        tile_size (int): side of the tiles in pixels
+
+    Returns:
+        tuple[np.ndarray, np.ndarray, np.ndarray]: the bounding box of each component (Nx4, x0, y0, x1, y1, end excluded),
+            its area in pixels (N) and its first pixel in raster order (Nx2, x, y)
+    """
+    height, width = labels.shape
+    boxes: list[np.ndarray] = []
+    firsts: list[np.ndarray] = []
+    pairs: list[np.ndarray] = []
+    n: int = 0
+    above: np.ndarray = np.full(width, -1)
+    for y0 in range(0, height, tile_size):
+        y1: int = min(y0 + tile_size, height)
+        top: np.ndarray = np.full(width, -1)
+        bottom: np.ndarray = np.full(width, -1)
+        left: np.ndarray = np.full(y1 - y0, -1)
+        for x0 in range(0, width, tile_size):
+            x1: int = min(x0 + tile_size, width)
+            mask: np.ndarray = (labels[y0:y1, x0:x1] == label).view(np.uint8)
+            count, ids, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=8)
+            ids = np.where(ids > 0, ids.astype(np.int64) + (n - 1), -1)
+            x, y, w, h, area = stats[1:].T
+            boxes.append(np.stack([x + x0, y + y0, x + x0 + w, y + y0 + h, area], axis=1))
+            # First pixel of each piece in raster order, as its position in the whole image
+            _, first = np.unique(ids.ravel(), return_index=True)
+            first = first[ids.ravel()[first] >= 0]
+            firsts.append((first // (x1 - x0) + y0) * width + first % (x1 - x0) + x0)
+            n += count - 1
+
+            if x0 > 0:
+                pairs.append(adjacent_pairs(left, ids[:, 0]))
+            left = ids[:, -1]
+            top[x0:x1] = ids[0]
+            bottom[x0:x1] = ids[-1]
+        if y0 > 0:
+            pairs.append(adjacent_pairs(above, top))
+        above = bottom
+
+    pieces: np.ndarray = np.concatenate(boxes) if boxes else np.zeros((0, 5), dtype=np.int64)
+    edges: np.ndarray = np.concatenate(pairs) if pairs else np.zeros((0, 2), dtype=np.int64)
+    graph = coo_matrix((np.ones(len(edges)), (edges[:, 0], edges[:, 1])), shape=(n, n))
+    n_components, component = connected_components(graph, directed=False)
+
+    merged: np.ndarray = np.empty((n_components, 4), dtype=np.int64)
+    merged[:, :2] = np.iinfo(np.int64).max
+    merged[:, 2:] = np.iinfo(np.int64).min
+    np.minimum.at(merged[:, 0], component, pieces[:, 0])
+    np.minimum.at(merged[:, 1], component, pieces[:, 1])
+    np.maximum.at(merged[:, 2], component, pieces[:, 2])
+    np.maximum.at(merged[:, 3], component, pieces[:, 3])
+    areas: np.ndarray = np.bincount(component, weights=pieces[:, 4], minlength=n_components).astype(np.int64)
+    seeds: np.ndarray = np.full(n_components, np.iinfo(np.int64).max)
+    np.minimum.at(seeds, component, np.concatenate(firsts) if firsts else np.zeros(0, dtype=np.int64))
+    return merged, areas, np.stack([seeds % width, seeds // width], axis=1)
+
+
+def component_contours(
+        labels: np.ndarray,
+        label: int,
+        boxes: np.ndarray,
+        seeds: np.ndarray
+) -> tuple[list[np.ndarray], np.ndarray]:
+    """Extracts the outer and inner contours of components, each from its own bounding box
+
+    Other components may lie in the same box, even with the same bounding box, so the outer contour of a component
+    is the one starting at its first pixel in raster order, where `cv2.findContours` starts tracing it.
+    The contours match the ones found on the whole image
+
+    Args:
+        labels (np.ndarray): the label image (HxW, uint8)
+        label (int): the label of the components
+        boxes (np.ndarray): the bounding box of each component (Nx4, x0, y0, x1, y1, end excluded)
+        seeds (np.ndarray): the first pixel of each component in raster order (Nx2, x, y, see `find_components`)
+
+    Returns:
+        tuple[list[np.ndarray], np.ndarray]: the contours, and their hierarchy in the `cv2.RETR_CCOMP` format
+            (1xNx4: next, previous, first child, parent). Outer contours are in reverse raster order
+    """
+    components: list[tuple[np.ndarray, list[np.ndarray]]] = []
+    for (x0, y0, x1, y1), (sx, sy) in zip(boxes, seeds):
+        # Pad the box so that contours along its sides are traced as on the whole image
+        crop: np.ndarray = np.pad((labels[y0:y1, x0:x1] == label).view(np.uint8), 1)
+        contours, hierarchy = cv2.findContours(
+            crop, cv2.RETR_CCOMP, cv2.CHAIN_APPROX_SIMPLE, offset=(int(x0) - 1, int(y0) - 1)
+        )
+        for i, parent in enumerate(hierarchy[0][:, 3]):
+            if parent == -1 and contours[i][0, 0, 0] == sx and contours[i][0, 0, 1] == sy:
+                holes: list[np.ndarray] = [contours[j] for j in np.flatnonzero(hierarchy[0][:, 3] == i)]
+                components.append((contours[i], holes))
+                break
+
+    # Same order as on the whole image: outer contours from the last one found in raster order
+    components.sort(key=lambda c: (int(c[0][0, 0, 1]), int(c[0][0, 0, 0])), reverse=True)
+    all_contours: list[np.ndarray] = []
+    rows: list[list[int]] = []
+    for outer, holes in components:
+        index: int = len(all_contours)
+        all_contours.append(outer)
+        rows.append([-1, -1, index + 1 if holes else -1, -1])
+        for hole in holes:
+            all_contours.append(hole)
+            rows.append([-1, -1, -1, index])
+    return all_contours, np.array(rows, dtype=np.int32).reshape(1, -1, 4)
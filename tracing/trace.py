@@ -1,27 +1,84 @@
+from __future__ import annotations
+
 from dataclasses import dataclass
+from typing import Iterator, Sequence
 
 import numpy as np
 
 from tracing.point_3d import Point3D
 
 
-@dataclass
+@dataclass(slots=True)
 class Trace3D:
-    """3D drawing path"""
+    """3D drawing path, stored as contiguous arrays"""
 
     parent_2d_trace: int
 
     # Color index
     color: int
 
-    # List of points
-    path: list[Point3D]
+    # 3D positions (Nx3)
+    pos: np.ndarray
+
+    # Face normals (Nx3)
+    normal: np.ndarray
+
+    # Face indices (N)
+    face_idx: np.ndarray
+
+    # UV coordinates (Nx2)
+    uv: np.ndarray
+
+    @classmethod
+    def from_points(cls, parent_2d_trace: int, color: int, points: Sequence[Point3D]) -> Trace3D:
+        """Packs a list of points into a trace
+
+        Args:
+            parent_2d_trace (int): index of the 2D trace
+            color (int): color index
+            points (Sequence[Point3D]): the points of the path
+
+        Returns:
+            Trace3D: the trace
+        """
+        return cls(
+            parent_2d_trace=parent_2d_trace,
+            color=color,
+            pos=np.array([p.pos for p in points], dtype=np.float64).reshape(-1, 3),
+            normal=np.array([p.normal for p in points], dtype=np.float64).reshape(-1, 3),
+            face_idx=np.array([p.face_idx for p in points], dtype=np.intp),
+            uv=np.array([p.uv for p in points], dtype=np.float64).reshape(-1, 2)
+        )
+
+    def __len__(self) -> int:
+        return len(self.pos)
+
+    def __iter__(self) -> Iterator[Point3D]:
+        return (self.point(i) for i in range(len(self)))
+
+    def point(self, i: int) -> Point3D:
+        """Builds a view of the i-th point of the path
+
+        Args:
+            i (int): index of the point
+
+        Returns:
+            Point3D: the point, whose arrays are views on the trace's arrays
+        """
+        return Point3D(
+            pos=self.pos[i],
+            face_idx=int(self.face_idx[i]),
+            normal=self.normal[i],
+            uv=self.uv[i]
+        )
+
+    @property
+    def path(self) -> list[Point3D]:
+        """List of points, kept for compatibility with code iterating over `Point3D` objects"""
+        return list(self)
 
     def get_polygon(self) -> np.ndarray:
-        return np.array([
-            p.pos
-            for p in self.path
-        ])
+        return self.pos
 
 
 @dataclass
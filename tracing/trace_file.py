@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterator, Sequence
+
+import numpy as np
+
+from tracing.mesh_cache import load_npz
+from tracing.trace import Trace3D
+
+# Bump when the layout of trace files changes
+TRACE_FILE_VERSION: int = 1
+
+# Trace files are zip archives, unlike JSON exports
+TRACE_FILE_MAGIC: bytes = b"PK\x03\x04"
+
+
+def is_trace_file(path: Path) -> bool:
+    """Checks whether a file is a binary trace file rather than a JSON export
+
+    Args:
+        path (Path): path of the file
+
+    Returns:
+        bool: True if the file starts like a binary trace file
+    """
+    with open(path, "rb") as f:
+        return f.read(len(TRACE_FILE_MAGIC)) == TRACE_FILE_MAGIC
+
+
+@dataclass
+class TraceFile:
+    """Content of a binary trace file
+
+    The points of all traces are concatenated, trace `i` spanning `offsets[i]:offsets[i+1]`
+    """
+
+    # Export metadata (generated_at, model, texture, palette)
+    metadata: dict[str, Any]
+
+    # Start of each trace in the point arrays, followed by the total number of points (T+1)
+    offsets: np.ndarray
+
+    # Color index of each trace (T)
+    colors: np.ndarray
+
+    # Index of the 2D trace each trace comes from (T)
+    parents: np.ndarray
+
+    # 3D positions (Nx3)
+    pos: np.ndarray
+
+    # Face normals (Nx3)
+    normal: np.ndarray
+
+    # Face indices (N)
+    face_idx: np.ndarray
+
+    # UV coordinates (Nx2)
+    uv: np.ndarray
+
+    @classmethod
+    def from_traces(cls, traces: Sequence[Trace3D], metadata: dict[str, Any]) -> TraceFile:
+        """Concatenates traces into a trace file
+
+        Args:
+            traces (Sequence[Trace3D]): the traces
+            metadata (dict[str, Any]): the export metadata
+
+        Returns:
+            TraceFile: the trace file content
+        """
+        return cls(
+            metadata=metadata,
+            offsets=np.concatenate([[0], np.cumsum([len(trace) for trace in traces])]).astype(np.int64),
+            colors=np.array([trace.color for trace in traces], dtype=np.int32),
+            parents=np.array([trace.parent_2d_trace for trace in traces], dtype=np.int64),
+            pos=np.concatenate([trace.pos for trace in traces] or [np.empty((0, 3))]),
+            normal=np.concatenate([trace.normal for trace in traces] or [np.empty((0, 3))]),
+            face_idx=np.concatenate([trace.face_idx for trace in traces] or [np.empty(0, dtype=np.intp)]),
+            uv=np.concatenate([trace.uv for trace in traces] or [np.empty((0, 2))])
+        )
+
+    def __len__(self) -> int:
+        return len(self.colors)
+
+    def __iter__(self) -> Iterator[Trace3D]:
+        return (self.trace(i) for i in range(len(self)))
+
+    def trace(self, i: int) -> Trace3D:
+        """Gets a trace, whose arrays are views on the file's arrays
+
+        Args:
+            i (int): index of the trace
+
+        Returns:
+            Trace3D: the trace
+        """
+        start, end = int(self.offsets[i]), int(self.offsets[i + 1])
+        return Trace3D(
+            parent_2d_trace=int(self.parents[i]),
+            color=int(self.colors[i]),
+            pos=self.pos[start:end],
+            normal=self.normal[start:end],
+            face_idx=self.face_idx[start:end],
+            uv=self.uv[start:end]
+        )
+
+    def write(self, path: Path, dtype: np.dtype | type = np.float64):
+        """Writes the traces to an uncompressed `.npz` archive
+
+        Args:
+            path (Path): path of the file
+            dtype (np.dtype | type, optional): floating-point type of the point arrays. Defaults to np.float64.
+        """
+        header: bytes = json.dumps({"version": TRACE_FILE_VERSION, **self.metadata}).encode("utf-8")
+
+        # Write to a temporary file first so that readers never see a partial file
+        tmp_path: Path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                header=np.frombuffer(header, dtype=np.uint8),
+                offsets=self.offsets,
+                colors=self.colors,
+                parents=self.parents,
+                pos=self.pos.astype(dtype, copy=False),
+                normal=self.normal.astype(dtype, copy=False),
+                face_idx=self.face_idx.astype(np.int32, copy=False),
+                uv=self.uv.astype(dtype, copy=False)
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def read(cls, path: Path, mmap: bool = True) -> TraceFile:
+        """Reads a binary trace file
+
+        Args:
+            path (Path): path of the file
+            mmap (bool, optional): whether to memory-map the point arrays instead of reading them. Defaults to True.
+
+        Returns:
+            TraceFile: the trace file content
+        """
+        arrays: dict[str, np.ndarray] = load_npz(path, mmap)
+        metadata: dict[str, Any] = json.loads(np.asarray(arrays["header"]).tobytes().decode("utf-8"))
+        version: int = metadata.pop("version", None)
+        if version != TRACE_FILE_VERSION:
+            raise ValueError(f"Unsupported trace file version {version} in {path}")
+
+        return cls(
+            metadata=metadata,
+            offsets=arrays["offsets"],
+            colors=arrays["colors"],
+            parents=arrays["parents"],
+            pos=arrays["pos"],
+            normal=arrays["normal"],
+            face_idx=arrays["face_idx"],
+            uv=arrays["uv"]
+        )
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from types import TracebackType
+from typing import Any, Iterable, Optional, TextIO
+
+import numpy as np
+
+from tracing.trace import Trace3D
+from tracing.trace_file import TraceFile
+
+
+class TraceWriter:
+    """Exports 3D traces incrementally, as they are computed
+
+    JSON exports are written as traces come, one trace per line, to a temporary file replacing the export once
+    the writer is closed. Binary trace files (`.npz` paths) cannot be appended to, so their traces are kept until
+    the writer is closed. When the export is aborted, e.g. by an exception, any previous export is left untouched.
+    """
+
+    def __init__(self, path: Path, metadata: dict[str, Any]):
+        """Opens the export file
+
+        Args:
+            path (Path): path of the exported file, in the binary trace format if it ends with `.npz`, else in JSON
+            metadata (dict[str, Any]): the export metadata (generated_at, model, texture, palette)
+        """
+        self.path: Path = path
+        self.metadata: dict[str, Any] = metadata
+        self.binary: bool = path.suffix == ".npz"
+        self.traces: list[Trace3D] = []
+        self.n_traces: int = 0
+        self.trailer: dict[str, Any] = {}
+        self.file: Optional[TextIO] = None
+        self.tmp_path: Path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+
+        if not self.binary:
+            self.file = open(self.tmp_path, "w")
+            self.file.write("{\n")
+            for key, value in metadata.items():
+                self.file.write(f"    {json.dumps(key)}: {json.dumps(value)},\n")
+            self.file.write('    "traces": [')
+            self.file.flush()
+
+    def write(self, traces: Iterable[Trace3D]):
+        """Appends traces to the export
+
+        Args:
+            traces (Iterable[Trace3D]): the traces
+        """
+        if self.binary:
+            self.traces.extend(traces)
+            return
+
+        if self.file is None:
+            raise ValueError(f"Trace writer of {self.path} is closed")
+        for trace in traces:
+            self.file.write("," if self.n_traces > 0 else "")
+            self.file.write("\n        " + json.dumps({
+                "color": trace.color,
+                # (pos, normal) pairs
+                "path": np.stack([trace.pos, trace.normal], axis=1).tolist()
+            }))
+            self.n_traces += 1
+        self.file.flush()
+
+    def update_metadata(self, metadata: dict[str, Any]):
+        """Adds metadata only known once traces are computed, e.g. the tracing statistics
+
+        In JSON exports, it is written after the traces
+
+        Args:
+            metadata (dict[str, Any]): the metadata to add
+        """
+        self.trailer.update(metadata)
+
+    def close(self):
+        """Completes the export"""
+        if self.binary:
+            TraceFile.from_traces(self.traces, {**self.metadata, **self.trailer}).write(self.path)
+            self.traces = []
+            return
+
+        if self.file is not None:
+            self.file.write("\n    ]")
+            for key, value in self.trailer.items():
+                self.file.write(f",\n    {json.dumps(key)}: {json.dumps(value)}")
+            self.file.write("\n}\n")
+            self.file.close()
+            self.file = None
+            os.replace(self.tmp_path, self.path)
+
+    def abort(self):
+        """Drops the export, leaving any previous file at its path untouched"""
+        self.traces = []
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+            self.tmp_path.unlink(missing_ok=True)
+
+    def __enter__(self) -> TraceWriter:
+        return self
+
+    def __exit__(
+            self,
+            exc_type: Optional[type[BaseException]],
+            exc: Optional[BaseException],
+            traceback: Optional[TracebackType]
+    ):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
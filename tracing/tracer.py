@@ -1,12 +1,13 @@
+import dataclasses
 import datetime
-import json
+import hashlib
 import logging
 import os
 from logging import Logger
 from pathlib import Path
 import time
 from turtle import color
-from typing import Callable, Optional, Union
+from typing import Callable, Iterator, Optional, TypeVar
 
 import cv2
 import matplotlib.pyplot as plt
@@ -15,17 +16,39 @@ import shapely
 import tqdm
 import trimesh
 from PIL import Image
-from shapely import LineString, MultiLineString, Polygon, GeometryCollection
+from shapely import LineString, Polygon
+from shapely.geometry.base import BaseGeometry
 from shapely.plotting import plot_line, plot_points, plot_polygon
 from trimesh import Trimesh
 from trimesh.visual import TextureVisuals
+from tracing.border_sharing import share_borders
 from tracing.color import Color
 from tracing.config import TracerConfig
+from tracing.fill import contour_rings, fill_paths, fill_rows, link_rings, link_scanlines
 from tracing.hierarchy import Hierarchy
 from tracing.island import Island
+from tracing.kernels import NUMBA_AVAILABLE, non_collinear_points
+from tracing.layer import Layer
+from tracing.layer_cache import LayerCache
+from tracing.layer_result import LayerResult
+from tracing.mesh_cache import MeshCache, file_hash
+from tracing.palette import NO_LABEL, color_label, quantize_labels
+from tracing.parallel import map_concurrently, mesh_arrays, project_traces_parallel
 from tracing.point_3d import Point3D
+from tracing.profiler import Profiler, peak_rss_mb
+from tracing.projected_points import ProjectedPoints
+from tracing.simplify import simplify_path
+from tracing.stage_profile import StageProfile
 from tracing.stats import TracingStats
+from tracing.stitch import seam_edges, stitch_fragments
+from tracing.surface_spacing import surface_rows, v_gradients
+from tracing.tiles import component_contours, find_components, resize_tile, tile_boxes
 from tracing.trace import Trace2D, Trace3D
+from tracing.trace_writer import TraceWriter
+from tracing.tracer_assets import TracerAssets
+from tracing.uv_index import UVIndex
+
+T = TypeVar("T")
 
 
 class Tracer:
@@ -49,15 +72,39 @@ class Tracer:
 
         self.texture: Optional[Image.Image] = None
         self.paletted_texture: Optional[Image.Image] = None
+        self.label_image: Optional[np.ndarray] = None
         self.model: Optional[Trimesh] = None
         self.mask: Optional[Image.Image] = None
-        self.layers: list[Image.Image] = []
+        self.uv_index: Optional[UVIndex] = None
+        self.uv_index_mesh: Optional[Trimesh] = None
+        self.seams: Optional[np.ndarray] = None
+        self.seams_mesh: Optional[Trimesh] = None
+        self.v_gradients: Optional[np.ndarray] = None
+        self.v_gradients_mesh: Optional[Trimesh] = None
+        self.mesh_cache: Optional[MeshCache] = None
+        if config.mesh_cache_dir is not None:
+            self.mesh_cache = MeshCache(config.mesh_cache_dir)
+        self.mesh_key: Optional[str] = None
+        self.mesh_hash: Optional[str] = None
+        self.coverage: Optional[np.ndarray] = None
+        self.layer_cache: Optional[LayerCache] = None
+        if config.layer_cache_dir is not None:
+            self.layer_cache = LayerCache(config.layer_cache_dir)
+        self.layers: list[Layer] = []
 
         self.islands: list[Island] = []
         self.traces_2d: list[Trace2D] = []
         self.traces_3d: list[Trace3D] = []
 
         self.next_trace_id: int = 0
+        self.n_removed_points: int = 0
+        self.n_stitches: int = 0
+
+        self.profiler: Profiler = Profiler(config.enable_profiling)
+        self.use_kernels: bool = config.jit_kernels and NUMBA_AVAILABLE
+        if config.jit_kernels and not NUMBA_AVAILABLE:
+            self.logger.warning("Numba is not installed, the numpy geometry code is used instead of the compiled kernels")
+        self.stats: Optional[TracingStats] = None
     
     def trace_id(self) -> int:
         """Generates a new unique id for a 2D trace
@@ -69,86 +116,123 @@ class Tracer:
         self.next_trace_id += 1
         return i
 
-    def compute_traces(self, progress_callback: Optional[Callable[[int, int, str], None]] = None) -> TracingStats:
-        # 1. Load assets
+    def compute_traces(
+            self,
+            progress_callback: Optional[Callable[[int, int, str], None]] = None,
+            profiling_hook: Optional[Callable[[str, StageProfile], None]] = None
+    ) -> TracingStats:
+        """Computes the 3D traces of the texture on the model
+
+        Args:
+            progress_callback (Optional[Callable[[int, int, str], None]], optional): progress callback. Defaults to None.
+            profiling_hook (Optional[Callable[[str, StageProfile], None]], optional): called with the name and profile of each completed stage. Defaults to None.
+
+        Returns:
+            TracingStats: the tracing statistics, also kept in `stats`
+        """
         if progress_callback is None:
             progress_callback = lambda _, __, ___: None
+        if profiling_hook is not None:
+            self.profiler.hook = profiling_hook
         
         start: float = time.time()
         
-        self.texture = self.load_texture(self.texture_path)
-        self.model = self.load_model(self.model_path)
-        self.mask = self.load_mask(self.mask_path)
-
-        if not self.mesh_has_uv_map(self.model):
-            self.logger.error("Missing mesh UV coordinates")
+        # 1-2. Load assets, quantize and split colors
+        with self.profiler.stage("preparation"):
+            layers_to_draw: Optional[list[Layer]] = self.prepare_layers()
+        if layers_to_draw is None:
             return TracingStats(0, 0, 0, 0, 0)
 
-        # 2. Quantize and split colors
-        self.texture = self.mask_outside_UV_texture(self.texture, self.model)
-        self.texture = self.mask_unreachable(self.texture, self.mask)
-        self.paletted_texture = self.palettize_texture(self.texture, self.palette)
-        self.layers = self.split_colors(self.paletted_texture, self.palette)
+        # Layers whose islands and traces are already cached are not traced again
+        with self.profiler.stage("layer_cache", len(layers_to_draw)):
+            layer_keys, layer_results = self.load_cached_layers(layers_to_draw)
+        pending: list[int] = [l for l, result in enumerate(layer_results) if result is None]
+        self.logger.info(f"Tracing {len(pending)} of {len(layers_to_draw)} layer(s)")
 
         # 3. Identify color islands
-        n_layers: int = len(self.layers)
-        for c, layer in tqdm.tqdm(
-                list(enumerate(self.layers)), desc="Island detection", unit="layer"
-        ):
-            if self.config.debug:
-                print(f"c = {c} and layer = {layer}")
-
-            for no_color in self.color_not_to_draw:
-                if self.palette[c] != no_color:
-                    progress_callback(c, n_layers, "(1 / 3) Island detection")
-                    islands: list[Island] = self.detect_islands(layer, c)
-                    self.islands.extend(islands)
-                else:
-                    continue
+        with self.profiler.stage("island_detection", len(pending)):
+            layer_islands: list[list[Island]] = self.run_stage(
+                Tracer.detect_layer_islands, [(layers_to_draw[l],) for l in pending], progress_callback, "(1 / 3) Island detection", "layer"
+            )
+        pending_islands: list[Island] = [island for islands in layer_islands for island in islands]
+
+        # Borders shared by two colors are only drawn by one of them
+        if self.config.border_sharing is not None:
+            with self.profiler.stage("border_sharing", len(pending_islands)):
+                self.share_borders([
+                    island
+                    for result in layer_results if result is not None
+                    for island in result.islands
+                ] + pending_islands)
 
         # 4. Compute border and fill traces (2D)
-        n_islands: int = len(self.islands)
-        for i, island in tqdm.tqdm(
-                list(enumerate(self.islands)), desc="Island segmentation", unit="island"
-        ):
-            progress_callback(i, n_islands, "(2 / 3) Island segmentation")
-            self.traces_2d.append(Trace2D(
-                color=island.color,
-                path=np.vstack([island.outer_border, [island.outer_border[0]]]),
-                i=self.trace_id()
-            ))
-            for inner_border in island.inner_borders:
-                self.traces_2d.append(Trace2D(
-                    color=island.color,
-                    path=inner_border,
-                    i=self.trace_id()
-                ))
-            if self.config.enable_fill_slicing:
-                fill_slices: list[Trace2D] = self.compute_fill_slices(island)
-                self.logger.debug(f"Island {i}: {len(fill_slices)} fill slices")
-                self.traces_2d.extend(fill_slices)
-
-        img = np.array(self.texture.copy())
-        size = (img.shape[1], img.shape[0])
-        n_traces_2d: int = len(self.traces_2d)
+        with self.profiler.stage("segmentation", len(pending_islands)):
+            island_paths: list[list[np.ndarray]] = self.run_stage(
+                Tracer.segment_island, [(island,) for island in pending_islands], progress_callback, "(2 / 3) Island segmentation", "island",
+                surface_mesh=self.model if self.config.enable_fill_slicing and self.config.fill_spacing_mode == "surface" else None
+            )
+        pending_traces: list[Trace2D] = [
+            Trace2D(color=island.color, path=path, i=i)
+            for i, (island, path) in enumerate(
+                (island, path)
+                for island, paths in zip(pending_islands, island_paths)
+                for path in paths
+            )
+        ]
 
         # 5. Project 2D traces in 3D
-        for i, trace_2d in tqdm.tqdm(list(enumerate(self.traces_2d)), desc="3D projection", unit="trace"):
-            self.logger.debug(f"Processing trace {i}")
-            progress_callback(i, n_traces_2d, "(3 / 3) 3D projection")
-            traces_3d: Optional[list[Trace3D]] = self.project_trace_to_3d(trace_2d, self.model)
-            if traces_3d is not None:
-                self.traces_3d.extend(traces_3d)
-                if len(traces_3d) == 0:
-                    self.logger.warning(f"2D trace {i} did not produce any 3D trace")
+        with self.profiler.stage("projection", len(pending_traces)):
+            results: list[Optional[list[Trace3D]]] = self.project_traces(pending_traces, self.model, progress_callback)
+        self.warn_empty_projections(pending_traces, results)
+
+        # 6. Join 3D traces split on UV seams
+        if self.config.stitch_tolerance > 0:
+            with self.profiler.stage("stitching", len(pending_traces)):
+                results = self.stitch_traces(results)
+
+        # 7. Remove redundant 3D points
+        if self.config.simplification_tolerance > 0:
+            with self.profiler.stage("simplification", len(pending_traces)):
+                results = self.simplify_traces(results)
+
+        with self.profiler.stage("merge", len(layers_to_draw)):
+            # Split the new results per layer, with 3D traces referring to the index of their path in the layer
+            first_island: int = 0
+            first_trace: int = 0
+            for l, islands in zip(pending, layer_islands):
+                paths: list[np.ndarray] = [
+                    path
+                    for paths in island_paths[first_island:first_island + len(islands)]
+                    for path in paths
+                ]
+                layer_results[l] = LayerResult(
+                    color=layers_to_draw[l].color,
+                    islands=islands,
+                    paths=paths,
+                    traces_3d=[
+                        None if traces_3d is None else [
+                            dataclasses.replace(trace, parent_2d_trace=trace.parent_2d_trace - first_trace)
+                            for trace in traces_3d
+                        ]
+                        for traces_3d in results[first_trace:first_trace + len(paths)]
+                    ]
+                )
+                if self.layer_cache is not None:
+                    self.layer_cache.store(layer_keys[l], layer_results[l])  # type: ignore
+                first_island += len(islands)
+                first_trace += len(paths)
 
+            # The tiled mode keeps no full size copy of the texture, the traces are drawn on its paletted version
             if self.config.debug:
-                pts: np.ndarray = self.uv_to_texture(trace_2d.path, size).astype(np.intp)
-                col = (255, 0, 255) if traces_3d is None or len(traces_3d) == 0 else (255, 255, 0)
-                cv2.polylines(img, [pts], True, col)
+                img = np.array(self.texture if self.texture is not None else self.paletted_texture.convert("RGB"))
+                size = (img.shape[1], img.shape[0])
+            for result in layer_results:
+                for trace_2d, traces_3d in self.merge_layer_result(result):  # type: ignore
+                    if self.config.debug:
+                        pts: np.ndarray = self.uv_to_texture(np.asarray(trace_2d.path), size).astype(np.intp)
+                        col = (255, 0, 255) if traces_3d is None or len(traces_3d) == 0 else (255, 255, 0)
+                        cv2.polylines(img, [pts], True, col)
 
-        n_traces_3d: int = len(self.traces_3d)
-        n_points: int = sum(map(lambda t: len(t.path), self.traces_3d))
         if self.config.debug:
             cv2.imshow("Segments", cv2.cvtColor(img, cv2.COLOR_RGB2BGR))
             cv2.waitKey(-1)
@@ -157,7 +241,7 @@ class Tracer:
             segments = []
             total_points = 0
             for trace in self.traces_3d:
-                total_points += len(trace.path)
+                total_points += len(trace)
                 color = self.palette[trace.color]
                 polygon = trace.get_polygon()
                 path = trimesh.load_path(polygon)
@@ -172,17 +256,372 @@ class Tracer:
         end: float = time.time()
         progress_callback(1, 1, "Done")
         
+        self.stats = self.get_stats(end - start)
+        return self.stats
+
+    def iter_traces(
+            self,
+            progress_callback: Optional[Callable[[int, int, str], None]] = None,
+            profiling_hook: Optional[Callable[[str, StageProfile], None]] = None
+    ) -> Iterator[list[Trace3D]]:
+        """Computes the traces, yielding the 3D traces of each island as soon as they are projected
+
+        Layers and islands are processed one at a time in the current thread, in the same order as
+        `compute_traces`, so the traces and their ids are the same. Traces are also accumulated in `traces_3d`.
+        Stitching only joins traces of the same island, since the others are not known yet, so the layers are
+        cached apart from those of `compute_traces` when stitching is enabled
+
+        Args:
+            progress_callback (Optional[Callable[[int, int, str], None]], optional): progress callback. Defaults to None.
+            profiling_hook (Optional[Callable[[str, StageProfile], None]], optional): called with the name and profile of each completed stage. Defaults to None.
+
+        Yields:
+            list[Trace3D]: the 3D traces of an island (or of a whole layer when it was cached)
+        """
+        if progress_callback is None:
+            progress_callback = lambda _, __, ___: None
+        if profiling_hook is not None:
+            self.profiler.hook = profiling_hook
+
+        # Stages are timed in pieces, leaving out the time spent by the caller between two batches
+        with self.profiler.stage("preparation"):
+            layers_to_draw: Optional[list[Layer]] = self.prepare_layers()
+        if layers_to_draw is None:
+            return
+
+        with self.profiler.stage("layer_cache", len(layers_to_draw)):
+            layer_keys, layer_results = self.load_cached_layers(layers_to_draw, stitch_scope="island")
+
+        # Sharing borders needs the islands of all the layers before tracing any
+        detected: dict[int, list[Island]] = {}
+        if self.config.border_sharing is not None:
+            with self.profiler.stage("island_detection"):
+                detected = {
+                    l: self.detect_layer_islands(layer)
+                    for l, (layer, result) in enumerate(zip(layers_to_draw, layer_results))
+                    if result is None
+                }
+            with self.profiler.stage("border_sharing"):
+                self.share_borders([
+                    island
+                    for l, result in enumerate(layer_results)
+                    for island in (result.islands if result is not None else detected[l])
+                ])
+
+        for l, (layer, result) in enumerate(zip(layers_to_draw, layer_results)):
+            progress_callback(l, len(layers_to_draw), "Tracing layers")
+            if result is not None:
+                with self.profiler.stage("merge", 1):
+                    merged: list[Trace3D] = [trace for _, traces_3d in self.merge_layer_result(result) for trace in traces_3d or []]
+                yield merged
+                continue
+
+            if l in detected:
+                islands: list[Island] = detected.pop(l)
+            else:
+                with self.profiler.stage("island_detection", 1):
+                    islands = self.detect_layer_islands(layer)
+            result = LayerResult(color=layer.color, islands=[], paths=[], traces_3d=[])
+            for island in islands:
+                with self.profiler.stage("segmentation", 1):
+                    paths: list[np.ndarray] = self.segment_island(island)
+                with self.profiler.stage("projection", len(paths)):
+                    island_result: LayerResult = LayerResult(
+                        color=island.color,
+                        islands=[island],
+                        paths=paths,
+                        traces_3d=[
+                            self.project_trace_to_3d(Trace2D(color=island.color, path=path, i=p), self.model)  # type: ignore
+                            for p, path in enumerate(paths)
+                        ]
+                    )
+                self.warn_empty_projections(
+                    [Trace2D(color=island.color, path=path, i=p) for p, path in enumerate(paths)],
+                    island_result.traces_3d
+                )
+                if self.config.stitch_tolerance > 0:
+                    with self.profiler.stage("stitching", len(paths)):
+                        island_result.traces_3d = self.stitch_traces(island_result.traces_3d)
+                if self.config.simplification_tolerance > 0:
+                    with self.profiler.stage("simplification", len(paths)):
+                        island_result.traces_3d = self.simplify_traces(island_result.traces_3d)
+                with self.profiler.stage("merge"):
+                    merged = [trace for _, traces_3d in self.merge_layer_result(island_result) for trace in traces_3d or []]
+                yield merged
+
+                # Paths are indexed in the whole layer in cache entries
+                result.islands.append(island)
+                result.traces_3d.extend(
+                    None if traces_3d is None else [
+                        dataclasses.replace(trace, parent_2d_trace=trace.parent_2d_trace + len(result.paths))
+                        for trace in traces_3d
+                    ]
+                    for traces_3d in island_result.traces_3d
+                )
+                result.paths.extend(paths)
+
+            if self.layer_cache is not None:
+                self.layer_cache.store(layer_keys[l], result)
+
+        progress_callback(1, 1, "Done")
+
+    def prepare_layers(self) -> Optional[list[Layer]]:
+        """Loads the assets, then quantizes and splits the texture colors
+
+        Returns:
+            Optional[list[Layer]]: the layers to draw, or None if the mesh has no UV map
+        """
+        if self.config.tile_size is not None:
+            return self.prepare_tiled_layers()
+
+        # 1. Load assets
+        self.texture = self.load_texture(self.texture_path)
+        if self.model is None:
+            self.model = self.load_model(self.model_path)
+        if self.mask is None:
+            self.mask = self.load_mask(self.mask_path)
+
+        if not self.mesh_has_uv_map(self.model):
+            self.logger.error("Missing mesh UV coordinates")
+            return None
+
+        # 2. Quantize and split colors
+        self.texture = self.mask_outside_UV_texture(self.texture, self.model)
+        self.texture = self.mask_unreachable(self.texture, self.mask)
+        self.paletted_texture = self.palettize_texture(self.texture, self.palette)
+        self.layers = self.split_colors(self.paletted_texture, self.palette)
+
+        return self.layers_to_draw()
+
+    def prepare_tiled_layers(self) -> Optional[list[Layer]]:
+        """Loads the assets, then quantizes and splits the texture colors tile by tile
+
+        Only the label image is kept at full size: the texture and the mask stay at their original size and are
+        resized, masked and quantized one tile at a time (see `palettize_tiles`)
+
+        Returns:
+            Optional[list[Layer]]: the layers to draw, or None if the mesh has no UV map
+        """
+        # 1. Load assets
+        texture: Image.Image = self.open_texture(self.texture_path)
+        if self.model is None:
+            self.model = self.load_model(self.model_path)
+        if self.mask is None:
+            self.mask = self.open_mask(self.mask_path)
+
+        if not self.mesh_has_uv_map(self.model):
+            self.logger.error("Missing mesh UV coordinates")
+            return None
+
+        # 2. Quantize and split colors
+        self.label_image = self.palettize_tiles(texture, self.mask, self.model, self.palette)
+        self.paletted_texture = self.labels_to_image(self.label_image, self.palette)
+        self.layers = self.split_colors(self.paletted_texture, self.palette)
+
+        return self.layers_to_draw()
+
+    def get_assets(self) -> Optional[TracerAssets]:
+        """Gathers the loaded data that does not depend on the texture, to reuse it in other runs
+
+        Returns:
+            Optional[TracerAssets]: the assets, or None if the model and mask are not loaded yet
+        """
+        if self.model is None or self.mask is None:
+            return None
+        return TracerAssets(
+            model=self.model,
+            mask=self.mask,
+            mesh_key=self.mesh_key,
+            mesh_hash=self.mesh_hash,
+            uv_index=self.uv_index if self.uv_index_mesh is self.model else None,
+            seams=self.seams if self.seams_mesh is self.model else None,
+            v_gradients=self.v_gradients if self.v_gradients_mesh is self.model else None,
+            coverage=self.coverage
+        )
+
+    def use_assets(self, assets: TracerAssets):
+        """Reuses the data loaded by another run on the same model and mask, instead of loading it again
+
+        Args:
+            assets (TracerAssets): the assets
+        """
+        self.model = assets.model
+        self.mask = assets.mask
+        self.mesh_key = assets.mesh_key
+        self.mesh_hash = assets.mesh_hash
+        if assets.uv_index is not None:
+            self.uv_index, self.uv_index_mesh = assets.uv_index, assets.model
+        if assets.seams is not None:
+            self.seams, self.seams_mesh = assets.seams, assets.model
+        if assets.v_gradients is not None:
+            self.v_gradients, self.v_gradients_mesh = assets.v_gradients, assets.model
+        self.coverage = assets.coverage
+
+    def layers_to_draw(self) -> list[Layer]:
+        """Selects the layers whose color is drawn
+
+        Returns:
+            list[Layer]: the layers to draw
+        """
+        return [
+            layer
+            for c, layer in enumerate(self.layers)
+            if self.palette[c] not in self.color_not_to_draw
+        ]
+
+    def load_cached_layers(self, layers: list[Layer], stitch_scope: str = "layer") -> tuple[list[str], list[Optional[LayerResult]]]:
+        """Loads the cached results of the given layers
+
+        Args:
+            layers (list[Layer]): the layers
+            stitch_scope (str, optional): the traces stitching can join: "layer" for all the traces of a layer
+                (`compute_traces`), "island" for the traces of each island (`iter_traces`). Defaults to "layer".
+
+        Returns:
+            tuple[list[str], list[Optional[LayerResult]]]: the cache key and the cached result (or None) of each layer
+        """
+        if self.layer_cache is None:
+            return [], [None] * len(layers)
+
+        if self.mesh_hash is None:
+            self.mesh_hash = file_hash(self.model_path)
+        context: str = self.mesh_hash
+        if self.config.border_sharing is not None and self.label_image is not None:
+            # Shared borders depend on the neighbouring layers too
+            context += "-" + hashlib.sha256(np.ascontiguousarray(self.label_image)).hexdigest()
+            if self.config.border_sharing in ("darker", "lighter"):
+                # So do the colors ranking the layers (see `border_rank`)
+                context += f"-{tuple(tuple(int(v) for v in color) for color in self.palette)}"
+        if self.config.stitch_tolerance > 0:
+            context += f"-stitch-{stitch_scope}"
+        keys: list[str] = [self.layer_cache.key(layer, self.config, context) for layer in layers]
+        return keys, [self.layer_cache.load(key) for key in keys]
+
+    def merge_layer_result(self, result: LayerResult) -> list[tuple[Trace2D, Optional[list[Trace3D]]]]:
+        """Appends the islands and traces of a layer to the tracer's, assigning the next trace ids
+
+        Args:
+            result (LayerResult): the layer's islands and traces
+
+        Returns:
+            list[tuple[Trace2D, Optional[list[Trace3D]]]]: the merged 2D traces, with their 3D traces
+        """
+        self.islands.extend(result.islands)
+
+        merged: list[tuple[Trace2D, Optional[list[Trace3D]]]] = []
+        trace_ids: list[int] = [self.trace_id() for _ in result.paths]
+        for path, i, traces_3d in zip(result.paths, trace_ids, result.traces_3d):
+            trace_2d: Trace2D = Trace2D(color=result.color, path=path, i=i)
+            self.traces_2d.append(trace_2d)
+
+            if traces_3d is not None:
+                traces_3d = [
+                    dataclasses.replace(trace, parent_2d_trace=trace_ids[trace.parent_2d_trace])
+                    for trace in traces_3d
+                ]
+                self.traces_3d.extend(traces_3d)
+            merged.append((trace_2d, traces_3d))
+        return merged
+
+    def get_stats(self, duration: float) -> TracingStats:
+        """Summarizes the computed traces
+
+        Args:
+            duration (float): duration of the tracing, in seconds
+
+        Returns:
+            TracingStats: the tracing statistics
+        """
         return TracingStats(
-            end - start,
-            n_islands,
-            n_traces_2d,
-            n_traces_3d,
-            n_points
+            duration,
+            len(self.islands),
+            len(self.traces_2d),
+            len(self.traces_3d),
+            sum(map(len, self.traces_3d)),
+            n_removed_points=self.n_removed_points,
+            n_stitches=self.n_stitches,
+            stages={name: dataclasses.replace(profile) for name, profile in self.profiler.stages.items()},
+            counters=self.profiler.get_counters(),
+            peak_rss_mb=peak_rss_mb()
+        )
+
+    def run_stage(
+            self,
+            function: Callable[..., T],
+            args_list: list[tuple],
+            progress_callback: Callable[[int, int, str], None],
+            label: str,
+            unit: str,
+            surface_mesh: Optional[Trimesh] = None
+    ) -> list[T]:
+        """Applies a tracer method to each set of arguments, concurrently if enabled in the configuration
+
+        Args:
+            function (Callable[..., T]): the (unbound) `Tracer` method
+            args_list (list[tuple]): the arguments of each call
+            progress_callback (Callable[[int, int, str], None]): progress callback
+            label (str): label of the stage, for the progress callback
+            unit (str): unit of the items, for the progress bar
+            surface_mesh (Optional[Trimesh], optional): the mesh the method needs, with its surface gradients of v,
+                shared with process workers. Defaults to None.
+
+        Returns:
+            list[T]: the results of each call, in the same order as `args_list`
+        """
+        n_workers: int = self.config.island_workers
+        if n_workers == 0:
+            n_workers = os.cpu_count() or 1
+
+        # Visualisation windows must stay in the main thread
+        if n_workers > 1 and len(args_list) > 1 and not self.visualisations_enabled():
+            self.logger.info(f"{label}: running {len(args_list)} {unit}(s) on {n_workers} {self.config.island_executor}(s)")
+            return map_concurrently(
+                self,
+                function,
+                args_list,
+                n_workers,
+                self.config.island_executor,
+                lambda done, total: progress_callback(done, total, label),
+                shared_arrays=(
+                    mesh_arrays(self, surface_mesh, with_gradients=True)
+                    if surface_mesh is not None and self.config.island_executor == "process" else None
+                )
+            )
+
+        results: list[T] = []
+        for i, args in tqdm.tqdm(list(enumerate(args_list)), desc=label, unit=unit):
+            progress_callback(i, len(args_list), label)
+            results.append(function(self, *args))
+        return results
+
+    def visualisations_enabled(self) -> bool:
+        """States whether any debug window may be opened
+
+        Returns:
+            bool: True if debug or any visualisation is enabled
+        """
+        return (
+            self.config.debug or
+            self.config.enable_reduction_visualisation or
+            self.config.enable_inputs_visualisation or
+            self.config.enable_texture_transformation_visualisation or
+            self.config.enable_island_selection_visualisation
         )
 
     def load_texture(self, path: Path) -> Image.Image:
         """Load texture from file path
 
+        Args:
+            path (Path): path of the texture file to load
+
+        Returns:
+            Image.Image: texture loaded
+        """
+        return self.open_texture(path).resize(self.config.image_size)
+
+    def open_texture(self, path: Path) -> Image.Image:
+        """Load texture from file path, at its original size
+
         Args:
             path (Path): path of the texture file to load
 
@@ -200,7 +639,7 @@ class Tracer:
         if self.config.enable_inputs_visualisation:
             c_img_arr = np.array(im.convert("RGB"))
             cv2.imshow("input texture image", cv2.cvtColor(c_img_arr, cv2.COLOR_RGB2BGR))
-        return im.resize(self.config.image_size)
+        return im
 
     def load_model(self, path: Path) -> Trimesh:
         """Load 3d model from its object file into a trimesh instance
@@ -217,7 +656,18 @@ class Tracer:
             self.logger.error(f"The file {path} does not exist")
             raise FileNotFoundError(f"The file {path} does not exist")
 
-        mesh = trimesh.load_mesh(path)
+        mesh: Optional[Trimesh] = None
+        if self.mesh_cache is not None:
+            self.mesh_key = self.mesh_cache.key(path, self.config.uv_grid_resolution, self.config.barycentric_epsilon)
+            cached: Optional[tuple[Trimesh, UVIndex]] = self.mesh_cache.load(self.mesh_key)
+            if cached is not None:
+                mesh, self.uv_index = cached
+                self.uv_index_mesh = mesh
+
+        if mesh is None:
+            mesh = trimesh.load_mesh(path)
+            if self.mesh_cache is not None and self.mesh_key is not None and self.mesh_has_uv_map(mesh):
+                self.mesh_cache.store(self.mesh_key, mesh, self.get_uv_index(mesh))
 
         if self.config.enable_inputs_visualisation:
             mesh.show(resolution = (800,600))
@@ -227,6 +677,17 @@ class Tracer:
     def load_mask(self, path: Path) -> Image.Image:
         """Load mask from file path
 
+        Args:
+            path (Path): path of the mask file to load
+
+        Returns:
+            Image.Image: mask loaded
+        """
+        return self.open_mask(path).resize(self.config.image_size)
+
+    def open_mask(self, path: Path) -> Image.Image:
+        """Load mask from file path, at its original size
+
         Args:
             path (Path): path of the mask file to load
 
@@ -239,8 +700,7 @@ class Tracer:
             self.logger.error(f"The file {path} does not exist")
             raise FileNotFoundError(f"The file {path} does not exist")
     
-        im = Image.open(path).convert("1")
-        return im.resize(self.config.image_size)
+        return Image.open(path).convert("1")
 
     # https://stackoverflow.com/questions/29433243/
     def palettize_texture(self, img: Image.Image, palette: tuple[Color, ...]) -> Image.Image:
@@ -258,13 +718,14 @@ class Tracer:
         c_img_arr = np.array(img.convert("RGB"))
         # En excluant les pixels noirs (issus du drawable mask)
         mask = np.any(c_img_arr, axis=-1)
-        pixels_to_quantize = c_img_arr[mask]
         # palettization
-        palettized_pixels = self.quantize_to_palette(pixels_to_quantize, np.array(palette))
+        labels = quantize_labels(c_img_arr, palette, self.config.palette_lut_bits)
+        labels[~mask] = color_label((0, 0, 0), palette)
+        self.label_image = labels
 
         # Réinjection des pixels palettizés dans image de base
         output_arr = c_img_arr.copy()
-        output_arr[mask] = palettized_pixels
+        output_arr[mask] = np.asarray(palette, dtype=np.uint8)[labels[mask]]
 
         output_img = Image.fromarray(output_arr.astype(np.uint8), "RGB")
 
@@ -275,41 +736,140 @@ class Tracer:
 
         return output_img
 
+    def palettize_tiles(
+            self,
+            texture: Image.Image,
+            mask: Image.Image,
+            mesh: Trimesh,
+            palette: tuple[Color, ...]
+    ) -> np.ndarray:
+        """Quantizes the texture to the palette, one tile at a time
+
+        Each tile is resized from the original texture, masked outside the UV map and the reachable region,
+        then quantized. Pixels masked out get the label of black, as in `palettize_texture`
+
+        Args:
+            texture (Image.Image): the texture, at its original size
+            mask (Image.Image): the binary mask of the reachable region, at its original size
+            mesh (Trimesh): the model's mesh
+            palette (tuple[Color, ...]): the palette containing selected colors
+
+        Returns:
+            np.ndarray: the palette index of each pixel of the texture (HxW, uint8)
+        """
+        self.logger.info(f"Palettizing texture colors by tiles of {self.config.tile_size} pixels")
+
+        size: tuple[int, int] = self.config.image_size
+        labels: np.ndarray = np.empty((size[1], size[0]), dtype=np.uint8)
+        faces: np.ndarray = self.uv_face_pixels(mesh, size)
+        faces_min: np.ndarray = faces.min(axis=1)
+        faces_max: np.ndarray = faces.max(axis=1)
+        black: int = color_label((0, 0, 0), palette)
+
+        for box in tile_boxes(size, self.config.tile_size):  # type: ignore
+            x0, y0, x1, y1 = box
+            tile: np.ndarray = np.asarray(resize_tile(texture, size, box))
+
+            # Only the faces overlapping the tile are rasterized, on a canvas holding them whole as on the whole
+            # image: `cv2.fillPoly` shifts the pixels drawn along the edges it clips
+            overlapping: np.ndarray = np.all((faces_max >= (x0, y0)) & (faces_min < (x1, y1)), axis=1)
+            cx0, cy0, cx1, cy1 = box
+            if np.any(overlapping):
+                cx0, cy0 = np.maximum(np.minimum(faces_min[overlapping].min(axis=0), (x0, y0)), 0)
+                cx1, cy1 = np.minimum(np.maximum(faces_max[overlapping].max(axis=0) + 1, (x1, y1)), size)
+            canvas: np.ndarray = np.zeros((cy1 - cy0, cx1 - cx0), dtype=np.uint8)
+            cv2.fillPoly(canvas, faces[overlapping], 255, offset=(-int(cx0), -int(cy0)))
+            coverage: np.ndarray = canvas[y0 - cy0:y1 - cy0, x0 - cx0:x1 - cx0]
+            reachable: np.ndarray = np.asarray(resize_tile(mask, size, box))
+
+            drawn: np.ndarray = (coverage > 0) & reachable & np.any(tile, axis=-1)
+            tile_labels: np.ndarray = quantize_labels(tile, palette, self.config.palette_lut_bits)
+            tile_labels[~drawn] = black
+            labels[y0:y1, x0:x1] = tile_labels
+
+        return labels
+
+    def labels_to_image(self, labels: np.ndarray, palette: tuple[Color, ...]) -> Image.Image:
+        """Builds the paletted texture from its label image
+
+        Args:
+            labels (np.ndarray): the palette index of each pixel of the texture (HxW, uint8)
+            palette (tuple[Color, ...]): the palette containing selected colors
+
+        Returns:
+            Image.Image: the paletted texture, in "P" mode. Pixels without a label are black
+        """
+        img: Image.Image = Image.fromarray(labels, "P")
+        img.putpalette(np.asarray(palette, dtype=np.uint8).ravel().tolist())
+        return img
+
     # https://stackoverflow.com/questions/56942102
-    def split_colors(self, img: Image.Image, palette: tuple[Color, ...]) -> list[Image.Image]:
-        """ Split the paletted texture into one image per color from the palette
+    def split_colors(self, img: Image.Image, palette: tuple[Color, ...]) -> list[Layer]:
+        """ Split the paletted texture into one layer per color from the palette
+
+        All layers share a single label image, their binary masks are only computed when needed
 
         Args:
             img (Image.Image): Paletted texture
 
         Returns:
-            list[Image.Image]: A list of single color channel image
+            list[Layer]: A list of single color layers
         """
         self.logger.info("Splitting colors channels")
-        images = []
 
-        for color in palette:
-            # Assurer la standardisation
+        # Reuse the labels computed while palettizing when they match the image
+        labels: Optional[np.ndarray] = self.label_image
+        if labels is None or labels.shape != (img.height, img.width):
             np_img = np.array(img.convert('RGB'))
+            labels = np.full(np_img.shape[:2], NO_LABEL, dtype=np.uint8)
+            for color in reversed(palette):
+                # True là où la couleur correspond sur les 3 canaux (R, G, B)
+                labels[np.all(np_img == color, axis=-1)] = color_label(color, palette)
+            self.label_image = labels
 
-            # Créer le masque : True là où la couleur correspond sur les 3 canaux (R, G, B)
-            mask = np.all(np_img == color, axis=-1)
-            # Créer une image en appliquant le masque
-            mask_img = Image.fromarray((mask * 255).astype(np.uint8))
-            images.append(mask_img)
+        layers: list[Layer] = [
+            Layer(color=c, labels=labels, label=color_label(color, palette))
+            for c, color in enumerate(palette)
+        ]
 
-            if self.config.enable_texture_transformation_visualisation:
-                cv2.imshow(f"splitted color image {color}", np.array(mask_img))
+        if self.config.enable_texture_transformation_visualisation:
+            for layer in layers:
+                cv2.imshow(f"splitted color image {palette[layer.color]}", layer.mask * 255)
                 cv2.waitKey(-1)
                 cv2.destroyAllWindows()
 
-        return images
+        return layers
+
+    def detect_layer_islands(self, layer: Layer) -> list[Island]:
+        """Detects the color islands of a layer
 
-    def detect_islands(self, img: Image.Image, color: int) -> list[Island]:
+        Args:
+            layer (Layer): the color layer
+
+        Returns:
+            list[Island]: list of islands in the layer
+        """
+        if self.config.tile_size is None:
+            return self.detect_islands(layer.mask, layer.color)
+
+        self.logger.info(f"Detecting islands for color {layer.color} by tiles of {self.config.tile_size} pixels")
+        boxes, _, seeds = find_components(layer.labels, layer.label, self.config.tile_size)
+        if self.config.prefilter_small_islands:
+            # Same criterion as `remove_small_components`
+            keep: np.ndarray = (boxes[:, 2] - boxes[:, 0] - 1) * (boxes[:, 3] - boxes[:, 1] - 1) >= self.config.min_island_surface
+            self.logger.debug(f"Removed {np.count_nonzero(~keep)} of {len(boxes)} components")
+            boxes, seeds = boxes[keep], seeds[keep]
+        contours, hierarchy = component_contours(layer.labels, layer.label, boxes, seeds)
+        size: tuple[int, int] = (layer.labels.shape[1], layer.labels.shape[0])
+        # The visualisations need the whole layer
+        image: Optional[np.ndarray] = layer.mask if self.config.enable_island_selection_visualisation else None
+        return self.contours_to_islands(contours, hierarchy, layer.color, size, image)
+
+    def detect_islands(self, layer: np.ndarray, color: int) -> list[Island]:
         """Detects color islands and extracts its border as a polygon
 
         Args:
-            img (Image.Image): input binary image
+            layer (np.ndarray): input binary image (HxW, uint8)
             color (int): color index for this layer
 
         Returns:
@@ -317,9 +877,32 @@ class Tracer:
         """
         self.logger.info(f"Detecting islands for color {color}")
 
-        layer: np.ndarray = np.asarray(img)
+        if self.config.prefilter_small_islands:
+            layer = self.remove_small_components(layer)
 
         contours, hierarchy = cv2.findContours(layer, cv2.RETR_CCOMP, cv2.CHAIN_APPROX_SIMPLE)
+        return self.contours_to_islands(contours, hierarchy, color, (layer.shape[1], layer.shape[0]), layer)
+
+    def contours_to_islands(
+            self,
+            contours: list[np.ndarray],
+            hierarchy: Optional[np.ndarray],
+            color: int,
+            size: tuple[int, int],
+            layer: Optional[np.ndarray] = None
+    ) -> list[Island]:
+        """Simplifies the contours of a layer and groups them into islands
+
+        Args:
+            contours (list[np.ndarray]): the contours, as found by `cv2.findContours`
+            hierarchy (Optional[np.ndarray]): their hierarchy, in the `cv2.RETR_CCOMP` format
+            color (int): color index for this layer
+            size (tuple[int, int]): size of the layer in pixels (w,h)
+            layer (Optional[np.ndarray], optional): binary image of the layer, for the visualisations. Defaults to None.
+
+        Returns:
+            list[Island]: list of islands in the layer
+        """
         self.logger.debug(f"Found {len(contours)} contours")
         if contours is None or hierarchy is None:
             return []
@@ -353,7 +936,8 @@ class Tracer:
             else:
                 contours_too_small.append((contour, hierarchy))
 
-        if self.config.enable_island_selection_visualisation:
+        if self.config.enable_island_selection_visualisation and layer is not None:
+            layer = (layer > 0).astype(np.uint8) * 255
             cv2.imshow('Islands in the layer', layer)
             with_contours = cv2.cvtColor(layer, cv2.COLOR_GRAY2BGR)
             cv2.drawContours(with_contours, contours, -1, (0, 255, 0), 2)
@@ -389,7 +973,7 @@ class Tracer:
         # border simple
         for h in hierarchies:
             if not h.has_parent and not h.has_child:
-                polygon_uv = self.texture_to_uv(h.polygon, (layer.shape[1], layer.shape[0]))
+                polygon_uv = self.texture_to_uv(h.polygon, size)
                 islands.append(Island(color=color, outer_border=polygon_uv))
 
        # multi-border (outer+inner)
@@ -397,9 +981,9 @@ class Tracer:
                     if not h.has_parent and h.has_child}
 
         for parent in parents.values():
-            outer = self.texture_to_uv(parent.polygon, (layer.shape[1], layer.shape[0]))
+            outer = self.texture_to_uv(parent.polygon, size)
             inner_borders = [
-                self.texture_to_uv(h.polygon, (layer.shape[1], layer.shape[0]))
+                self.texture_to_uv(h.polygon, size)
                 for h in hierarchies
                 if h.parent == parent.index
             ]
@@ -411,7 +995,95 @@ class Tracer:
 
         return islands
     
-    # https://shapely.readthedocs.io/en/stable/index.html
+    def remove_small_components(self, layer: np.ndarray) -> np.ndarray:
+        """Removes connected components that cannot contain an island of `min_island_surface`
+
+        The outer contour of a component lies within its bounding box, whose area bounds the contour area,
+        so the removed components would be discarded anyway after contour extraction
+
+        Args:
+            layer (np.ndarray): binary image (HxW, uint8)
+
+        Returns:
+            np.ndarray: the binary image without the small components
+        """
+        n, components, stats, _ = cv2.connectedComponentsWithStats(layer, connectivity=8)
+        widths: np.ndarray = stats[1:, cv2.CC_STAT_WIDTH] - 1
+        heights: np.ndarray = stats[1:, cv2.CC_STAT_HEIGHT] - 1
+        keep: np.ndarray = np.concatenate([[False], widths * heights >= self.config.min_island_surface])
+        self.logger.debug(f"Removed {np.count_nonzero(~keep[1:])} of {n - 1} components")
+        if np.all(keep[1:]):
+            return layer
+        return keep[components].view(np.uint8)
+
+    def share_borders(self, islands: list[Island]):
+        """Removes the border sections an island shares with an island of another color drawing them,
+        according to the `border_sharing` rule (see `share_borders` in `tracing.border_sharing`)
+
+        The remaining paths are kept in the `border_paths` of the islands
+
+        Args:
+            islands (list[Island]): the islands of all the layers to draw
+        """
+        size: np.ndarray = np.array([self.label_image.shape[1], self.label_image.shape[0]])  # type: ignore
+        rank: dict[int, tuple[float, int]] = {
+            color: self.border_rank(color)
+            for color in {island.color for island in islands}
+        }
+        border_paths: list[Optional[list[np.ndarray]]] = share_borders(
+            [[island.outer_border, *island.inner_borders] for island in islands],
+            [island.color for island in islands],
+            self.config.border_sharing_distance / size,
+            lambda color, other: rank[color] > rank[other]
+        )
+        n_shared: int = 0
+        for island, paths in zip(islands, border_paths):
+            island.border_paths = paths
+            n_shared += paths is not None
+        self.logger.info(f"{n_shared} of {len(islands)} island(s) share borders with a color drawing them")
+
+    def border_rank(self, color: int) -> tuple[float, int]:
+        """Ranks a color for drawing the borders it shares, according to the `border_sharing` rule
+
+        Args:
+            color (int): the color index
+
+        Returns:
+            tuple[float, int]: the rank of the color, the highest one draws the shared borders
+        """
+        r, g, b = self.palette[color]
+        luminance: float = 0.299 * r + 0.587 * g + 0.114 * b
+        rule: Optional[str] = self.config.border_sharing
+        if rule == "darker":
+            return -luminance, color
+        if rule == "lighter":
+            return luminance, color
+        if rule == "first":
+            return -color, color
+        if rule == "last":
+            return color, color
+        raise ValueError(f"Unknown border sharing rule: {rule}")
+
+    def segment_island(self, island: Island) -> list[np.ndarray]:
+        """Computes the 2D paths drawing an island: its outer border, inner borders and fill slices
+
+        Args:
+            island (Island): Detected island of color
+
+        Returns:
+            list[np.ndarray]: the paths in UV space (Nx2), in drawing order
+        """
+        if island.border_paths is not None:
+            paths: list[np.ndarray] = list(island.border_paths)
+        else:
+            paths = [np.vstack([island.outer_border, [island.outer_border[0]]])]
+            paths.extend(island.inner_borders)
+        if self.config.enable_fill_slicing:
+            fill_paths: list[np.ndarray] = self.compute_fill_paths(island)
+            self.logger.debug(f"{len(fill_paths)} fill slices for island of color {island.color}")
+            paths.extend(fill_paths)
+        return paths
+
     def compute_fill_slices(self, island: Island) -> list[Trace2D]:
         """Compute the traces to fill the interior of an island
 
@@ -421,6 +1093,25 @@ class Tracer:
         Returns:
             list[Trace2D]: List of 2D traces filling the island
         """
+        return [
+            Trace2D(
+                color=island.color,
+                path=path,
+                i=self.trace_id()
+            )
+            for path in self.compute_fill_paths(island)
+        ]
+
+    # https://shapely.readthedocs.io/en/stable/index.html
+    def compute_fill_paths(self, island: Island) -> list[np.ndarray]:
+        """Compute the paths filling the interior of an island
+
+        Args:
+            island (Island): Detected island of color
+
+        Returns:
+            list[np.ndarray]: List of paths in UV space (Nx2) filling the island
+        """
         self.logger.info(f"Computing fill slices for island : {island}")
 
         island = self.clean_island(island)
@@ -430,25 +1121,15 @@ class Tracer:
         if not polygon.is_valid:
             polygon = shapely.make_valid(polygon)
 
-        # BB du polygone
-        minx, miny, maxx, maxy = polygon.bounds
-        
-        # génération d'une grille de ligne à superposer/intersecter avec l'island
-        lines : list[LineString] = []
-        spacing: float = self.config.fill_slice_spacing
-        c_y = miny + spacing
-        while c_y < maxy:
-            lines.append(LineString([(minx, c_y), (maxx, c_y)]))
-            c_y += spacing
-
-        # Intersection de la grille de lignes et du polygone
-        fill_lines: list[Union[LineString, MultiLineString]] = [
-            line.intersection(polygon)
-            for line in lines
-            if line.intersects(polygon)
-        ]  # type: ignore
-        
+        if self.config.fill_strategy == "hatching":
+            paths: list[np.ndarray] = self.hatch_paths(polygon)
+        elif self.config.fill_strategy == "contour":
+            paths = self.contour_paths(polygon)
+        else:
+            raise ValueError(f"Unknown fill strategy: {self.config.fill_strategy}")
+
         if self.config.debug:
+            minx, miny, maxx, maxy = polygon.bounds
             fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 6))
 
             fig.canvas.manager.set_window_title('Fill slicing process')
@@ -467,87 +1148,104 @@ class Tracer:
             ax1.set_title("Before the filling")
 
             plot_polygon(polygon, ax=ax2, facecolor='lightblue', edgecolor='blue', alpha=0.5)
-            for fill_line in fill_lines:
-                if isinstance(fill_line, LineString):
-                    plot_line(fill_line, ax=ax2, color='green', linewidth=1)
-                elif isinstance(fill_line, (MultiLineString, GeometryCollection)):
-                    for part in fill_line.geoms:
-                        if isinstance(part, LineString):
-                            plot_line(part, ax=ax2, color='red', linewidth=1)
+            for path in paths:
+                plot_line(LineString(path), ax=ax2, color='green', linewidth=1)
             ax2.set_title("After the filling")
 
             plt.tight_layout()
             plt.show()
-        
-        # Tri entre LineString et MultiLineString et ajout à la variable de retour
-        traces : list[Trace2D] = []
-        for l in fill_lines:  # noqa: E741
-            if l.geom_type == "LineString":
-                trace = Trace2D(
-                    color=island.color,
-                    path=l.coords,
-                    i=self.trace_id()
-                )
-                traces.append(trace)
-            elif l.geom_type == "Point":
-                continue
-            else:
-                for ls in l.geoms:
-                    trace = Trace2D(
-                        color=island.color,
-                        path=ls.coords,
-                        i=self.trace_id()
-                    )
-                    traces.append(trace)
-        return traces
+
+        return paths
     
+    def hatch_paths(self, polygon: BaseGeometry) -> list[np.ndarray]:
+        """Computes the horizontal slices filling an island, spaced according to `fill_spacing_mode`
+
+        Args:
+            polygon (BaseGeometry): the (valid) area of the island in UV space
+
+        Returns:
+            list[np.ndarray]: the slices, or strokes of linked slices, in UV space (Nx2)
+        """
+        if self.config.fill_spacing_mode == "uv":
+            paths: list[np.ndarray] = fill_paths(polygon, self.config.fill_slice_spacing)
+            spacing: float = self.config.fill_slice_spacing
+        elif self.config.fill_spacing_mode == "surface":
+            rows: np.ndarray = surface_rows(
+                polygon,
+                self.model.visual.uv[self.model.faces],  # type: ignore
+                self.get_v_gradients(self.model),  # type: ignore
+                self.config.fill_surface_spacing
+            )
+            paths = fill_rows(polygon, rows)
+            spacing = float(np.max(np.diff(rows))) if len(rows) > 1 else 0.0
+        else:
+            raise ValueError(f"Unknown fill spacing mode: {self.config.fill_spacing_mode}")
+
+        if self.config.link_fill_slices:
+            max_link_length: float = self.config.fill_link_max_ratio * spacing
+            paths = link_scanlines(paths, polygon, max_link_length)
+        return paths
+
+    def contour_paths(self, polygon: BaseGeometry) -> list[np.ndarray]:
+        """Computes the rings filling an island, inset from its borders by `fill_slice_spacing`
+
+        Args:
+            polygon (BaseGeometry): the (valid) area of the island in UV space
+
+        Returns:
+            list[np.ndarray]: the closed rings, or spirals of linked rings, in UV space (Nx2)
+        """
+        if self.config.fill_spacing_mode != "uv":
+            raise ValueError(f"Contour fill only supports the \"uv\" spacing mode, got {self.config.fill_spacing_mode}")
+
+        levels: list[list[np.ndarray]] = contour_rings(polygon, self.config.fill_slice_spacing)
+        if self.config.link_fill_slices:
+            return link_rings(levels, polygon, self.config.fill_link_max_ratio * self.config.fill_slice_spacing)
+        return [ring for rings in levels for ring in rings]
+
     def export_traces(self, output_path: Path, force: bool = False):
+        """Exports the 3D traces
+
+        Traces are written in the binary trace format when `output_path` ends with `.npz`, else in JSON
+
+        Args:
+            output_path (Path): path of the exported file
+            force (bool, optional): whether to overwrite an existing file without asking. Defaults to False.
+        """
         output_path.parent.mkdir(parents=True, exist_ok=True)
         if output_path.exists() and not force:
             choice = input(f"File {output_path} already exists. Overwrite ? N/y")
             if choice.lower().strip() != "y":
                 return
 
-        traces_out: list[dict] = []
-        for trace in self.traces_3d:
-            traces_out.append({
-                "color": trace.color,
-                "path": [
-                    (pt.pos.tolist(), pt.normal.tolist())
-                    for pt in trace.path
-                ]
-            })
-
-        with open(output_path, "w") as f:
-            json.dump({
-                "generated_at": datetime.datetime.now().isoformat(),
-                "model": str(self.model_path),
-                "texture": str(self.texture_path),
-                "palette": [
-                    f"{r:02x}{g:02x}{b:02x}"
-                    for r, g, b, in self.palette
-                ],
-                "traces": traces_out
-            }, f, indent=4)
+        with TraceWriter(output_path, self.export_metadata()) as writer:
+            writer.write(self.traces_3d)
+
+    def export_metadata(self) -> dict:
+        """Builds the metadata written along the traces
+
+        Returns:
+            dict: the export metadata
+        """
+        metadata: dict = {
+            "generated_at": datetime.datetime.now().isoformat(),
+            "model": str(self.model_path),
+            "texture": str(self.texture_path),
+            "palette": [
+                f"{r:02x}{g:02x}{b:02x}"
+                for r, g, b, in self.palette
+            ]
+        }
+        if self.stats is not None:
+            metadata["stats"] = dataclasses.asdict(self.stats)
+        return metadata
     
     def show_graphs(self):
-        seps = [0]
-        for trace in self.traces_3d:
-            seps.append(seps[-1] + len(trace.path))
+        seps = np.concatenate([[0], np.cumsum([len(trace) for trace in self.traces_3d])]).tolist()
         
         i = range(seps[-1])
-        traces_pos = []
-        traces_normals = []
-        
-        for trace in self.traces_3d:
-            traces_pos.append(trace.get_polygon())
-            traces_normals.append(np.array([
-                p.normal
-                for p in trace.path
-            ]))
-        
-        pos = np.vstack(traces_pos)
-        normals = np.vstack(traces_normals)
+        pos = np.vstack([trace.pos for trace in self.traces_3d])
+        normals = np.vstack([trace.normal for trace in self.traces_3d])
         
         fig, ax = plt.subplots(2)
         ax[0].set_ylabel("Position")
@@ -568,9 +1266,131 @@ class Tracer:
 
     # Utility
 
+    def project_traces(
+            self,
+            traces: list[Trace2D],
+            mesh: Trimesh,
+            progress_callback: Callable[[int, int, str], None]
+    ) -> list[Optional[list[Trace3D]]]:
+        """Projects 2D traces in 3D, in parallel if enabled in the configuration
+
+        Args:
+            traces (list[Trace2D]): the traces in UV space
+            mesh (Trimesh): the mesh
+            progress_callback (Callable[[int, int, str], None]): progress callback
+
+        Returns:
+            list[Optional[list[Trace3D]]]: the 3D traces of each 2D trace, in the same order
+        """
+        n_workers: int = self.config.projection_workers
+        if n_workers == 0:
+            n_workers = os.cpu_count() or 1
+
+        # Debug windows must stay in the main process
+        if n_workers > 1 and len(traces) > 1 and not self.config.debug:
+            self.logger.info(f"Projecting {len(traces)} traces with {n_workers} processes")
+            return project_traces_parallel(
+                self,
+                traces,
+                mesh,
+                n_workers,
+                self.config.projection_chunk_size,
+                progress_callback
+            )
+
+        results: list[Optional[list[Trace3D]]] = []
+        for i, trace_2d in tqdm.tqdm(list(enumerate(traces)), desc="3D projection", unit="trace"):
+            self.logger.debug(f"Processing trace {i}")
+            progress_callback(i, len(traces), "(3 / 3) 3D projection")
+            results.append(self.project_trace_to_3d(trace_2d, mesh))
+        return results
+
+    def warn_empty_projections(self, traces: list[Trace2D], results: list[Optional[list[Trace3D]]]):
+        """Warns about the 2D traces whose projection gave no 3D trace
+
+        Called right after projection, since stitching then empties the results of the traces joined into others
+
+        Args:
+            traces (list[Trace2D]): the projected 2D traces
+            results (list[Optional[list[Trace3D]]]): the 3D traces of each 2D trace
+        """
+        for trace, traces_3d in zip(traces, results):
+            if traces_3d is not None and len(traces_3d) == 0:
+                self.logger.warning(f"A 2D trace of color {trace.color} ({len(trace.path)} points) did not produce any 3D trace")
+
+    def stitch_traces(self, results: list[Optional[list[Trace3D]]]) -> list[Optional[list[Trace3D]]]:
+        """Joins the 3D traces whose ends meet on a UV seam, see `stitch_fragments`
+
+        Args:
+            results (list[Optional[list[Trace3D]]]): the 3D traces of each 2D trace
+
+        Returns:
+            list[Optional[list[Trace3D]]]: the stitched 3D traces of each 2D trace
+        """
+        stitched, n_stitches = stitch_fragments(
+            results,
+            self.model,  # type: ignore
+            self.get_seam_edges(self.model),  # type: ignore
+            self.config.stitch_tolerance
+        )
+        self.n_stitches += n_stitches
+        self.profiler.count("stitches", n_stitches)
+        self.logger.info(f"Stitching joined {n_stitches} pair(s) of 3D traces")
+        return stitched
+
+    def simplify_traces(self, results: list[Optional[list[Trace3D]]]) -> list[Optional[list[Trace3D]]]:
+        """Removes redundant points of 3D traces, see `simplify_trace`
+
+        Args:
+            results (list[Optional[list[Trace3D]]]): the 3D traces of each 2D trace
+
+        Returns:
+            list[Optional[list[Trace3D]]]: the simplified 3D traces of each 2D trace
+        """
+        simplified: list[Optional[list[Trace3D]]] = [
+            None if traces_3d is None else [self.simplify_trace(trace) for trace in traces_3d]
+            for traces_3d in results
+        ]
+        n_before: int = sum(len(trace) for traces_3d in results for trace in traces_3d or [])
+        n_after: int = sum(len(trace) for traces_3d in simplified for trace in traces_3d or [])
+        self.n_removed_points += n_before - n_after
+        self.logger.info(f"Simplification removed {n_before - n_after} of {n_before} points")
+        return simplified
+
+    def simplify_trace(self, trace: Trace3D) -> Trace3D:
+        """Removes the points of a 3D trace that deviate from the simplified path by less than
+        `simplification_tolerance` in position and `simplification_max_angle` in normal (Douglas-Peucker)
+
+        Trace ends and points sharing a position, such as sharp edge triplets, are kept
+
+        Args:
+            trace (Trace3D): the trace
+
+        Returns:
+            Trace3D: the simplified trace
+        """
+        keep: np.ndarray = simplify_path(
+            trace.pos,
+            trace.normal,
+            self.config.simplification_tolerance,
+            self.config.simplification_max_angle
+        )
+        if np.all(keep):
+            return trace
+        return dataclasses.replace(
+            trace,
+            pos=trace.pos[keep],
+            normal=trace.normal[keep],
+            face_idx=trace.face_idx[keep],
+            uv=trace.uv[keep]
+        )
+
     def project_trace_to_3d(self, trace: Trace2D, mesh: Trimesh) -> Optional[list[Trace3D]]:
         """Projects a trace from UV space to 3D traces
 
+        All points are projected in a single batch first, so that only the points
+        around inside/outside transitions and mesh edges need further work.
+
         Args:
             trace (Trace2D): a trace in UV space
             mesh (Trimesh): the mesh
@@ -578,84 +1398,116 @@ class Tracer:
         Returns:
             Optional[list[Trace3D]]: the corresponding 3D traces, or None if a point could not be projected in 3D space
         """
-
-        def is_outside_uv(point: Optional[Point3D]) -> bool:
-            return point is None
+        path: np.ndarray = np.asarray(trace.path, dtype=np.float64).reshape(-1, 2)
+        projected: ProjectedPoints = self.project_points(path, mesh)
+        inside: np.ndarray = projected.inside
+        n: int = len(path)
 
         traces: list[Trace3D] = []
-        pts: list[Point3D] = []
 
-        prev_outside_uv: bool = False
-        
-        for i, uv_point in enumerate(trace.path):
-            self.logger.debug(f"Processing pt {i}")
-            uv_point = np.array(uv_point)
-            projected_point: Optional[Point3D] = self.interpolate_position(uv_point, mesh)
-            cur_outside_uv: bool = is_outside_uv(projected_point)
-
-            # Initialize `outside_uv` state on first point
-            if i == 0:
-                prev_outside_uv = cur_outside_uv
-                self.logger.debug(f"First point is {'outside' if prev_outside_uv else 'inside'} UV")
-
-            if cur_outside_uv != prev_outside_uv:
-                # Compute boundary point between last UV point and current point
-                prev_uv_point: np.ndarray = np.array(trace.path[i - 1])
-                boundary_point: np.ndarray = self.compute_uv_boundary(prev_uv_point, uv_point, mesh)
-                projected_boundary_point: Optional[Point3D] = self.interpolate_position(boundary_point, mesh)
-                # Should never be True
-                if is_outside_uv(projected_boundary_point):
-                    raise RuntimeError("Unprojectable edge point")
-
-                if prev_outside_uv:
-                    pts.append(projected_boundary_point)
-                    pts.extend(self.compute_edge_points(projected_boundary_point, projected_point, mesh))
-                
-                elif cur_outside_uv:
-                    if len(pts) != 0:
-                        prev_projected_point: Point3D = pts[-1]
-                        pts.extend(self.compute_edge_points(prev_projected_point, projected_boundary_point, mesh))
-                    pts.append(projected_boundary_point)
-                    traces.append(Trace3D(
-                        path=pts,
-                        color=trace.color,
-                        parent_2d_trace=trace.i
-                    ))
-                    pts = []
-            
-            # If both points are inside
-            elif not cur_outside_uv:
+        # Runs of consecutive points inside the UV map, as [start, end) ranges
+        changes: np.ndarray = np.flatnonzero(inside[1:] != inside[:-1]) + 1
+        bounds: np.ndarray = np.concatenate([[0], changes, [n]])
+        runs: list[tuple[int, int]] = [
+            (int(start), int(end))
+            for start, end in zip(bounds[:-1], bounds[1:])
+            if inside[start]
+        ]
+        self.logger.debug(f"Trace {trace.i}: {len(runs)} run(s) inside UV")
+
+        for start, end in runs:
+            pts: list[Point3D] = []
+
+            # Entering the UV map: start on the boundary
+            if start > 0:
+                boundary_point: Point3D = self.project_uv_boundary(path[start - 1], path[start], mesh)
+                pts.append(boundary_point)
+
+            for i in range(start, end):
+                projected_point: Point3D = projected.point(i)
                 if len(pts) != 0:
-                    prev_projected_point: Point3D = pts[-1]
-                    pts.extend(self.compute_edge_points(prev_projected_point, projected_point, mesh))
-
-            if not cur_outside_uv:
+                    pts.extend(self.compute_edge_points(pts[-1], projected_point, mesh))
                 pts.append(projected_point)
 
-            prev_outside_uv = cur_outside_uv
+            # Leaving the UV map: end on the boundary
+            if end < n:
+                boundary_point = self.project_uv_boundary(path[end - 1], path[end], mesh)
+                pts.extend(self.compute_edge_points(pts[-1], boundary_point, mesh))
+                pts.append(boundary_point)
+
+            elif len(pts) <= 1:
+                continue
 
-        if len(pts) > 1:
-            self.logger.debug(f"Adding remaining trace with {len(pts)} points")
-            traces.append(Trace3D(
-                path=pts,
+            traces.append(Trace3D.from_points(
+                parent_2d_trace=trace.i,
                 color=trace.color,
-                parent_2d_trace=trace.i
+                points=pts
             ))
 
         return traces
 
-    def compute_edge_points(self, p1: Point3D, p2: Point3D, mesh: Trimesh, depth: int = 0) -> list[Point3D]:
+    def project_points(self, uv_points: np.ndarray, mesh: Trimesh) -> ProjectedPoints:
+        """Projects a batch of UV positions on the mesh in a single vectorized pass
+
+        Args:
+            uv_points (np.ndarray): UV positions (Nx2)
+            mesh (Trimesh): the mesh
+
+        Returns:
+            ProjectedPoints: the projected positions, faces, normals and inside/outside mask
+        """
+        uv_points = np.asarray(uv_points, dtype=np.float64).reshape(-1, 2)
+        n: int = len(uv_points)
+        self.profiler.count("projected_points", n)
+        pos: np.ndarray = np.full((n, 3), np.nan)
+        normal: np.ndarray = np.full((n, 3), np.nan)
+
+        if not isinstance(mesh.visual, TextureVisuals):
+            face_idx: np.ndarray = np.full(n, -1, dtype=np.intp)
+            return ProjectedPoints(pos, face_idx, normal, uv_points, face_idx >= 0)
+
+        face_idx, bary = self.get_uv_index(mesh).locate_many(uv_points)
+        inside: np.ndarray = face_idx >= 0
+        faces: np.ndarray = face_idx[inside]
+
+        # Interpolate 3D positions using barycentric coords
+        tri_verts: np.ndarray = mesh.vertices[mesh.faces[faces]]  # (N, 3, 3)
+        pos[inside] = np.einsum("ni,nij->nj", bary[inside], tri_verts)
+        normal[inside] = mesh.face_normals[faces]
+        return ProjectedPoints(pos, face_idx, normal, uv_points, inside)
+
+    def project_uv_boundary(self, p1: np.ndarray, p2: np.ndarray, mesh: Trimesh) -> Point3D:
+        """Projects the point where the segment (p1,p2) crosses the edge of the UV map
+
+        Args:
+            p1 (np.ndarray): the start of the segment
+            p2 (np.ndarray): the end of the segment
+            mesh (Trimesh): the mesh
+
+        Returns:
+            Point3D: the projected boundary point
+        """
+        boundary_point: np.ndarray = self.compute_uv_boundary(p1, p2, mesh)
+        projected_boundary_point: Optional[Point3D] = self.interpolate_position(boundary_point, mesh)
+        # Should never be True
+        if projected_boundary_point is None:
+            raise RuntimeError("Unprojectable edge point")
+        return projected_boundary_point
+
+    def compute_edge_points(self, p1: Point3D, p2: Point3D, mesh: Trimesh) -> list[Point3D]:
         """Computes the intersections of the segment (p1,p2) with all edges of the mesh
 
-        This process is done empirically using bissection.
+        The segment is followed in UV space from the face of p1 to the face of p2, stepping across
+        the shared edge through which it leaves each face, so each crossing is computed exactly.
+        If the segment goes from one UV chart to another, the walk resumes backwards from p2 and
+        the points where it leaves and enters the charts are added in between.
         When encountering a "sharp" edge, 3 points are created, using the normals of the first face,
-        the average normal and the normal of the second face respectively
+        the face found by a lookup on the edge and the normal of the second face respectively
 
         Args:
             p1 (Point3D): the start of the segment
             p2 (Point3D): the end of the segment
             mesh (Trimesh): the mesh
-            depth (int, optional): current recursion depth. Defaults to 0.
 
         Returns:
             list[Point3D]: the list of intermediary points
@@ -665,33 +1517,151 @@ class Tracer:
         too_parallel_faces: bool = abs(self.angle_between_normals(p1.normal, p2.normal)) < self.config.parallel_angle
         if same_face or too_parallel_faces:
             return pts
-        
-        mid_uv: np.ndarray = (p1.uv + p2.uv) / 2
-        mid: Optional[Point3D] = self.interpolate_position(mid_uv, mesh)
-        if mid is None:
-            return pts
 
-        dist = np.linalg.norm(p2.pos - p1.pos)
-        if (dist < self.config.min_segment_length or
-            depth > self.config.max_edge_recursion_depth):
-            diff = np.dot(p1.normal, p2.normal)
-            if diff < self.config.sharp_edge_threshold:
-                pts.append(mid.with_normal(p1))
-                pts.append(mid)
-                pts.append(mid.with_normal(p2))
-            else:
-                pts.append(mid)
+        index: UVIndex = self.get_uv_index(mesh)
+        faces, exits, barys = index.walk(p1.face_idx, p2.face_idx, p1.uv, p2.uv)
+        steps: int = len(faces) - 1
+        if np.isnan(exits[-1]):
+            pts = self.walk_crossing_points(faces, exits, barys, p1.uv, p2.uv, mesh)
         else:
-            if p1.face_idx != mid.face_idx:
-                pts.extend(self.compute_edge_points(p1, mid, mesh, depth + 1))
-            if p2.face_idx != mid.face_idx:
-                pts.extend(self.compute_edge_points(mid, p2, mesh, depth + 1))
+            # The segment leaves the UV chart of p1 before reaching p2 (across a seam or a hole of the UV map):
+            # the crossings on the side of p2 are found by walking back from it
+            back_faces, back_exits, back_barys = index.walk(p2.face_idx, p1.face_idx, p2.uv, p1.uv)
+            steps += len(back_faces) - 1
+            if np.isnan(back_exits[-1]):
+                pts = self.walk_crossing_points(back_faces, back_exits, back_barys, p2.uv, p1.uv, mesh, reverse=True)
+            else:
+                self.profiler.count("edge_walk_chart_changes")
+                pts = self.walk_crossing_points(faces, exits, barys, p1.uv, p2.uv, mesh)
+                pts.extend(self.chart_crossing_points(
+                    self.walk_exit_point(faces[-1], exits[-1], barys[-1], p1.uv, p2.uv, mesh),
+                    self.walk_exit_point(back_faces[-1], back_exits[-1], back_barys[-1], p2.uv, p1.uv, mesh)
+                ))
+                pts.extend(self.walk_crossing_points(
+                    back_faces, back_exits, back_barys, p2.uv, p1.uv, mesh, reverse=True
+                ))
+
+        self.profiler.count("edge_walk_steps", steps)
+        self.profiler.maximum("edge_walk_max_steps", steps)
         return pts
 
+    def walk_exit_point(
+            self,
+            face: int,
+            t: float,
+            bary: np.ndarray,
+            p1: np.ndarray,
+            p2: np.ndarray,
+            mesh: Trimesh
+    ) -> Point3D:
+        """Creates the point where a walk along the segment (p1,p2) leaves a face, see `UVIndex.walk`
+
+        Args:
+            face (int): the face
+            t (float): the position of the point along the segment
+            bary (np.ndarray): the barycentric coordinates of the point in the face
+            p1 (np.ndarray): the start of the segment
+            p2 (np.ndarray): the end of the segment
+            mesh (Trimesh): the mesh
+
+        Returns:
+            Point3D: the point, with the normal of the face
+        """
+        return Point3D(
+            pos=bary @ mesh.vertices[mesh.faces[face]],
+            face_idx=face,
+            normal=mesh.face_normals[face],
+            uv=p1 + t * (p2 - p1)
+        )
+
+    def walk_crossing_points(
+            self,
+            faces: np.ndarray,
+            exits: np.ndarray,
+            barys: np.ndarray,
+            p1: np.ndarray,
+            p2: np.ndarray,
+            mesh: Trimesh,
+            reverse: bool = False
+    ) -> list[Point3D]:
+        """Creates the points to insert where a walk along the segment (p1,p2) crosses the edges between faces
+
+        Args:
+            faces (np.ndarray): the faces walked through (see `UVIndex.walk`)
+            exits (np.ndarray): the position along the segment where the walk leaves each face
+            barys (np.ndarray): the barycentric coordinates of the exit points
+            p1 (np.ndarray): the start of the segment
+            p2 (np.ndarray): the end of the segment
+            mesh (Trimesh): the mesh
+            reverse (bool, optional): whether the walk goes backwards along the path. Defaults to False.
+
+        Returns:
+            list[Point3D]: the points, in the order of the path
+        """
+        crossings: list[list[Point3D]] = []
+        for face, next_face, t, bary in zip(faces[:-1], faces[1:], exits, barys):
+            face, next_face = int(face), int(next_face)
+            edge_face: int = min(face, next_face)
+            edge_point: Point3D = dataclasses.replace(
+                self.walk_exit_point(face, t, bary, p1, p2, mesh),
+                face_idx=edge_face,
+                normal=mesh.face_normals[edge_face]
+            )
+            if reverse:
+                crossings.append(self.edge_crossing_points(edge_point, next_face, face, mesh))
+            else:
+                crossings.append(self.edge_crossing_points(edge_point, face, next_face, mesh))
+        if reverse:
+            crossings.reverse()
+        return [point for points in crossings for point in points]
+
+    def chart_crossing_points(self, exit_point: Point3D, entry_point: Point3D) -> list[Point3D]:
+        """Creates the points to insert where a path goes from one UV chart to another
+
+        Args:
+            exit_point (Point3D): where the path leaves the first chart, on its edge
+            entry_point (Point3D): where the path enters the second chart, on its edge
+
+        Returns:
+            list[Point3D]: no point if both faces are almost parallel, else both points
+        """
+        if abs(self.angle_between_normals(exit_point.normal, entry_point.normal)) < self.config.parallel_angle:
+            return []
+        return [exit_point, entry_point]
+
+    def edge_crossing_points(self, edge_point: Point3D, face_1: int, face_2: int, mesh: Trimesh) -> list[Point3D]:
+        """Creates the points to insert where a path crosses the edge between two faces
+
+        Args:
+            edge_point (Point3D): the crossing point, on the edge
+            face_1 (int): the face the path comes from
+            face_2 (int): the face the path goes to
+            mesh (Trimesh): the mesh
+
+        Returns:
+            list[Point3D]: no point if both faces are almost parallel, 3 points on sharp edges, else only `edge_point`
+        """
+        n1: np.ndarray = mesh.face_normals[face_1]
+        n2: np.ndarray = mesh.face_normals[face_2]
+        if abs(self.angle_between_normals(n1, n2)) < self.config.parallel_angle:
+            return []
+
+        if np.dot(n1, n2) < self.config.sharp_edge_threshold:
+            self.profiler.count("sharp_edges")
+            self.profiler.count("sharp_edge_points", 3)
+            return [
+                Point3D(pos=edge_point.pos, face_idx=face_1, normal=n1, uv=edge_point.uv),
+                edge_point,
+                Point3D(pos=edge_point.pos, face_idx=face_2, normal=n2, uv=edge_point.uv),
+            ]
+        return [edge_point]
+
     def compute_uv_boundary(self, p1: np.ndarray, p2: np.ndarray, mesh: Trimesh) -> np.ndarray:
         """Computes the intersection of the segment (p1,p2) and the edge of the UV map
 
-        One of the points MUST be outside of the UV map and the other inside
+        One of the points MUST be outside of the UV map and the other inside.
+        The intersection is computed exactly against the boundary edges of the UV charts,
+        falling back to bisection if none is found (e.g. due to floating-point error)
 
         Args:
             p1 (np.ndarray): the start of the segment
@@ -701,26 +1671,43 @@ class Tracer:
         Returns:
             np.ndarray: the point on the segment at the UV map's edge
         """
-        p1_projected: Optional[Point3D] = self.interpolate_position(p1, mesh)
-        p2_projected: Optional[Point3D] = self.interpolate_position(p2, mesh)
-        p1_outside: bool = p1_projected is None
-        p2_outside: bool = p2_projected is None
+        index: UVIndex = self.get_uv_index(mesh)
+        p1_outside: bool = index.locate(p1) is None
+        p2_outside: bool = index.locate(p2) is None
 
         if p1_outside == p2_outside:
             raise RuntimeError("Cannot compute UV map boundary because both points are either inside or outside")
 
+        inside, outside = (p2, p1) if p1_outside else (p1, p2)
+        crossing: Optional[np.ndarray] = index.boundary_crossing(inside, outside)
+        if crossing is not None and index.locate(crossing) is not None:
+            self.profiler.count("exact_uv_boundaries")
+            return crossing
+
+        self.logger.debug(f"No exact UV boundary crossing between {p1} and {p2}, bisecting")
+        return self.bisect_uv_boundary(inside, outside, mesh)
+
+    def bisect_uv_boundary(self, inside: np.ndarray, outside: np.ndarray, mesh: Trimesh) -> np.ndarray:
+        """Approximates the edge of the UV map between an inside and an outside point by bisection
+
+        Args:
+            inside (np.ndarray): a point inside the UV map
+            outside (np.ndarray): a point outside the UV map
+            mesh (Trimesh): the mesh
+
+        Returns:
+            np.ndarray: the last inside point found
+        """
+        index: UVIndex = self.get_uv_index(mesh)
+        self.profiler.count("bisections")
+        self.profiler.count("bisection_iterations", 10)
         for _ in range(10):
-            pm: np.ndarray = (p1 + p2) / 2
-            pm_projected: Optional[Point3D] = self.interpolate_position(pm, mesh)
-            pm_outside: bool = pm_projected is None
-            if p1_outside != pm_outside:
-                p2_outside = pm_outside
-                p2 = pm
+            pm: np.ndarray = (inside + outside) / 2
+            if index.locate(pm) is None:
+                outside = pm
             else:
-                p1_outside = pm_outside
-                p1 = pm
-        
-        return p2 if p1_outside else p1
+                inside = pm
+        return inside
 
     def interpolate_position(self, uv_pos: np.ndarray, mesh: Trimesh) -> Optional[Point3D]:
         """Interpolates the UV position on the UV map and returns the corresponding 3D point
@@ -732,53 +1719,73 @@ class Tracer:
         Returns:
             Optional[Point3D]: the corresponding 3D point, or None if a correspondance could not be found
         """
+        self.profiler.count("interpolate_position_calls")
         if not isinstance(mesh.visual, TextureVisuals):
             return None
 
-        uv: np.ndarray = mesh.visual.uv
-        faces: np.ndarray = mesh.faces
-        vertices: np.ndarray = mesh.vertices
-        uv_faces: np.ndarray = uv[faces]
-
-        # Compute barycentric coordinates of uv_pos in each UV triangle
-        # Using the 2D triangle test
-        v0 = uv_faces[:, 0, :]  # (F, 2)
-        v1 = uv_faces[:, 1, :]
-        v2 = uv_faces[:, 2, :]
-
-        # Barycentric coords in UV space
-        denom = ((v1[:, 1] - v2[:, 1]) * (v0[:, 0] - v2[:, 0]) +
-                 (v2[:, 0] - v1[:, 0]) * (v0[:, 1] - v2[:, 1]))
-
-        w0 = ((v1[:, 1] - v2[:, 1]) * (uv_pos[0] - v2[:, 0]) +
-              (v2[:, 0] - v1[:, 0]) * (uv_pos[1] - v2[:, 1])) / denom
-
-        w1 = ((v2[:, 1] - v0[:, 1]) * (uv_pos[0] - v2[:, 0]) +
-              (v0[:, 0] - v2[:, 0]) * (uv_pos[1] - v2[:, 1])) / denom
-
-        w2 = 1.0 - w0 - w1
-
-        # Find faces where point is inside the UV triangle
-        eps: float = self.config.barycentric_epsilon
-        inside = (w0 >= -eps) & (w1 >= -eps) & (w2 >= -eps)
-
-        if not np.any(inside):
+        located: Optional[tuple[int, np.ndarray]] = self.get_uv_index(mesh).locate(uv_pos)
+        if located is None:
             return None  # UV point not found in any triangle
-
-        # Take the first matching face
-        idx = np.argmax(inside)
-        bary = np.array([w0[idx], w1[idx], w2[idx]])
+        idx, bary = located
 
         # Interpolate 3D position using barycentric coords
-        tri_verts = vertices[faces[idx]]  # (3, 3)
+        tri_verts = mesh.vertices[mesh.faces[idx]]  # (3, 3)
         pos = bary @ tri_verts
         return Point3D(
             pos=pos,
-            face_idx=int(idx),
+            face_idx=idx,
             normal=mesh.face_normals[idx],
             uv=uv_pos
         )
 
+    def get_uv_index(self, mesh: Trimesh) -> UVIndex:
+        """Returns the UV lookup index of the given mesh, building it on first use
+
+        Args:
+            mesh (Trimesh): the mesh
+
+        Returns:
+            UVIndex: the mesh's UV index
+        """
+        if self.uv_index is None or self.uv_index_mesh is not mesh:
+            self.logger.info("Building UV index")
+            self.uv_index = UVIndex.from_mesh(
+                mesh,
+                resolution=self.config.uv_grid_resolution,
+                epsilon=self.config.barycentric_epsilon
+            )
+            self.uv_index_mesh = mesh
+        self.uv_index.use_kernels = self.use_kernels
+        return self.uv_index
+
+    def get_seam_edges(self, mesh: Trimesh) -> np.ndarray:
+        """Returns the seam edges of the given mesh, finding them on first use
+
+        Args:
+            mesh (Trimesh): the mesh
+
+        Returns:
+            np.ndarray: True for each edge of each face on a UV seam (Fx3), see `seam_edges`
+        """
+        if self.seams is None or self.seams_mesh is not mesh:
+            self.seams = seam_edges(mesh)
+            self.seams_mesh = mesh
+        return self.seams
+
+    def get_v_gradients(self, mesh: Trimesh) -> np.ndarray:
+        """Returns the norm of the surface gradient of v on each face of the given mesh, computing it on first use
+
+        Args:
+            mesh (Trimesh): the mesh
+
+        Returns:
+            np.ndarray: the gradient norm of each face (F), see `v_gradients`
+        """
+        if self.v_gradients is None or self.v_gradients_mesh is not mesh:
+            self.v_gradients = v_gradients(mesh)
+            self.v_gradients_mesh = mesh
+        return self.v_gradients
+
     def contour_to_polygon(self, contour: np.ndarray) -> np.ndarray:
         """Converts an OpenCV (Nx1x2) contour to a simple polygon (Nx2)
 
@@ -839,27 +1846,20 @@ class Tracer:
     def mesh_has_uv_map(self, mesh: Trimesh) -> bool:
         return isinstance(mesh.visual, TextureVisuals)
 
-    # This fonction was as such, re-used from https://stackoverflow.com/questions/73666119/open-cv-python-quantize-to-a-given-color-palette
-    def quantize_to_palette(self, image: np.ndarray, palette: tuple[Color, ...]) -> Image.Image:
+    def quantize_to_palette(self, image: np.ndarray, palette: tuple[Color, ...]) -> np.ndarray:
         """Quantize color value in an image to the one in the given palette
 
+        Colors are mapped through a lookup table cached per palette (see `palette_lut`)
+
         Args:
-            image (np.ndarray): The texture image
+            image (np.ndarray): The texture image (...x3)
             palette (tuple[Color, ...]): the list of colors available in the draw processing
 
         Returns:
             np.ndarray: the palettized texture
         """
-        X_query = image.reshape(-1, 3).astype(np.float32)
-        X_index = palette.astype(np.float32)
-
-        knn = cv2.ml.KNearest_create()
-        knn.train(X_index, cv2.ml.ROW_SAMPLE, np.arange(len(palette)))
-        ret, results, neighbours, dist = knn.findNearest(X_query, 1)
-
-        quantized_image = np.array([palette[idx] for idx in neighbours.astype(int)])
-        quantized_image = quantized_image.reshape(image.shape)
-        return quantized_image
+        labels: np.ndarray = quantize_labels(image, palette, self.config.palette_lut_bits)
+        return np.asarray(palette)[labels]
     
     def mask_outside_UV_texture(self, img: Image.Image,  mesh: Trimesh) -> Image.Image:
         """Mask out regions of the given texture not covered by the UV map
@@ -871,19 +1871,9 @@ class Tracer:
         Returns:
             Image.Image: the masked texture
         """
-        uv = mesh.visual.uv
-        faces = mesh.faces
-        width, height = img.size
-        # normalisation des coordonnées UV aux dimensions de textures
-        pixel_coords = uv * np.array([width - 1, height - 1])
-        # inverse coordonée vertical (format de base UV est zero=bottom-left et on veut zero=top-left)
-        pixel_coords[:, 1] = (height - 1) - pixel_coords[:, 1]
-        
-        uv_faces = pixel_coords[faces].astype(np.int32)
         np_img = np.array(img.convert('RGB'))
-        mask = np.zeros((height, width), dtype=np.uint8)
-        cv2.fillPoly(mask, uv_faces, 255)
-        masked_texture = cv2.bitwise_and(np_img, np_img, mask=mask)
+        mask = self.uv_coverage(mesh, img.size)
+        masked_texture = cv2.bitwise_and(np_img, np_img, mask=np.ascontiguousarray(mask))
         
         if self.config.enable_texture_transformation_visualisation:
             cv2.namedWindow('Mask', cv2.WINDOW_KEEPRATIO)
@@ -897,6 +1887,55 @@ class Tracer:
         
         return Image.fromarray(masked_texture)
 
+    def uv_coverage(self, mesh: Trimesh, size: tuple[int, int]) -> np.ndarray:
+        """Rasterizes the regions of the texture covered by the UV map
+
+        Args:
+            mesh (Trimesh): the model's mesh
+            size (tuple[int, int]): size of the texture in pixels (w,h)
+
+        Returns:
+            np.ndarray: the coverage mask (hxw), 255 inside the UV map and 0 outside
+        """
+        width, height = size
+        if self.coverage is not None and self.coverage.shape == (height, width):
+            return self.coverage
+
+        if self.mesh_cache is not None and self.mesh_key is not None:
+            cached: Optional[np.ndarray] = self.mesh_cache.load_coverage(self.mesh_key, size)
+            if cached is not None:
+                self.coverage = cached
+                return cached
+
+        uv_faces = self.uv_face_pixels(mesh, size)
+        mask = np.zeros((height, width), dtype=np.uint8)
+        cv2.fillPoly(mask, uv_faces, 255)
+
+        if self.mesh_cache is not None and self.mesh_key is not None:
+            self.mesh_cache.store_coverage(self.mesh_key, size, mask)
+        self.coverage = mask
+        return mask
+
+    def uv_face_pixels(self, mesh: Trimesh, size: tuple[int, int]) -> np.ndarray:
+        """Computes the pixel coordinates of the faces in the texture
+
+        Args:
+            mesh (Trimesh): the model's mesh
+            size (tuple[int, int]): size of the texture in pixels (w,h)
+
+        Returns:
+            np.ndarray: the corners of each face (Fx3x2, int32)
+        """
+        uv = mesh.visual.uv
+        faces = mesh.faces
+        width, height = size
+        # normalisation des coordonnées UV aux dimensions de textures
+        pixel_coords = uv * np.array([width - 1, height - 1])
+        # inverse coordonée vertical (format de base UV est zero=bottom-left et on veut zero=top-left)
+        pixel_coords[:, 1] = (height - 1) - pixel_coords[:, 1]
+
+        return pixel_coords[faces].astype(np.int32)
+
     def mask_unreachable(self, texture: Image.Image, mask: Image.Image) -> Image.Image:
         """Applies the binary mask to the given texture
 
@@ -921,6 +1960,12 @@ class Tracer:
         Returns:
             Island: cleaned island
         """
+        if self.use_kernels:
+            island.outer_border = island.outer_border[
+                non_collinear_points(np.ascontiguousarray(island.outer_border, dtype=np.float64), self.config.contour_epsilon)
+            ]
+            return island
+
         indexes_to_keep: list[int] = []
 
         for i in range(len(island.outer_border)):
@@ -0,0 +1,37 @@
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+from PIL import Image
+from trimesh import Trimesh
+
+from tracing.uv_index import UVIndex
+
+
+@dataclass
+class TracerAssets:
+    """Model and mask data that do not depend on the texture, shared by the runs of a `TracingSession`"""
+
+    # The model's mesh
+    model: Trimesh
+
+    # The binary mask of the reachable region (at the texture size, or its original size in tiled mode)
+    mask: Image.Image
+
+    # Key of the model in the mesh cache, if any
+    mesh_key: Optional[str] = None
+
+    # Content hash of the model file, keying the layer cache
+    mesh_hash: Optional[str] = None
+
+    # UV lookup index of the mesh
+    uv_index: Optional[UVIndex] = None
+
+    # Seam edges of the mesh (Fx3)
+    seams: Optional[np.ndarray] = None
+
+    # Norm of the surface gradient of v on each face (F)
+    v_gradients: Optional[np.ndarray] = None
+
+    # Coverage of the texture by the UV map (HxW)
+    coverage: Optional[np.ndarray] = None
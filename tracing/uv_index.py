@@ -0,0 +1,460 @@
+from __future__ import annotations
+
+from typing import Optional
+
+import numpy as np
+from trimesh import Trimesh
+
+from tracing import kernels
+
+
+class UVIndex:
+    """Uniform grid over the UV triangles of a mesh
+
+    Each cell of the grid stores the (sorted) indices of the faces whose UV bounding box overlaps it,
+    so locating a UV point only tests the few faces of a single cell instead of the whole mesh.
+    Setting `use_kernels` runs the point lookups, boundary crossings and walks with the compiled kernels of `tracing.kernels`
+    instead of numpy, with the same results.
+    """
+
+    # Attributes exported by `to_arrays`
+    ARRAYS: tuple[str, ...] = (
+        "epsilon", "resolution", "vertices", "faces", "face_normals",
+        "v0", "v1", "v2", "denom", "bounds_min", "bounds_max", "cell_size",
+        "cell_faces", "cell_start", "neighbors",
+        "boundary_edges", "cell_boundary_edges", "boundary_cell_start",
+    )
+
+    def __init__(
+            self,
+            vertices: np.ndarray,
+            faces: np.ndarray,
+            uv: np.ndarray,
+            face_normals: np.ndarray,
+            resolution: Optional[int] = None,
+            epsilon: float = 1e-8
+    ):
+        """Builds the index
+
+        Args:
+            vertices (np.ndarray): mesh vertices (Vx3)
+            faces (np.ndarray): mesh faces (Fx3)
+            uv (np.ndarray): UV coordinates of each vertex (Vx2)
+            face_normals (np.ndarray): normal of each face (Fx3)
+            resolution (Optional[int], optional): number of cells along each axis. Defaults to None (automatic).
+            epsilon (float, optional): barycentric tolerance the index must honour. Defaults to 1e-8.
+        """
+        self.epsilon: float = epsilon
+        self.use_kernels: bool = False
+        self.vertices: np.ndarray = vertices
+        self.faces: np.ndarray = faces
+        self.face_normals: np.ndarray = face_normals
+
+        uv_faces: np.ndarray = uv[faces]  # (F, 3, 2)
+        self.v0: np.ndarray = uv_faces[:, 0, :]
+        self.v1: np.ndarray = uv_faces[:, 1, :]
+        self.v2: np.ndarray = uv_faces[:, 2, :]
+        self.denom: np.ndarray = ((self.v1[:, 1] - self.v2[:, 1]) * (self.v0[:, 0] - self.v2[:, 0]) +
+                                  (self.v2[:, 0] - self.v1[:, 0]) * (self.v0[:, 1] - self.v2[:, 1]))
+
+        n_faces: int = len(faces)
+        if resolution is None:
+            resolution = int(np.clip(np.ceil(np.sqrt(n_faces)), 1, 2048))
+        self.resolution: int = resolution
+
+        # A point outside a triangle by less than `epsilon` times its altitude is still considered inside,
+        # so each bounding box is grown accordingly
+        face_min: np.ndarray = uv_faces.min(axis=1)
+        face_max: np.ndarray = uv_faces.max(axis=1)
+        margin: np.ndarray = 2 * epsilon * (face_max - face_min).max(axis=1, keepdims=True) + 1e-12
+        face_min = face_min - margin
+        face_max = face_max + margin
+
+        if n_faces == 0:
+            self.bounds_min: np.ndarray = np.zeros(2)
+            self.bounds_max: np.ndarray = np.ones(2)
+        else:
+            self.bounds_min = face_min.min(axis=0)
+            self.bounds_max = face_max.max(axis=0)
+        self.cell_size: np.ndarray = np.maximum((self.bounds_max - self.bounds_min) / resolution, 1e-12)
+
+        cell_faces, cell_start = self.bin_boxes(face_min, face_max)
+        self.cell_faces: np.ndarray = cell_faces
+        self.cell_start: np.ndarray = cell_start
+
+        self.neighbors: np.ndarray = self.compute_neighbors(faces)
+
+        # Edges used by a single face delimit the UV charts
+        boundary_faces, boundary_sides = np.nonzero(self.neighbors < 0)
+        self.boundary_edges: np.ndarray = np.stack([
+            uv_faces[boundary_faces, (boundary_sides + 1) % 3],
+            uv_faces[boundary_faces, (boundary_sides + 2) % 3],
+        ], axis=1)  # (E, 2, 2)
+        cell_edges, edge_cell_start = self.bin_boxes(
+            self.boundary_edges.min(axis=1) - 1e-12,
+            self.boundary_edges.max(axis=1) + 1e-12
+        )
+        self.cell_boundary_edges: np.ndarray = cell_edges
+        self.boundary_cell_start: np.ndarray = edge_cell_start
+
+    @classmethod
+    def from_mesh(cls, mesh: Trimesh, resolution: Optional[int] = None, epsilon: float = 1e-8) -> UVIndex:
+        """Builds the index of a textured mesh
+
+        Args:
+            mesh (Trimesh): the mesh, with UV coordinates
+            resolution (Optional[int], optional): number of cells along each axis. Defaults to None (automatic).
+            epsilon (float, optional): barycentric tolerance the index must honour. Defaults to 1e-8.
+
+        Returns:
+            UVIndex: the index
+        """
+        return cls(
+            vertices=mesh.vertices,
+            faces=mesh.faces,
+            uv=mesh.visual.uv,  # type: ignore
+            face_normals=mesh.face_normals,
+            resolution=resolution,
+            epsilon=epsilon
+        )
+
+    def bin_boxes(self, box_min: np.ndarray, box_max: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Registers bounding boxes in all the grid cells they overlap
+
+        Args:
+            box_min (np.ndarray): lower corner of each box (Nx2)
+            box_max (np.ndarray): upper corner of each box (Nx2)
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: the box indices sorted by cell then by index,
+                and the start of each cell in this array (cells + 1)
+        """
+        cell_min: np.ndarray = self.cell_coords(box_min)
+        cell_max: np.ndarray = self.cell_coords(box_max)
+        spans: np.ndarray = cell_max - cell_min + 1
+        counts: np.ndarray = spans[:, 0] * spans[:, 1]
+
+        # Expand each box over all the cells it covers
+        owners: np.ndarray = np.repeat(np.arange(len(box_min)), counts)
+        local: np.ndarray = np.arange(len(owners)) - np.repeat(np.cumsum(counts) - counts, counts)
+        cx: np.ndarray = cell_min[owners, 0] + local % spans[owners, 0]
+        cy: np.ndarray = cell_min[owners, 1] + local // spans[owners, 0]
+        cells: np.ndarray = cy * self.resolution + cx
+
+        # Sort by cell, then by index to preserve the "first matching face" semantics
+        order: np.ndarray = np.lexsort((owners, cells))
+        cell_start: np.ndarray = np.searchsorted(cells[order], np.arange(self.resolution * self.resolution + 1))
+        return owners[order], cell_start
+
+    @staticmethod
+    def compute_neighbors(faces: np.ndarray) -> np.ndarray:
+        """Computes the adjacency of faces in UV space
+
+        Two faces are adjacent when they share an edge, i.e. the same two vertices (hence the same UV coordinates).
+
+        Args:
+            faces (np.ndarray): mesh faces (Fx3)
+
+        Returns:
+            np.ndarray: for each face, the face across the edge opposite to each vertex, -1 on the UV map's boundary (Fx3)
+        """
+        n_faces: int = len(faces)
+        # Row f*3+k holds the edge of face f opposite to its vertex k
+        edges: np.ndarray = np.stack([faces[:, [1, 2, 0]], faces[:, [2, 0, 1]]], axis=-1).reshape(-1, 2)
+        edges = np.sort(edges, axis=1)
+
+        order: np.ndarray = np.lexsort((edges[:, 1], edges[:, 0]))
+        sorted_edges: np.ndarray = edges[order]
+        shared: np.ndarray = np.flatnonzero(np.all(sorted_edges[1:] == sorted_edges[:-1], axis=1))
+
+        neighbors: np.ndarray = np.full(n_faces * 3, -1, dtype=np.intp)
+        first: np.ndarray = order[shared]
+        second: np.ndarray = order[shared + 1]
+        neighbors[first] = second // 3
+        neighbors[second] = first // 3
+        return neighbors.reshape(n_faces, 3)
+
+    def cell_coords(self, uv_pos: np.ndarray) -> np.ndarray:
+        """Computes the grid cell containing each UV position
+
+        Args:
+            uv_pos (np.ndarray): UV positions (...x2)
+
+        Returns:
+            np.ndarray: cell coordinates (...x2), clipped to the grid
+        """
+        coords: np.ndarray = np.floor((uv_pos - self.bounds_min) / self.cell_size).astype(np.intp)
+        return np.clip(coords, 0, self.resolution - 1)
+
+    def boundary_crossing(self, p1: np.ndarray, p2: np.ndarray) -> Optional[np.ndarray]:
+        """Finds where the segment (p1,p2) crosses the boundary of the UV charts, as close to p2 as possible
+
+        No boundary edge lies between the returned point and p2,
+        so the whole remainder of the segment is on the same side of the UV map as p2.
+
+        Args:
+            p1 (np.ndarray): the start of the segment
+            p2 (np.ndarray): the end of the segment
+
+        Returns:
+            Optional[np.ndarray]: the crossing point, or None if the segment does not cross the boundary
+        """
+        if self.use_kernels:
+            last: float = kernels.crossing_parameter(
+                p1, p2, self.bounds_min, self.bounds_max, self.cell_size, self.resolution,
+                self.cell_boundary_edges, self.boundary_cell_start, self.boundary_edges
+            )
+            return None if last < 0 else p1 + last * (p2 - p1)
+
+        lower: np.ndarray = np.maximum(np.minimum(p1, p2), self.bounds_min)
+        upper: np.ndarray = np.minimum(np.maximum(p1, p2), self.bounds_max)
+        if np.any(lower > upper):
+            return None
+
+        (x0, y0), (x1, y1) = self.cell_coords(lower), self.cell_coords(upper)
+        rows: np.ndarray = np.arange(y0, y1 + 1)[:, None] * self.resolution
+        cells: np.ndarray = (rows + np.arange(x0, x1 + 1)[None, :]).ravel()
+        edges: np.ndarray = np.unique(np.concatenate([
+            self.cell_boundary_edges[self.boundary_cell_start[cell]:self.boundary_cell_start[cell + 1]]
+            for cell in cells
+        ]))
+        if len(edges) == 0:
+            return None
+
+        # Segment/segment intersection: p1 + t * r = a + s * e
+        a: np.ndarray = self.boundary_edges[edges, 0]
+        e: np.ndarray = self.boundary_edges[edges, 1] - a
+        r: np.ndarray = p2 - p1
+        ap: np.ndarray = a - p1
+        denom: np.ndarray = r[0] * e[:, 1] - r[1] * e[:, 0]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t: np.ndarray = (ap[:, 0] * e[:, 1] - ap[:, 1] * e[:, 0]) / denom
+            s: np.ndarray = (ap[:, 0] * r[1] - ap[:, 1] * r[0]) / denom
+
+        valid: np.ndarray = (denom != 0) & (t >= 0) & (t <= 1) & (s >= 0) & (s <= 1)
+        if not np.any(valid):
+            return None
+        return p1 + np.max(t[valid]) * r
+
+    def walk(self, face: int, end_face: int, p1: np.ndarray, p2: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Follows the segment (p1,p2) across the UV triangles, from the face of p1 towards the face of p2
+
+        Barycentric coordinates vary linearly along the segment, so it leaves each face where the first decreasing one
+        reaches 0, through the edge shared with the next face.
+
+        Args:
+            face (int): the face containing p1
+            end_face (int): the face containing p2
+            p1 (np.ndarray): the start of the segment
+            p2 (np.ndarray): the end of the segment
+
+        Returns:
+            tuple[np.ndarray, np.ndarray, np.ndarray]: the faces walked through (N), the position along the segment
+                where the walk leaves each of them (N, 0 at p1, 1 at p2) and the barycentric coordinates of these exit
+                points in the face they leave (Nx3). The last exit is NaN when the walk reaches the face of p2,
+                and a position before p2 when the segment leaves the UV chart first
+        """
+        if self.use_kernels:
+            return kernels.walk_faces(
+                int(face), int(end_face), p1, p2, self.neighbors, self.v0, self.v1, self.v2, self.denom
+            )
+
+        faces: list[int] = [face]
+        exits: list[float] = []
+        barys: list[np.ndarray] = []
+        t: float = 0
+        for _ in range(len(self.faces)):
+            if face == end_face:
+                break
+
+            w_start: np.ndarray = self.barycentric(face, p1)
+            w_delta: np.ndarray = self.barycentric(face, p2) - w_start
+            with np.errstate(divide="ignore", invalid="ignore"):
+                t_edges: np.ndarray = np.where(w_delta < 0, -w_start / w_delta, np.inf)
+            k: int = int(np.argmin(t_edges))
+            t_exit: float = max(float(t_edges[k]), t)
+            if not t_exit < 1:
+                # p2 lies on this face
+                break
+
+            bary: np.ndarray = w_start + t_exit * w_delta
+            bary[k] = 0
+            exits.append(t_exit)
+            barys.append(bary)
+            face = int(self.neighbors[face, k])
+            if face < 0:
+                # Reached the edge of the UV chart
+                return np.array(faces), np.array(exits), np.array(barys)
+            faces.append(face)
+            t = t_exit
+
+        exits.append(np.nan)
+        barys.append(np.full(3, np.nan))
+        return np.array(faces), np.array(exits), np.array(barys)
+
+    def barycentric(self, face: int, uv_pos: np.ndarray) -> np.ndarray:
+        """Computes the barycentric coordinates of a UV position in the given face
+
+        Args:
+            face (int): the face index
+            uv_pos (np.ndarray): a UV position (u,v)
+
+        Returns:
+            np.ndarray: the barycentric coordinates (w0, w1, w2)
+        """
+        v0 = self.v0[face]
+        v1 = self.v1[face]
+        v2 = self.v2[face]
+        denom = self.denom[face]
+
+        w0 = ((v1[1] - v2[1]) * (uv_pos[0] - v2[0]) +
+              (v2[0] - v1[0]) * (uv_pos[1] - v2[1])) / denom
+
+        w1 = ((v2[1] - v0[1]) * (uv_pos[0] - v2[0]) +
+              (v0[0] - v2[0]) * (uv_pos[1] - v2[1])) / denom
+
+        return np.array([w0, w1, 1.0 - w0 - w1])
+
+    def candidates(self, uv_pos: np.ndarray) -> np.ndarray:
+        """Lists the faces whose UV triangle may contain the given position
+
+        Args:
+            uv_pos (np.ndarray): a UV position (u,v)
+
+        Returns:
+            np.ndarray: sorted face indices
+        """
+        if np.any(uv_pos < self.bounds_min) or np.any(uv_pos > self.bounds_max):
+            return self.cell_faces[:0]
+        cx, cy = self.cell_coords(uv_pos)
+        cell: int = cy * self.resolution + cx
+        return self.cell_faces[self.cell_start[cell]:self.cell_start[cell + 1]]
+
+    def locate(self, uv_pos: np.ndarray) -> Optional[tuple[int, np.ndarray]]:
+        """Finds the first face whose UV triangle contains the given position
+
+        Args:
+            uv_pos (np.ndarray): a UV position (u,v)
+
+        Returns:
+            Optional[tuple[int, np.ndarray]]: the face index and barycentric coordinates, or None if outside the UV map
+        """
+        if self.use_kernels:
+            face, w0, w1, w2 = kernels.locate_point(
+                float(uv_pos[0]), float(uv_pos[1]), self.bounds_min, self.bounds_max, self.cell_size, self.resolution,
+                self.cell_faces, self.cell_start, self.v0, self.v1, self.v2, self.denom, self.epsilon
+            )
+            return None if face < 0 else (face, np.array([w0, w1, w2]))
+
+        idx: np.ndarray = self.candidates(uv_pos)
+        if len(idx) == 0:
+            return None
+
+        v0 = self.v0[idx]
+        v1 = self.v1[idx]
+        v2 = self.v2[idx]
+        denom = self.denom[idx]
+
+        w0 = ((v1[:, 1] - v2[:, 1]) * (uv_pos[0] - v2[:, 0]) +
+              (v2[:, 0] - v1[:, 0]) * (uv_pos[1] - v2[:, 1])) / denom
+
+        w1 = ((v2[:, 1] - v0[:, 1]) * (uv_pos[0] - v2[:, 0]) +
+              (v0[:, 0] - v2[:, 0]) * (uv_pos[1] - v2[:, 1])) / denom
+
+        w2 = 1.0 - w0 - w1
+
+        eps: float = self.epsilon
+        inside = (w0 >= -eps) & (w1 >= -eps) & (w2 >= -eps)
+        if not np.any(inside):
+            return None
+
+        i = np.argmax(inside)
+        return int(idx[i]), np.array([w0[i], w1[i], w2[i]])
+
+    def locate_many(self, uv_pos: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Finds the first face whose UV triangle contains each of the given positions
+
+        Args:
+            uv_pos (np.ndarray): UV positions (Nx2)
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: the face indices (N), -1 outside the UV map,
+                and barycentric coordinates (Nx3), NaN outside the UV map
+        """
+        uv_pos = np.asarray(uv_pos, dtype=np.float64).reshape(-1, 2)
+        if self.use_kernels:
+            return kernels.locate_points(
+                uv_pos, self.bounds_min, self.bounds_max, self.cell_size, self.resolution,
+                self.cell_faces, self.cell_start, self.v0, self.v1, self.v2, self.denom, self.epsilon
+            )
+
+        n: int = len(uv_pos)
+        face_idx: np.ndarray = np.full(n, -1, dtype=np.intp)
+        bary: np.ndarray = np.full((n, 3), np.nan)
+
+        in_bounds: np.ndarray = np.all((uv_pos >= self.bounds_min) & (uv_pos <= self.bounds_max), axis=1)
+        points: np.ndarray = np.flatnonzero(in_bounds)
+        coords: np.ndarray = self.cell_coords(uv_pos[points])
+        cells: np.ndarray = coords[:, 1] * self.resolution + coords[:, 0]
+        start: np.ndarray = self.cell_start[cells]
+        counts: np.ndarray = self.cell_start[cells + 1] - start
+
+        # One row per (point, candidate face) pair, grouped by point with faces in ascending order
+        owners: np.ndarray = np.repeat(points, counts)
+        offsets: np.ndarray = (np.arange(len(owners))
+                               - np.repeat(np.cumsum(counts) - counts, counts)
+                               + np.repeat(start, counts))
+        idx: np.ndarray = self.cell_faces[offsets]
+        pts: np.ndarray = uv_pos[owners]
+
+        v0 = self.v0[idx]
+        v1 = self.v1[idx]
+        v2 = self.v2[idx]
+        denom = self.denom[idx]
+
+        w0 = ((v1[:, 1] - v2[:, 1]) * (pts[:, 0] - v2[:, 0]) +
+              (v2[:, 0] - v1[:, 0]) * (pts[:, 1] - v2[:, 1])) / denom
+
+        w1 = ((v2[:, 1] - v0[:, 1]) * (pts[:, 0] - v2[:, 0]) +
+              (v0[:, 0] - v2[:, 0]) * (pts[:, 1] - v2[:, 1])) / denom
+
+        w2 = 1.0 - w0 - w1
+
+        eps: float = self.epsilon
+        hits: np.ndarray = np.flatnonzero((w0 >= -eps) & (w1 >= -eps) & (w2 >= -eps))
+
+        # Keep the first hit of each point
+        hit_points, first = np.unique(owners[hits], return_index=True)
+        selected: np.ndarray = hits[first]
+        face_idx[hit_points] = idx[selected]
+        bary[hit_points] = np.stack([w0[selected], w1[selected], w2[selected]], axis=1)
+        return face_idx, bary
+
+    def to_arrays(self) -> dict[str, np.ndarray]:
+        """Exports the index as a set of named arrays, e.g. to store it on disk
+
+        Returns:
+            dict[str, np.ndarray]: the index arrays
+        """
+        return {
+            name: np.asarray(getattr(self, name))
+            for name in self.ARRAYS
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays: dict[str, np.ndarray]) -> UVIndex:
+        """Rebuilds an index from the arrays exported by `to_arrays`
+
+        Args:
+            arrays (dict[str, np.ndarray]): the index arrays
+
+        Returns:
+            UVIndex: the index
+        """
+        index: UVIndex = cls.__new__(cls)
+        for name in cls.ARRAYS:
+            setattr(index, name, arrays[name])
+        index.epsilon = float(index.epsilon)
+        index.use_kernels = False
+        index.resolution = int(index.resolution)
+        return index
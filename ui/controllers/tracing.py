@@ -8,6 +8,7 @@ from PyQt6.QtCore import QObject, pyqtSignal
 from PyQt6.QtWidgets import QFileDialog
 
 from tracing.stats import TracingStats
+from tracing.trace import Trace3D
 from ui.assets import AssetRegistry
 from ui.mesh_visualizer import MeshVisualizer
 from ui.services.tracing import TracingRequest, TracingResult, TracingService
@@ -38,6 +39,7 @@ class TracingController(QObject):
         self.service: TracingService = TracingService(
             traces_path=self.workspace.traces_path,
             paletted_texture_path=self.workspace.paletted_texture_path,
+            cache_path=self.workspace.tracing_cache_path,
         )
 
         self.setup()
@@ -93,11 +95,19 @@ class TracingController(QObject):
             enable_fill_slicing=self.ui.tracingEnableFill.isChecked(),
         )
 
+        # Traces are shown on the model as soon as they are computed
+        self.visualizer.load_model(request.model_path)
+        self.visualizer.clear_traces()
+
         result: TracingResult = self.service.run(
-            request, on_progress=self.update_progress
+            request, on_progress=self.update_progress, on_traces=self.show_traces
         )
         self.show_result(request, result)
 
+    def show_traces(self, traces: list[Trace3D]):
+        self.visualizer.add_traces([trace.pos for trace in traces])
+        self.visualizer.repaint()
+
     def update_progress(self, current: int, maximum: int, label: str):
         self.ui.tracingProgressLabel.setText(label)
         self.ui.tracingProgress.setMaximum(maximum)
@@ -15,6 +15,8 @@ from PyQt6.QtWidgets import QWidget
 from trimesh import Trimesh
 from trimesh.visual import TextureVisuals
 
+from tracing.trace_file import TraceFile, is_trace_file
+
 GlColor = tuple[float, float, float, float]
 
 
@@ -248,21 +250,46 @@ class MeshVisualizer(QOpenGLWidget):
             self._pending_traces = path
             return
 
-        if not self.mesh_loaded:
-            print("Loading traces but mesh is not loaded")
+        paths: list[np.ndarray]
+        if is_trace_file(path):
+            trace_file: TraceFile = TraceFile.read(path)
+            paths = np.split(np.array(trace_file.pos, dtype=np.float32), trace_file.offsets[1:-1])
+        else:
+            with open(path, "r") as f:
+                traces: list = json.load(f)["traces"]
+            paths = [np.array(trace["path"]).astype(np.float32)[:, 0] for trace in traces]
+
+        self.clear_traces()
+        self.add_traces(paths)
+
+    def clear_traces(self):
+        if not self._initialized:
+            self._pending_traces = None
+            return
 
         self.makeCurrent()
         if self.traces_loaded:
             glDeleteBuffers(len(self.trace_vbos), self.trace_vbos)
+        self.trace_vbos = []
+        self.trace_vertex_counts = []
+        self.traces_loaded = False
+        self.update()
 
-        with open(path, "r") as f:
-            traces: list = json.load(f)["traces"]
+    def add_traces(self, paths: list[np.ndarray]):
+        """Adds traces to the displayed ones, e.g. while they are being computed
 
-        self.trace_vbos: list[int] = []
-        self.trace_vertex_counts: list[int] = []
-        for trace in traces:
-            pts: np.ndarray = np.array(trace["path"]).astype(np.float32)
-            pos = pts[:, 0]
+        Args:
+            paths (list[np.ndarray]): the 3D positions of each trace (Nx3)
+        """
+        if not self._initialized:
+            return
+
+        if not self.mesh_loaded:
+            print("Loading traces but mesh is not loaded")
+
+        self.makeCurrent()
+        for pos in paths:
+            pos = np.array(pos, dtype=np.float32)
             pos -= self.offset
             pos /= self.scale
             vbo = glGenBuffers(1)
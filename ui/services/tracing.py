@@ -1,10 +1,15 @@
+import dataclasses
+import time
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Callable, Optional
 
 from tracing.color import Color
 from tracing.config import TracerConfig
+from tracing.session import TracingSession
 from tracing.stats import TracingStats
+from tracing.trace import Trace3D
+from tracing.trace_writer import TraceWriter
 from tracing.tracer import Tracer
 
 IGNORED_COLOR: Color = (217, 213, 102) #TODO rendre cela configurable dans l'UI
@@ -27,38 +32,93 @@ class TracingResult:
 
 
 ProgressCallback = Callable[[int, int, str], None]
+TracesCallback = Callable[[list[Trace3D]], None]
 
 
 class TracingService:
-    def __init__(self, traces_path: Path, paletted_texture_path: Path) -> None:
+    def __init__(self, traces_path: Path, paletted_texture_path: Path, cache_path: Optional[Path] = None) -> None:
         self.traces_path: Path = traces_path
         self.paletted_texture_path: Path = paletted_texture_path
+        self.cache_path: Optional[Path] = cache_path
+        self.session: Optional[TracingSession] = None
 
-    def run(
-        self, request: TracingRequest, on_progress: Optional[ProgressCallback]
-    ) -> TracingResult:
+    def get_session(self, request: TracingRequest) -> TracingSession:
         config: TracerConfig = TracerConfig(
-            enable_fill_slicing=request.enable_fill_slicing
-        )
-        tracer: Tracer = Tracer(
-            config=config,
-            texture_path=request.texture_path,
-            model_path=request.model_path,
-            mask_path=request.mask_path,
-            palette=tuple(request.palette),
-            color_not_to_draw = (IGNORED_COLOR,),
+            enable_fill_slicing=request.enable_fill_slicing,
+            layer_cache_dir=self.cache_path,
         )
+        # The session is kept while the model, mask and settings stay the same
+        session: Optional[TracingSession] = self.session
+        if (
+            session is None
+            or session.model_path != request.model_path
+            or session.mask_path != request.mask_path
+            or session.config != config
+        ):
+            session = TracingSession(
+                config=config,
+                model_path=request.model_path,
+                mask_path=request.mask_path,
+                color_not_to_draw=(IGNORED_COLOR,),
+            )
+            self.session = session
+        return session
+
+    def run(
+        self,
+        request: TracingRequest,
+        on_progress: Optional[ProgressCallback],
+        on_traces: Optional[TracesCallback] = None,
+        traces_path: Optional[Path] = None,
+        paletted_texture_path: Optional[Path] = None,
+    ) -> TracingResult:
+        if traces_path is None:
+            traces_path = self.traces_path
+        if paletted_texture_path is None:
+            paletted_texture_path = self.paletted_texture_path
 
-        stats: TracingStats = tracer.compute_traces(progress_callback=on_progress)
-        tracer.export_traces(self.traces_path, force=True)
+        session: TracingSession = self.get_session(request)
+        tracer: Tracer = session.create_tracer(request.texture_path, tuple(request.palette))
+
+        if on_traces is None:
+            stats: TracingStats = tracer.compute_traces(progress_callback=on_progress)
+            tracer.export_traces(traces_path, force=True)
+        else:
+            # Stream traces to the exported file and the caller as islands are traced
+            start: float = time.time()
+            with TraceWriter(traces_path, tracer.export_metadata()) as writer:
+                for traces in tracer.iter_traces(progress_callback=on_progress):
+                    writer.write(traces)
+                    on_traces(traces)
+                stats = tracer.get_stats(time.time() - start)
+                writer.update_metadata({"stats": dataclasses.asdict(stats)})
+        session.keep_assets(tracer)
 
         paletted_path: Optional[Path] = None
         if tracer.paletted_texture is not None:
-            tracer.paletted_texture.save(self.paletted_texture_path)
-            paletted_path = self.paletted_texture_path
+            tracer.paletted_texture.save(paletted_texture_path)
+            paletted_path = paletted_texture_path
 
         return TracingResult(
             stats=stats,
-            traces_path=self.traces_path,
+            traces_path=traces_path,
             paletted_texture_path=paletted_path,
         )
+
+    def run_batch(
+        self,
+        requests: list[TracingRequest],
+        output_dir: Path,
+        on_progress: Optional[ProgressCallback] = None,
+    ) -> list[TracingResult]:
+        # Consecutive requests on the same model and mask share a tracing session
+        output_dir.mkdir(parents=True, exist_ok=True)
+        return [
+            self.run(
+                request,
+                on_progress,
+                traces_path=output_dir / f"{i:03d}-{request.texture_path.stem}-traces.json",
+                paletted_texture_path=output_dir / f"{i:03d}-{request.texture_path.stem}-paletted.png",
+            )
+            for i, request in enumerate(requests)
+        ]
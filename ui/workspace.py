@@ -22,6 +22,10 @@ class WorkspaceManager:
     def traces_path(self) -> Path:
         return self.root / "traces.json"
 
+    @property
+    def tracing_cache_path(self) -> Path:
+        return self.root / "tracing_cache"
+
     @property
     def calibration_path(self) -> Path:
         return self.root / "calibration.json"